@@ -41,6 +41,12 @@ try:
     from . import actions
     from .actions import task_context
     from .state_machine import StateMachine
+    from .definition_size import analyze_definition_size
+    from .parser import parse_definition, parse_file
+    from .choice_optimizer import optimize_choice
+    from .graph import validate_graph
+    from .fingerprint import find_duplicate_workflows, dedupe_workflows
+    from .bulk import deploy_state_machines, start_executions, ExecutionRequest
     from .constant import Constant
     from . import better_boto
 except ImportError as e:  # pragma: no cover
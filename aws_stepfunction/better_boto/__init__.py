@@ -4,6 +4,8 @@ from .state_machine import (
     StateMachineStatusEnum,
     StateMachineTypeEnum,
     StateMachineLoggingLevelEnum,
+    ExecutionStatusEnum,
+    TERMINAL_EXECUTION_STATUS,
     StateMachine,
     create_logging_configuration,
     create_state_machine,
@@ -14,11 +16,30 @@ from .state_machine import (
     list_state_machines,
     wait_delete_state_machine_to_finish,
 )
+from .execution import (
+    describe_execution,
+    wait_executions_to_finish,
+    wait_execution_to_finish,
+)
 from .tagging import (
     to_tag_list,
     to_tag_dict,
 )
 from .waiter import (
     WaiterError,
+    DelayStrategy,
+    FixedDelay,
+    ExponentialDelay,
+    DecorrelatedJitterDelay,
+    CappedDelay,
     Waiter,
 )
+from .rate_limit import (
+    RateLimitMetrics,
+    TokenBucket,
+    RateLimiter,
+    get_rate_limiter,
+    set_rate_limiter,
+    call_api,
+)
+from .aio import AsyncSfnClient
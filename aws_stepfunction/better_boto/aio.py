@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio API of the Step Functions executions.
+
+boto3 is blocking, :class:`AsyncSfnClient` runs each API call on a bounded
+thread pool and awaits it, the thread is only held during the HTTP call.
+The polling of :meth:`AsyncSfnClient.wait_execution` sleeps with
+``asyncio.sleep``, so one event loop can track thousands of in-flight
+executions with a handful of threads::
+
+    async with AsyncSfnClient.from_bsm(bsm) as client:
+        res = await client.start_execution(state_machine_arn, payload={})
+        res = await client.wait_execution(res["executionArn"])
+"""
+
+import typing as T
+import json
+import asyncio
+import functools
+import concurrent.futures
+
+from boto_session_manager import BotoSesManager, AwsServiceEnum
+
+from .rate_limit import call_api
+from .state_machine import TERMINAL_EXECUTION_STATUS
+
+
+class AsyncSfnClient:
+    """
+    :param sfn_client: the boto3 Step Functions client, it is thread safe.
+    :param max_workers: the size of the thread pool, the maximum number of
+        concurrent API calls.
+    :param executor: use this executor instead of creating a thread pool,
+        it is not shut down by :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        sfn_client,
+        max_workers: int = 16,
+        executor: T.Optional[concurrent.futures.Executor] = None,
+    ):
+        self.sfn_client = sfn_client
+        if executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers,
+            )
+            self._own_executor = True
+        else:
+            self.executor = executor
+            self._own_executor = False
+
+    @classmethod
+    def from_bsm(cls, bsm: BotoSesManager, **kwargs) -> "AsyncSfnClient":
+        return cls(bsm.get_client(AwsServiceEnum.SFN), **kwargs)
+
+    def close(self):
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncSfnClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def call(self, operation: str, **kwargs) -> T.Any:
+        """
+        Call a boto3 client method on the thread pool, it goes through the
+        shared rate limiter.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(call_api, self.sfn_client, operation, **kwargs),
+        )
+
+    async def start_execution(
+        self,
+        state_machine_arn: str,
+        payload: T.Optional[dict] = None,
+        name: T.Optional[str] = None,
+        trace_header: T.Optional[str] = None,
+    ) -> dict:
+        """
+        Ref:
+
+        - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.start_execution
+        """
+        kwargs = dict(stateMachineArn=state_machine_arn)
+        if payload is not None:
+            kwargs["input"] = json.dumps(payload)
+        if name is not None:
+            kwargs["name"] = name
+        if trace_header is not None:
+            kwargs["traceHeader"] = trace_header
+        return await self.call("start_execution", **kwargs)
+
+    async def describe_execution(self, execution_arn: str) -> dict:
+        """
+        Ref:
+
+        - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.describe_execution
+        """
+        return await self.call("describe_execution", executionArn=execution_arn)
+
+    async def wait_execution(
+        self,
+        execution_arn: str,
+        delays: T.Union[int, float] = 1,
+        timeout: T.Union[int, float] = 300,
+    ) -> dict:
+        """
+        Poll the execution until it is in a terminal status.
+
+        :return: the last ``describe_execution`` response.
+        :raises: ``asyncio.TimeoutError`` if it is still running after
+            ``timeout`` seconds.
+        """
+
+        async def wait() -> dict:
+            while True:
+                response = await self.describe_execution(execution_arn)
+                if response["status"] in TERMINAL_EXECUTION_STATUS:
+                    return response
+                await asyncio.sleep(delays)
+
+        return await asyncio.wait_for(wait(), timeout=timeout)
+
+    async def get_execution_history(
+        self,
+        execution_arn: str,
+        reverse_order: bool = False,
+        include_execution_data: bool = True,
+        page_size: int = 1000,
+    ) -> T.List[dict]:
+        """
+        Return all the history events, one API call per page.
+
+        Ref:
+
+        - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.get_execution_history
+        """
+        events = list()
+        kwargs = dict(
+            executionArn=execution_arn,
+            maxResults=page_size,
+            reverseOrder=reverse_order,
+            includeExecutionData=include_execution_data,
+        )
+        while True:
+            response = await self.call("get_execution_history", **kwargs)
+            events.extend(response["events"])
+            next_token = response.get("nextToken")
+            if not next_token:
+                return events
+            kwargs["nextToken"] = next_token
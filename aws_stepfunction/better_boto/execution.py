@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+import time
+import heapq
+
+from boto_session_manager import BotoSesManager
+
+from .waiter import DelayStrategy, ExponentialDelay, Waiter
+from .rate_limit import call_api
+from .state_machine import TERMINAL_EXECUTION_STATUS
+
+
+def describe_execution(
+    bsm: BotoSesManager,
+    execution_arn: str,
+) -> dict:
+    """
+    Ref:
+
+    - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.describe_execution
+    """
+    return call_api(
+        bsm.stepfunctions_client,
+        "describe_execution",
+        executionArn=execution_arn,
+    )
+
+
+def wait_executions_to_finish(
+    bsm: BotoSesManager,
+    execution_arns: T.Iterable[str],
+    delays: T.Union[int, float, DelayStrategy] = 1,
+    max_delay: T.Union[int, float] = 30,
+    backoff_rate: T.Union[int, float] = 2,
+    jitter: bool = True,
+    timeout: T.Union[int, float] = 600,
+    verbose: bool = False,
+    clock: T.Callable[[], float] = time.time,
+    sleep: T.Callable[[float], T.Any] = time.sleep,
+) -> T.Dict[str, dict]:
+    """
+    Wait for many executions to finish in one polling loop.
+
+    Each execution has its own schedule, the first poll is immediate, then
+    the delay starts from ``delays`` and is multiplied by ``backoff_rate``
+    after each poll, up to ``max_delay``. With ``jitter``, a delay is
+    randomized between half and the full value, so the polls of the
+    executions started together are spread out. An execution is not polled
+    anymore once it is in a terminal status, the loop sleeps until the next
+    execution is due.
+
+    :param delays: the first delay, or a
+        :class:`~aws_stepfunction.better_boto.waiter.DelayStrategy` used by
+        every execution, then ``max_delay``, ``backoff_rate`` and ``jitter``
+        are ignored.
+    :param clock: see :class:`~aws_stepfunction.better_boto.waiter.Waiter`.
+    :param sleep: see :class:`~aws_stepfunction.better_boto.waiter.Waiter`.
+
+    :return: the last ``describe_execution`` response of each execution.
+    :raises: ``TimeoutError`` if not all the executions finished in
+        ``timeout`` seconds.
+    """
+    if not isinstance(delays, DelayStrategy):
+        delays = ExponentialDelay(
+            base=delays, rate=backoff_rate, max_delay=max_delay, jitter=jitter,
+        )
+    results = dict()
+    heap = list()  # (due time, order, execution arn)
+    schedules = dict()  # the delay iterator of each execution
+    for order, execution_arn in enumerate(execution_arns):
+        heapq.heappush(heap, (0.0, order, execution_arn))
+        schedules[execution_arn] = iter(delays)
+    if not heap:
+        return results
+
+    def next_delays() -> T.Iterable[float]:
+        while True:
+            yield max(0.0, heap[0][0] - clock())
+
+    for _ in Waiter(
+        delays=next_delays(),
+        timeout=timeout,
+        verbose=verbose,
+        clock=clock,
+        sleep=sleep,
+    ):
+        now = clock()
+        while heap and heap[0][0] <= now:
+            _, order, execution_arn = heapq.heappop(heap)
+            response = describe_execution(bsm=bsm, execution_arn=execution_arn)
+            if response["status"] in TERMINAL_EXECUTION_STATUS:
+                results[execution_arn] = response
+                continue
+            wait = next(schedules[execution_arn])
+            heapq.heappush(heap, (now + wait, order, execution_arn))
+        if not heap:
+            return results
+
+
+def wait_execution_to_finish(
+    bsm: BotoSesManager,
+    execution_arn: str,
+    **kwargs,
+) -> dict:
+    """
+    Wait for one execution to finish, see :func:`wait_executions_to_finish`.
+
+    :return: the last ``describe_execution`` response.
+    """
+    return wait_executions_to_finish(bsm, [execution_arn], **kwargs)[execution_arn]
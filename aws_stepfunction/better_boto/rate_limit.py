@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+Client side rate limit of the Step Functions API.
+
+Step Functions throttles each API action with a token bucket per account
+per region, a bucket has a burst capacity and a refill rate per second.
+:class:`RateLimiter` holds one local :class:`TokenBucket` per API family
+with the same shape, every boto call made by this library acquires a token
+first via :func:`call_api`, so the bulk jobs wait locally instead of
+getting ``ThrottlingException`` and the botocore retries.
+
+All the callers share the rate limiter returned by :func:`get_rate_limiter`,
+use :func:`set_rate_limiter` to change the rates::
+
+    set_rate_limiter(RateLimiter(rates={"StartExecution": (100, 500)}))
+
+Reference:
+
+- https://docs.aws.amazon.com/step-functions/latest/dg/limits-overview.html#service-limits-api-action-throttling-general
+"""
+
+import typing as T
+import time
+import threading
+import dataclasses
+
+#: the API family of each boto3 client method, the methods in one family
+#: share one token bucket
+OPERATION_FAMILY: T.Dict[str, str] = {
+    "start_execution": "StartExecution",
+    "start_sync_execution": "StartExecution",
+    "stop_execution": "StopExecution",
+    "describe_execution": "DescribeExecution",
+    "get_execution_history": "GetExecutionHistory",
+    "describe_state_machine": "DescribeStateMachine",
+    "create_state_machine": "CreateStateMachine",
+    "update_state_machine": "UpdateStateMachine",
+    "delete_state_machine": "DeleteStateMachine",
+    "list_state_machines": "ListStateMachines",
+    "list_executions": "ListExecutions",
+}
+
+#: the default ``(refill rate per second, bucket size)`` of each API family,
+#: the Step Functions standard workflow quotas in us-east-1, us-west-2 and
+#: eu-west-1, other regions have lower quotas
+DEFAULT_RATES: T.Dict[str, T.Tuple[float, float]] = {
+    "StartExecution": (300, 1300),
+    "StopExecution": (200, 1000),
+    "DescribeExecution": (15, 250),
+    "GetExecutionHistory": (20, 400),
+    "DescribeStateMachine": (20, 200),
+    "CreateStateMachine": (1, 100),
+    "UpdateStateMachine": (1, 200),
+    "DeleteStateMachine": (1, 100),
+    "ListStateMachines": (5, 100),
+    "ListExecutions": (5, 100),
+}
+
+
+def get_family(operation: str) -> str:
+    """
+    Return the API family of a boto3 client method name, an unknown method
+    is a family of its own.
+    """
+    return OPERATION_FAMILY.get(operation, operation)
+
+
+@dataclasses.dataclass
+class RateLimitMetrics:
+    """
+    The wait time metrics of one API family.
+
+    :param n_acquired: the number of acquired tokens.
+    :param n_waited: the number of acquires that had to wait.
+    :param total_wait: the total wait time in seconds.
+    :param max_wait: the longest wait time in seconds.
+    """
+    n_acquired: int = dataclasses.field(default=0)
+    n_waited: int = dataclasses.field(default=0)
+    total_wait: float = dataclasses.field(default=0.0)
+    max_wait: float = dataclasses.field(default=0.0)
+
+    @property
+    def avg_wait(self) -> float:
+        if self.n_acquired:
+            return self.total_wait / self.n_acquired
+        else:
+            return 0.0
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket.
+
+    The bucket starts full. An acquire without enough tokens reserves the
+    token in advance (the balance goes negative) and sleeps until it is
+    refilled, so the concurrent callers are served in order.
+
+    :param rate: the refill rate, tokens per second.
+    :param capacity: the bucket size, the maximum burst.
+    :param clock: a monotonic clock function, inject a fake one in unit test.
+    :param sleep: the sleep function, inject a fake one in unit test.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: T.Callable[[], float] = time.monotonic,
+        sleep: T.Callable[[float], T.Any] = time.sleep,
+    ):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate has to be positive and capacity at least 1!")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+        self.metrics = RateLimitMetrics()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, sleep if there are not enough.
+
+        :return: the wait time in seconds.
+        """
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                wait = 0.0
+            else:
+                wait = -self.tokens / self.rate
+            metrics = self.metrics
+            metrics.n_acquired += 1
+            if wait:
+                metrics.n_waited += 1
+                metrics.total_wait += wait
+                metrics.max_wait = max(metrics.max_wait, wait)
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    One :class:`TokenBucket` per API family.
+
+    :param rates: ``{family: (rate, capacity)}``, override the
+        :data:`DEFAULT_RATES`, a None value disables the limit of the family.
+    :param clock: see :class:`TokenBucket`.
+    :param sleep: see :class:`TokenBucket`.
+    """
+
+    def __init__(
+        self,
+        rates: T.Optional[T.Dict[str, T.Optional[T.Tuple[float, float]]]] = None,
+        clock: T.Callable[[], float] = time.monotonic,
+        sleep: T.Callable[[float], T.Any] = time.sleep,
+    ):
+        self.rates = dict(DEFAULT_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.clock = clock
+        self.sleep = sleep
+        self.buckets: T.Dict[str, TokenBucket] = dict()
+        for family, rate in self.rates.items():
+            if rate is not None:
+                self.buckets[family] = TokenBucket(
+                    rate=rate[0], capacity=rate[1], clock=clock, sleep=sleep,
+                )
+
+    def acquire(self, operation: str) -> float:
+        """
+        Acquire a token for the boto3 client method, the unlimited methods
+        return immediately.
+
+        :return: the wait time in seconds.
+        """
+        bucket = self.buckets.get(get_family(operation))
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
+
+    def get_metrics(self) -> T.Dict[str, RateLimitMetrics]:
+        """
+        Return the wait time metrics of the families that have been used.
+        """
+        return {
+            family: dataclasses.replace(bucket.metrics)
+            for family, bucket in self.buckets.items()
+            if bucket.metrics.n_acquired
+        }
+
+    def reset_metrics(self):
+        for bucket in self.buckets.values():
+            bucket.metrics = RateLimitMetrics()
+
+
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the rate limiter shared by all the API calls of this library.
+    """
+    return _rate_limiter
+
+
+def set_rate_limiter(rate_limiter: RateLimiter):
+    """
+    Replace the shared rate limiter, for example, to use the lower quotas
+    of your region.
+    """
+    global _rate_limiter
+    _rate_limiter = rate_limiter
+
+
+def call_api(client, operation: str, **kwargs) -> T.Any:
+    """
+    Call a boto3 client method after acquiring a token of its API family
+    from the shared rate limiter.
+
+    Example::
+
+        call_api(sfn_client, "start_execution", stateMachineArn=arn)
+    """
+    _rate_limiter.acquire(operation)
+    return getattr(client, operation)(**kwargs)
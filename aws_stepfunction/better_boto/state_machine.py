@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import typing as T
+import time
 import enum
 import dataclasses
 from datetime import datetime
@@ -9,8 +10,9 @@ from iterproxy import IterProxy
 from func_args import NOTHING, resolve_kwargs
 from boto_session_manager import BotoSesManager
 
-from .waiter import WaiterError, Waiter
+from .waiter import WaiterError, DelayStrategy, ExponentialDelay, Waiter
 from .tagging import to_tag_list
+from .rate_limit import get_rate_limiter, call_api
 
 # ------------------------------------------------------------------------------
 # Data Model
@@ -32,6 +34,23 @@ class StateMachineLoggingLevelEnum(str, enum.Enum):
     OFF = "OFF"
 
 
+class ExecutionStatusEnum(str, enum.Enum):
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    TIMED_OUT = "TIMED_OUT"
+    ABORTED = "ABORTED"
+
+
+#: an execution in these status never changes again
+TERMINAL_EXECUTION_STATUS = {
+    ExecutionStatusEnum.SUCCEEDED.value,
+    ExecutionStatusEnum.FAILED.value,
+    ExecutionStatusEnum.TIMED_OUT.value,
+    ExecutionStatusEnum.ABORTED.value,
+}
+
+
 def _ensure_state_machine_arn(bsm: BotoSesManager, name_or_arn: str) -> str:
     if name_or_arn.startswith("arn:"):
         return name_or_arn
@@ -161,7 +180,9 @@ def create_state_machine(
     if tags is not NOTHING:
         tags = to_tag_list(tags)
 
-    return bsm.stepfunctions_client.create_state_machine(
+    return call_api(
+        bsm.stepfunctions_client,
+        "create_state_machine",
         **resolve_kwargs(
             name=name,
             definition=definition,
@@ -188,7 +209,9 @@ def update_state_machine(
     - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.update_state_machine
     """
     arn = _ensure_state_machine_arn(bsm=bsm, name_or_arn=name_or_arn)
-    return bsm.stepfunctions_client.update_state_machine(
+    return call_api(
+        bsm.stepfunctions_client,
+        "update_state_machine",
         **resolve_kwargs(
             stateMachineArn=arn,
             definition=definition,
@@ -210,7 +233,9 @@ def describe_state_machine(
     """
     arn = _ensure_state_machine_arn(bsm=bsm, name_or_arn=name_or_arn)
     try:
-        response = bsm.stepfunctions_client.describe_state_machine(
+        response = call_api(
+            bsm.stepfunctions_client,
+            "describe_state_machine",
             stateMachineArn=arn,
         )
         return StateMachine.from_describe_state_machine_response(response=response)
@@ -235,7 +260,11 @@ def delete_state_machine(
     state_machine = describe_state_machine(bsm=bsm, name_or_arn=arn)
     if state_machine is None:
         return False
-    bsm.stepfunctions_client.delete_state_machine(stateMachineArn=arn)
+    call_api(
+        bsm.stepfunctions_client,
+        "delete_state_machine",
+        stateMachineArn=arn,
+    )
     return True
 
 
@@ -256,7 +285,15 @@ def _list_state_machines(
             "PageSize": page_size,
         }
     )
-    for response in response_iterator:
+    rate_limiter = get_rate_limiter()
+    response_iterator = iter(response_iterator)
+    while True:
+        # acquire a token per page, the paginator makes one call per page
+        rate_limiter.acquire("list_state_machines")
+        try:
+            response = next(response_iterator)
+        except StopIteration:
+            break
         for state_machine_data in response["stateMachines"]:
             yield StateMachine(
                 name=state_machine_data["name"],
@@ -283,16 +320,29 @@ def list_state_machines(
 def wait_delete_state_machine_to_finish(
     bsm: BotoSesManager,
     name_or_arn: str,
-    delays: int = 5,
+    delays: T.Union[int, float, DelayStrategy] = ExponentialDelay(base=1, max_delay=5),
     timeout: int = 60,
     verbose: bool = True,
+    clock: T.Callable[[], float] = time.time,
+    sleep: T.Callable[[float], T.Any] = time.sleep,
 ):
+    """
+    :param delays: the seconds between two polls, or a
+        :class:`~aws_stepfunction.better_boto.waiter.DelayStrategy`, by
+        default, 1, 2, 4, 5, 5, ... seconds.
+    """
     arn = _ensure_state_machine_arn(bsm=bsm, name_or_arn=name_or_arn)
     if verbose:  # pragma: no cover
         print(f"wait for delete state machine {arn} to finish ...")
     succeeded_status = []
     failed_status = []
-    for _ in Waiter(delays=delays, timeout=timeout, verbose=verbose):
+    for _ in Waiter(
+        delays=delays,
+        timeout=timeout,
+        verbose=verbose,
+        clock=clock,
+        sleep=sleep,
+    ):
         state_machine = describe_state_machine(bsm=bsm, name_or_arn=arn)
         if state_machine is None:
             if verbose:
@@ -3,46 +3,158 @@
 import typing as T
 import sys
 import time
+import random
 import itertools
+import dataclasses
 
 
 class WaiterError(Exception):
     pass
 
 
+# ------------------------------------------------------------------------------
+# Delay Strategy
+# ------------------------------------------------------------------------------
+class DelayStrategy:
+    """
+    The base class of the delays between two attempts of :class:`Waiter`.
+    Iterating a strategy yields the delays of one wait from the beginning,
+    so a strategy object can be reused.
+    """
+
+    def __iter__(self) -> T.Iterator[float]:  # pragma: no cover
+        raise NotImplementedError
+
+
+@dataclasses.dataclass
+class FixedDelay(DelayStrategy):
+    """
+    Always wait ``delay`` seconds.
+    """
+    delay: float = dataclasses.field(default=1)
+
+    def __iter__(self) -> T.Iterator[float]:
+        return itertools.repeat(self.delay)
+
+
+@dataclasses.dataclass
+class ExponentialDelay(DelayStrategy):
+    """
+    Wait ``base``, ``base * rate``, ``base * rate ** 2``, ... seconds, up to
+    ``max_delay`` if it is set.
+
+    :param jitter: if True, randomize each delay between half and the full
+        value, so the waiters started together don't poll together.
+    :param random: return a float in [0, 1), inject a fake one in unit test.
+    """
+    base: float = dataclasses.field(default=1)
+    rate: float = dataclasses.field(default=2)
+    max_delay: T.Optional[float] = dataclasses.field(default=None)
+    jitter: bool = dataclasses.field(default=False)
+    random: T.Callable[[], float] = dataclasses.field(default=random.random)
+
+    def __iter__(self) -> T.Iterator[float]:
+        delay = self.base
+        while True:
+            if self.max_delay is not None:
+                delay = min(delay, self.max_delay)
+            if self.jitter:
+                yield delay / 2 + delay / 2 * self.random()
+            else:
+                yield delay
+            delay = delay * self.rate
+
+
+@dataclasses.dataclass
+class DecorrelatedJitterDelay(DelayStrategy):
+    """
+    The "decorrelated jitter" back-off, each delay is a random value between
+    ``base`` and three times the previous delay, at most ``max_delay``.
+
+    Ref:
+
+    - https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+
+    :param uniform: return a random float between the two arguments, inject
+        a fake one in unit test.
+    """
+    base: float = dataclasses.field(default=1)
+    max_delay: float = dataclasses.field(default=30)
+    uniform: T.Callable[[float, float], float] = dataclasses.field(default=random.uniform)
+
+    def __iter__(self) -> T.Iterator[float]:
+        delay = self.base
+        while True:
+            delay = min(self.max_delay, self.uniform(self.base, delay * 3))
+            yield delay
+
+
+@dataclasses.dataclass
+class CappedDelay(DelayStrategy):
+    """
+    Cap the delays of another strategy at ``max_delay``.
+    """
+    strategy: T.Iterable[float] = dataclasses.field()
+    max_delay: float = dataclasses.field(default=30)
+
+    def __iter__(self) -> T.Iterator[float]:
+        for delay in self.strategy:
+            yield min(delay, self.max_delay)
+
+
+# ------------------------------------------------------------------------------
+# Waiter
+# ------------------------------------------------------------------------------
 class Waiter:
     """
     Simple retry / poll with progress.
+
+    :param delays: the seconds to sleep between two attempts, a
+        :class:`DelayStrategy`, or an iterable of the delays, it is consumed
+        lazily, one item before each sleep.
+    :param clock: the current time function, inject a fake one in unit test.
+    :param sleep: the sleep function, inject a fake one in unit test.
+    :param stream: where to write the progress, default is stdout.
     """
     def __init__(
         self,
-        delays: T.Union[int, float],
+        delays: T.Union[int, float, T.Iterable[T.Union[int, float]]],
         timeout: T.Union[int, float],
         indent: int = 0,
         verbose: bool = True,
+        clock: T.Callable[[], float] = time.time,
+        sleep: T.Callable[[float], T.Any] = time.sleep,
+        stream: T.Optional[T.TextIO] = None,
     ):
-        self.delays = itertools.repeat(delays)
+        if isinstance(delays, (int, float)):
+            self.delays = FixedDelay(delays)
+        else:
+            self.delays = delays
         self.timeout = timeout
         self.tab = " " * indent
         self.verbose = verbose
+        self.clock = clock
+        self.sleep = sleep
+        self.stream = stream
 
     def __iter__(self):
         yield 0, 0
-        start = time.time()
+        start = self.clock()
         end = start + self.timeout
         for attempt, delay in enumerate(self.delays, start=1):
-            now = time.time()
+            now = self.clock()
             remaining = end - now
-            if remaining < 0:
+            if remaining <= 0:
                 raise TimeoutError(f"timed out in {self.timeout} seconds!")
             else:
-                time.sleep(min(delay, remaining))
+                self.sleep(min(delay, remaining))
                 elapsed = int(now - start + delay)
                 if self.verbose:
-                    sys.stdout.write(
+                    stream = sys.stdout if self.stream is None else self.stream
+                    stream.write(
                         f"\r{self.tab}on {attempt} th attempt, "
                         f"elapsed {elapsed} seconds, "
                         f"remain {self.timeout - elapsed} seconds ...\n"
                     )
-                    sys.stdout.flush()
+                    stream.flush()
                 yield attempt, int(elapsed)
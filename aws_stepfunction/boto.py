@@ -4,11 +4,13 @@
 boto3 helpers.
 """
 
+import typing as T
 import time
 import attr
 from boto_session_manager import BotoSesManager as BSM, AwsServiceEnum
 
 from .logger import logger
+from .better_boto.waiter import DelayStrategy, ExponentialDelay, Waiter
 
 
 class StateMachineNotExist(Exception):
@@ -216,23 +218,44 @@ class BotoMan:
         name: str,
         period: int = 5,
         retry: int = 2,
+        delays: T.Optional[DelayStrategy] = None,
+        clock: T.Callable[[], float] = time.time,
+        sleep: T.Callable[[float], T.Any] = time.sleep,
         _indent: int = 0,
     ):
         """
         Wait a cloudformation stack to reach "success" status.
+
+        :param period: the maximum seconds between two status checks.
+        :param retry: time out after ``period * retry`` seconds.
+        :param delays: the delays between two status checks, by default,
+            it starts from 1 second and doubles up to ``period``.
+        :param clock: see :class:`~aws_stepfunction.better_boto.waiter.Waiter`.
+        :param sleep: see :class:`~aws_stepfunction.better_boto.waiter.Waiter`.
         """
+        if delays is None:
+            delays = ExponentialDelay(base=1, max_delay=period)
+        timeout = period * retry
         logger.info(f"wait {name!r} stack to complete ... ", _indent)
-        for ith in range(retry):
-            logger.info(f"elapsed {ith * period} seconds ...", _indent + 1)
-            time.sleep(period)
-            stack_status = self.get_cloudformation_stack_status(name)
-            if stack_status in [
-                "CREATE_COMPLETE",
-                "UPDATE_COMPLETE",
-                "DELETE_COMPLETE",
-            ]:
-                return
-        raise TimeoutError(
-            f"the cloudformation stack never reach success state, "
-            f"timed out after {period * retry} seconds"
-        )
+        try:
+            for attempt, elapsed in Waiter(
+                delays=delays,
+                timeout=timeout,
+                verbose=False,
+                clock=clock,
+                sleep=sleep,
+            ):
+                if attempt:
+                    logger.info(f"elapsed {elapsed} seconds ...", _indent + 1)
+                stack_status = self.get_cloudformation_stack_status(name)
+                if stack_status in [
+                    "CREATE_COMPLETE",
+                    "UPDATE_COMPLETE",
+                    "DELETE_COMPLETE",
+                ]:
+                    return
+        except TimeoutError:
+            raise TimeoutError(
+                f"the cloudformation stack never reach success state, "
+                f"timed out after {timeout} seconds"
+            )
@@ -0,0 +1,475 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bulk operations on many state machines.
+
+:func:`deploy_state_machines` runs the describe / create / update calls of
+many :class:`~aws_stepfunction.state_machine.StateMachine` on a bounded
+thread pool. All the workers share one :class:`AdaptiveBackoff`, when the
+Step Functions API returns ``ThrottlingException``, the shared delay grows
+so every worker slows down, and it shrinks again after the calls succeed.
+
+Usage::
+
+    result = deploy_state_machines(state_machines, bsm, max_workers=8)
+    print(result.to_text())
+
+:func:`start_executions` streams the ``start_execution`` calls of many
+payloads through a bounded thread pool in the same way::
+
+    for res in start_executions(state_machine, bsm, payloads):
+        print(res.index, res.execution_arn)
+"""
+
+import typing as T
+import json
+import time
+import hashlib
+import random
+import threading
+import concurrent.futures
+
+import attr
+from boto_session_manager import AwsServiceEnum
+
+from .better_boto.rate_limit import call_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from boto_session_manager import BotoSesManager
+    from .state_machine import StateMachine
+
+#: the error codes of the AWS API throttling errors
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "Throttling",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Check if the error is a botocore ``ClientError`` with a throttling
+    error code.
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code in THROTTLING_ERROR_CODES:
+            return True
+    return error.__class__.__name__ in THROTTLING_ERROR_CODES
+
+
+def is_execution_already_exists_error(error: Exception) -> bool:
+    """
+    Check if the error is the ``ExecutionAlreadyExists`` error of
+    ``start_execution``.
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code == "ExecutionAlreadyExists":
+            return True
+    return error.__class__.__name__ == "ExecutionAlreadyExists"
+
+
+@attr.s
+class AdaptiveBackoff:
+    """
+    A back-off delay shared by many threads.
+
+    Every call waits for the current delay (with jitter) first. A throttling
+    error multiplies the delay by ``backoff_rate`` (at least ``base_delay``,
+    at most ``max_delay``) and the call is retried, a successful call
+    multiplies it by ``recover_rate`` until it drops below ``base_delay``.
+
+    :param max_attempts: the maximum number of attempts of a call, the last
+        throttling error is raised.
+    :param sleep: the sleep function, inject a fake one in unit test.
+    :param jitter: return a float in [0, 1) to randomize the delay.
+    """
+    base_delay: float = attr.ib(default=0.1)
+    max_delay: float = attr.ib(default=20.0)
+    backoff_rate: float = attr.ib(default=2.0)
+    recover_rate: float = attr.ib(default=0.8)
+    max_attempts: int = attr.ib(default=10)
+    sleep: T.Callable[[float], T.Any] = attr.ib(default=time.sleep)
+    jitter: T.Callable[[], float] = attr.ib(default=random.random)
+
+    delay: float = attr.ib(default=0.0, init=False)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False, repr=False)
+
+    def on_throttle(self):
+        with self._lock:
+            self.delay = min(
+                self.max_delay,
+                max(self.base_delay, self.delay * self.backoff_rate),
+            )
+
+    def on_success(self):
+        with self._lock:
+            if self.delay:
+                self.delay *= self.recover_rate
+                if self.delay < self.base_delay:
+                    self.delay = 0.0
+
+    def wait(self):
+        delay = self.delay
+        if delay:
+            # equal jitter, spread the retries of the workers
+            self.sleep(delay / 2 + delay / 2 * self.jitter())
+
+    def call(self, func: T.Callable, *args, **kwargs) -> T.Tuple[T.Any, int]:
+        """
+        Call the function, retry on throttling error.
+
+        :return: the return value and the number of throttling errors.
+        """
+        n_throttled = 0
+        while True:
+            self.wait()
+            try:
+                value = func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttling_error(e):
+                    raise e
+                n_throttled += 1
+                self.on_throttle()
+                if n_throttled >= self.max_attempts:
+                    raise e
+                continue
+            self.on_success()
+            return value, n_throttled
+
+
+@attr.s
+class DeployResult:
+    """
+    The deployment result of one state machine.
+
+    :param action: ``"create"``, ``"update"``, ``"skip"``, or None if failed.
+    :param error: the exception if failed.
+    :param n_throttled: the number of throttling errors.
+    :param elapsed: the time spent in seconds.
+    """
+    name: str = attr.ib()
+    action: T.Optional[str] = attr.ib(default=None)
+    response: T.Optional[dict] = attr.ib(default=None, repr=False)
+    error: T.Optional[Exception] = attr.ib(default=None)
+    n_throttled: int = attr.ib(default=0)
+    elapsed: float = attr.ib(default=0.0)
+
+    @property
+    def is_succeeded(self) -> bool:
+        return self.error is None
+
+
+@attr.s
+class BulkDeployResult:
+    """
+    The result of :func:`deploy_state_machines`, one row per state machine
+    in the input order.
+    """
+    results: T.List[DeployResult] = attr.ib(factory=list)
+
+    @property
+    def succeeded(self) -> T.List[DeployResult]:
+        return [result for result in self.results if result.is_succeeded]
+
+    @property
+    def failed(self) -> T.List[DeployResult]:
+        return [result for result in self.results if not result.is_succeeded]
+
+    @property
+    def n_throttled(self) -> int:
+        return sum(result.n_throttled for result in self.results)
+
+    def to_text(self) -> str:
+        """
+        Format the results as a plain text table.
+        """
+        header = ("name", "action", "throttled", "elapsed", "error")
+        rows = [
+            (
+                result.name,
+                result.action or "failed",
+                str(result.n_throttled),
+                f"{result.elapsed:.3f}",
+                "" if result.error is None else repr(result.error),
+            )
+            for result in self.results
+        ]
+        widths = [
+            max(len(row[ith]) for row in [header] + rows)
+            for ith in range(len(header))
+        ]
+        lines = [
+            "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+            for row in [header] + rows
+        ]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines)
+
+
+def _deploy_one(
+    state_machine: 'StateMachine',
+    bsm: 'BotoSesManager',
+    backoff: AdaptiveBackoff,
+    minify: bool,
+    skip_unchanged: bool,
+    deploy_magic: bool,
+) -> DeployResult:
+    result = DeployResult(name=state_machine.name)
+
+    def call(func: T.Callable, *args, **kwargs) -> T.Any:
+        value, n_throttled = backoff.call(func, *args, **kwargs)
+        result.n_throttled += n_throttled
+        return value
+
+    start = time.perf_counter()
+    try:
+        state_machine.check_definition_size(minify=minify)
+        if deploy_magic:
+            state_machine._deploy_magic(bsm)
+        result.response = state_machine._deploy_state_machine(
+            bsm, minify=minify, skip_unchanged=skip_unchanged, call=call,
+        )
+        result.action = result.response["_deploy_action"]
+    except Exception as e:
+        result.error = e
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def deploy_state_machines(
+    state_machines: T.Iterable['StateMachine'],
+    bsm: 'BotoSesManager',
+    max_workers: int = 8,
+    minify: bool = False,
+    skip_unchanged: bool = True,
+    deploy_magic: bool = False,
+    backoff: T.Optional[AdaptiveBackoff] = None,
+) -> BulkDeployResult:
+    """
+    Deploy many state machines concurrently. A failed state machine doesn't
+    stop the others, check ``result.failed``.
+
+    :param max_workers: the size of the thread pool.
+    :param skip_unchanged: see
+        :meth:`~aws_stepfunction.state_machine.StateMachine.deploy`, by
+        default, the unchanged state machines are not updated.
+    :param deploy_magic: also deploy the magic tasks of each state machine,
+        it deploys a CloudFormation stack per state machine.
+    :param backoff: the shared back-off of the throttling errors.
+    """
+    if backoff is None:
+        backoff = AdaptiveBackoff()
+    state_machines = list(state_machines)
+    # boto session is not thread safe, create the client in this thread,
+    # the workers share the cached (thread safe) client
+    bsm.get_client(AwsServiceEnum.SFN)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _deploy_one,
+                state_machine,
+                bsm,
+                backoff,
+                minify,
+                skip_unchanged,
+                deploy_magic,
+            )
+            for state_machine in state_machines
+        ]
+        return BulkDeployResult(results=[future.result() for future in futures])
+
+
+@attr.s
+class ExecutionRequest:
+    """
+    The input of one execution of :func:`start_executions`.
+
+    :param payload: the execution input in python dictionary.
+    :param name: the execution name, by default, Step Functions generates
+        it, or it is derived from the batch id, see :func:`get_execution_name`.
+    :param trace_header: the AWS X-Ray trace header.
+    """
+    payload: T.Optional[dict] = attr.ib(default=None)
+    name: T.Optional[str] = attr.ib(default=None)
+    trace_header: T.Optional[str] = attr.ib(default=None)
+
+
+@attr.s
+class StartExecutionResult:
+    """
+    The result of one ``start_execution`` call.
+
+    :param index: the position of the payload in the input iterable.
+    :param name: the execution name, None if Step Functions generated it.
+    :param response: the ``start_execution`` response.
+    :param error: the exception if failed.
+    :param n_throttled: the number of throttling errors.
+    :param already_exists: True if the execution named after the batch id
+        was started before and closed, ``start_execution`` failed with
+        ``ExecutionAlreadyExists``, it is not started again, the response is
+        None, see :func:`get_execution_name`.
+    :param state_machine_arn: the state machine ARN.
+    """
+    index: int = attr.ib()
+    name: T.Optional[str] = attr.ib(default=None)
+    response: T.Optional[dict] = attr.ib(default=None, repr=False)
+    error: T.Optional[Exception] = attr.ib(default=None)
+    n_throttled: int = attr.ib(default=0)
+    already_exists: bool = attr.ib(default=False)
+    state_machine_arn: T.Optional[str] = attr.ib(default=None, repr=False)
+
+    @property
+    def is_succeeded(self) -> bool:
+        return self.error is None
+
+    @property
+    def execution_arn(self) -> T.Optional[str]:
+        if self.response is None:
+            if self.already_exists:
+                return "{}:{}".format(
+                    self.state_machine_arn.replace(
+                        ":stateMachine:", ":execution:", 1
+                    ),
+                    self.name,
+                )
+            return None
+        return self.response["executionArn"]
+
+
+def get_execution_name(batch_id: str, index: int, payload: T.Any = None) -> str:
+    """
+    The deterministic execution name of the ``index`` th payload of a batch,
+    ``{batch_id}-{index}-{digest}``, at most 80 characters, the batch id is
+    truncated if needed. The digest is the first 12 hex characters of the
+    SHA256 of the canonical (key sorted) payload JSON.
+
+    For a standard state machine, the execution names are unique, so
+    retrying the same batch doesn't start a duplicated execution:
+
+    - while the execution is ``RUNNING``, ``start_execution`` with the same
+      name and input returns the existing execution.
+    - once the execution is closed, ``start_execution`` fails with
+      ``ExecutionAlreadyExists``, :func:`start_executions` reports it as
+      ``result.already_exists``, not as an error.
+
+    An express state machine doesn't deduplicate the execution names, every
+    retry starts a new execution. The duplicated payloads in a batch have
+    different indexes, they are different executions. Use a new batch id
+    for a new batch, an execution name can't be reused in 90 days.
+    """
+    content = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    suffix = f"-{index}-{digest}"
+    return batch_id[:80 - len(suffix)] + suffix
+
+
+def _start_one(
+    sfn_client,
+    state_machine_arn: str,
+    index: int,
+    request: T.Union[dict, ExecutionRequest],
+    batch_id: T.Optional[str],
+    backoff: AdaptiveBackoff,
+) -> StartExecutionResult:
+    if not isinstance(request, ExecutionRequest):
+        request = ExecutionRequest(payload=request)
+    result = StartExecutionResult(
+        index=index, name=request.name, state_machine_arn=state_machine_arn,
+    )
+    kwargs = dict(stateMachineArn=state_machine_arn)
+    try:
+        if request.payload is not None:
+            kwargs["input"] = json.dumps(request.payload)
+        if result.name is None and batch_id is not None:
+            result.name = get_execution_name(batch_id, index, request.payload)
+        if result.name is not None:
+            kwargs["name"] = result.name
+        if request.trace_header is not None:
+            kwargs["traceHeader"] = request.trace_header
+        result.response, result.n_throttled = backoff.call(
+            call_api, sfn_client, "start_execution", **kwargs
+        )
+    except Exception as e:
+        # the name is derived from the batch id, index and payload digest,
+        # the existing execution is the one of a previous try of this batch
+        if (
+            request.name is None
+            and batch_id is not None
+            and is_execution_already_exists_error(e)
+        ):
+            result.already_exists = True
+        else:
+            result.error = e
+    return result
+
+
+def start_executions(
+    state_machine: 'StateMachine',
+    bsm: 'BotoSesManager',
+    payloads: T.Iterable[T.Union[dict, ExecutionRequest]],
+    max_workers: int = 8,
+    batch_id: T.Optional[str] = None,
+    backoff: T.Optional[AdaptiveBackoff] = None,
+) -> T.Iterator[StartExecutionResult]:
+    """
+    Start one execution per payload concurrently, yield the results as
+    the calls complete, so the order is not the input order, use
+    ``result.index``. A failed call doesn't stop the others, check
+    ``result.error``.
+
+    The payloads are consumed lazily, at most ``2 * max_workers`` calls are
+    in flight, so it works with a large or endless iterable. The client and
+    the state machine ARN are resolved once, the calls go through the
+    shared rate limiter (see :mod:`aws_stepfunction.better_boto.rate_limit`)
+    and the throttling errors are retried with ``backoff``. Unlike
+    :meth:`~aws_stepfunction.state_machine.StateMachine.execute`, nothing
+    is logged.
+
+    :param payloads: the execution input dicts, or :class:`ExecutionRequest`
+        to set the name and trace header.
+    :param batch_id: if set, the execution without a name is named after
+        the batch id and its index, see :func:`get_execution_name`. For a
+        standard state machine, retrying the same batch with the same batch
+        id doesn't start a duplicated execution, the executions started and
+        closed before are ``result.already_exists``. An express state
+        machine doesn't deduplicate the names. Otherwise, Step Functions
+        generates an uuid.
+    :param backoff: the shared back-off of the throttling errors.
+    """
+    if backoff is None:
+        backoff = AdaptiveBackoff()
+    sfn_client = bsm.get_client(AwsServiceEnum.SFN)
+    state_machine_arn = state_machine.get_state_machine_arn(bsm)
+    requests = enumerate(payloads)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+
+        def submit_next() -> bool:
+            for index, request in requests:
+                pending.add(executor.submit(
+                    _start_one,
+                    sfn_client,
+                    state_machine_arn,
+                    index,
+                    request,
+                    batch_id,
+                    backoff,
+                ))
+                return True
+            return False
+
+        while len(pending) < 2 * max_workers and submit_next():
+            pass
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.remove(future)
+                submit_next()
+                yield future.result()
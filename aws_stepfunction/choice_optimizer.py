@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""
+Static Choice rule optimizer.
+
+Generated ``Choice`` states often contain nested ``and_(and_(...))``,
+duplicated data test expressions and rules shadowed by an earlier rule.
+:func:`optimize_choice` rewrites the rules into an equivalent and smaller
+form:
+
+- flatten the nested ``And`` / ``Or``, ``And(And(a, b), c)`` -> ``And(a, b, c)``
+- remove the duplicated rules in an ``And`` / ``Or``
+- unwrap the ``And`` / ``Or`` with one rule and ``Not(Not(a))``
+- detect the unreachable top level rules, a rule is unreachable if every
+  input that matches it already matches an earlier rule
+- optionally, reorder the cheap presence / type checks first
+
+The input ``Choice`` state and its rules are not modified.
+
+Usage::
+
+    result = optimize_choice(choice_state)
+    print(result.unreachable)
+    workflow._states[choice_state.id] = result.choice
+"""
+
+import typing as T
+import json
+import math
+
+import attr
+
+from .constant import Constant as C
+from .choice_rule import ChoiceRule, DataTestExpression, And, Or, Not
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .state import Choice
+
+RuleKey = T.Tuple
+
+
+def rule_key(rule: ChoiceRule) -> RuleKey:
+    """
+    A hashable key of the rule logic, the ``Next`` is ignored. Two rules with
+    the same key are equivalent.
+    """
+    if isinstance(rule, DataTestExpression):
+        return (
+            C.Variable,
+            rule.variable,
+            rule.operator,
+            json.dumps(rule.expected, sort_keys=True),
+        )
+    if isinstance(rule, And):
+        return (C.And,) + tuple(rule_key(sub_rule) for sub_rule in rule.rules)
+    if isinstance(rule, Or):
+        return (C.Or,) + tuple(rule_key(sub_rule) for sub_rule in rule.rules)
+    if isinstance(rule, Not):
+        return (C.Not, rule_key(rule.rule))
+    raise TypeError(f"{rule!r} is not a supported choice rule!")
+
+
+def count_expressions(rule: ChoiceRule) -> int:
+    """
+    The number of data test expressions in the rule.
+    """
+    if isinstance(rule, DataTestExpression):
+        return 1
+    if isinstance(rule, (And, Or)):
+        return sum(count_expressions(sub_rule) for sub_rule in rule.rules)
+    return count_expressions(rule.rule)
+
+
+# ------------------------------------------------------------------------------
+# Rewrite
+# ------------------------------------------------------------------------------
+def _cost(rule: ChoiceRule) -> int:
+    """
+    The relative evaluation cost of a rule, used to reorder the rules.
+    """
+    if isinstance(rule, DataTestExpression):
+        operator = rule.operator
+        if operator == C.IsPresent:
+            return 0
+        if operator in (C.IsNull, C.IsNumeric, C.IsString, C.IsBoolean):
+            return 1
+        if (
+            operator.endswith("Path")
+            or operator == C.StringMatches
+            or operator.startswith("Timestamp")
+            or operator == C.IsTimestamp
+        ):
+            return 3
+        return 2
+    return 4
+
+
+def _simplify(rule: ChoiceRule, reorder: bool) -> ChoiceRule:
+    """
+    Return a simplified copy of the rule, the ``Next`` is not set.
+    """
+    if isinstance(rule, DataTestExpression):
+        return attr.evolve(rule, next=None, next_state=None)
+
+    if isinstance(rule, Not):
+        sub_rule = _simplify(rule.rule, reorder)
+        if isinstance(sub_rule, Not):
+            return sub_rule.rule
+        return Not(rule=sub_rule)
+
+    klass = rule.__class__
+    sub_rules = list()
+    keys = set()
+    for sub_rule in rule.rules:
+        sub_rule = _simplify(sub_rule, reorder)
+        # And(And(a, b), c) -> And(a, b, c)
+        flatten = sub_rule.rules if isinstance(sub_rule, klass) else [sub_rule]
+        for item in flatten:
+            # And(a, b, a) -> And(a, b), the second "a" is always True
+            # when it is evaluated, same for Or
+            key = rule_key(item)
+            if key not in keys:
+                keys.add(key)
+                sub_rules.append(item)
+    if reorder:
+        sub_rules.sort(key=_cost)
+    if len(sub_rules) == 1:
+        return sub_rules[0]
+    return klass(rules=sub_rules)
+
+
+# ------------------------------------------------------------------------------
+# Implication
+# ------------------------------------------------------------------------------
+_NUMERIC_INTERVAL_OPERATORS = {
+    C.NumericEquals,
+    C.NumericGreaterThan,
+    C.NumericGreaterThanEquals,
+    C.NumericLessThan,
+    C.NumericLessThanEquals,
+}
+
+Interval = T.Tuple[float, bool, float, bool]  # low, low open, high, high open
+
+
+def _numeric_interval(rule: DataTestExpression) -> T.Optional[Interval]:
+    if rule.operator not in _NUMERIC_INTERVAL_OPERATORS:
+        return None
+    value = rule.expected
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    if rule.operator == C.NumericEquals:
+        return (value, False, value, False)
+    if rule.operator == C.NumericGreaterThan:
+        return (value, True, math.inf, True)
+    if rule.operator == C.NumericGreaterThanEquals:
+        return (value, False, math.inf, True)
+    if rule.operator == C.NumericLessThan:
+        return (-math.inf, True, value, True)
+    return (-math.inf, True, value, False)
+
+
+def _is_sub_interval(a: Interval, b: Interval) -> bool:
+    """
+    Check if interval a is inside interval b.
+    """
+    a_low, a_low_open, a_high, a_high_open = a
+    b_low, b_low_open, b_high, b_high_open = b
+    if a_low < b_low or (a_low == b_low and b_low_open and not a_low_open):
+        return False
+    if a_high > b_high or (a_high == b_high and b_high_open and not a_high_open):
+        return False
+    return True
+
+
+def _implies(a: ChoiceRule, b: ChoiceRule) -> bool:
+    """
+    Check if every input that matches rule a also matches rule b.
+    """
+    if rule_key(a) == rule_key(b):
+        return True
+    if isinstance(a, DataTestExpression) and isinstance(b, DataTestExpression):
+        if a.variable != b.variable:
+            return False
+        # any passed test (except IsPresent false) means the variable exists
+        if b.operator == C.IsPresent and b.expected is True:
+            return not (a.operator == C.IsPresent and a.expected is False)
+        a_interval, b_interval = _numeric_interval(a), _numeric_interval(b)
+        if a_interval is None or b_interval is None:
+            return False
+        return _is_sub_interval(a_interval, b_interval)
+    return False
+
+
+def _conjuncts(rule: ChoiceRule) -> T.List[ChoiceRule]:
+    return rule.rules if isinstance(rule, And) else [rule]
+
+
+def _disjuncts(rule: ChoiceRule) -> T.List[ChoiceRule]:
+    return rule.rules if isinstance(rule, Or) else [rule]
+
+
+def is_shadowed_by(rule: ChoiceRule, earlier: ChoiceRule) -> bool:
+    """
+    Check if every input that matches the rule also matches the earlier rule,
+    so the rule is never chosen. It is a conservative check, it may return
+    False for a shadowed rule, but never True for a reachable rule.
+    """
+    # every branch of the rule has to be covered
+    for rule_disjunct in _disjuncts(rule):
+        covered = False
+        # any branch of the earlier rule covers it
+        for earlier_disjunct in _disjuncts(earlier):
+            # every condition of the earlier branch is implied by a
+            # condition of the rule branch
+            if all(
+                any(
+                    _implies(rule_conjunct, earlier_conjunct)
+                    for rule_conjunct in _conjuncts(rule_disjunct)
+                )
+                for earlier_conjunct in _conjuncts(earlier_disjunct)
+            ):
+                covered = True
+                break
+        if not covered:
+            return False
+    return True
+
+
+# ------------------------------------------------------------------------------
+# Optimize
+# ------------------------------------------------------------------------------
+@attr.s
+class ChoiceOptimizationResult:
+    """
+    The result of :func:`optimize_choice`.
+
+    :param choice: the optimized ``Choice`` state.
+    :param unreachable: the index of the unreachable rules in the original
+        ``Choice.choices``.
+    :param n_expression_before: the number of data test expressions before.
+    :param n_expression_after: the number of data test expressions after.
+    """
+    choice: 'Choice' = attr.ib()
+    unreachable: T.List[int] = attr.ib(factory=list)
+    n_expression_before: int = attr.ib(default=0)
+    n_expression_after: int = attr.ib(default=0)
+
+
+def optimize_choice(
+    state: 'Choice',
+    reorder: bool = False,
+    remove_unreachable: bool = False,
+) -> ChoiceOptimizationResult:
+    """
+    Optimize the rules of a ``Choice`` state.
+
+    :param reorder: move the cheap ``IsPresent`` and type checks to the front
+        of an ``And`` / ``Or``. The matched ``Next`` doesn't change, but it
+        may change which inputs fail with ``States.Runtime`` because of
+        a missing variable.
+    :param remove_unreachable: remove the unreachable rules. It is off by
+        default, because their ``Next`` states may become unreachable in the
+        workflow and AWS rejects a definition with an unreachable state.
+        Also, an unreachable rule is never chosen, but evaluating it can
+        still fail with ``States.Runtime`` if its variable is missing, the
+        input then goes to the later rules or ``Default`` instead.
+    """
+    choices = list()
+    unreachable = list()
+    for ith, rule in enumerate(state.choices):
+        new_rule = _simplify(rule, reorder)
+        new_rule = attr.evolve(
+            new_rule, next=rule.next, next_state=rule._next_state,
+        )
+        if any(is_shadowed_by(new_rule, earlier) for _, earlier in choices):
+            unreachable.append(ith)
+            if remove_unreachable:
+                continue
+        choices.append((ith, new_rule))
+    choice = attr.evolve(state, choices=[rule for _, rule in choices])
+    return ChoiceOptimizationResult(
+        choice=choice,
+        unreachable=unreachable,
+        n_expression_before=sum(
+            count_expressions(rule) for rule in state.choices
+        ),
+        n_expression_after=sum(
+            count_expressions(rule) for rule in choice.choices
+        ),
+    )
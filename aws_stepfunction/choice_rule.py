@@ -10,8 +10,8 @@ import attr
 import attr.validators as vs
 
 from . import exc
+from . import jsonpath
 from .constant import Constant as C, TestExpressionEnum
-from .utils import is_json_path
 from .model import StepFunctionObject
 
 if T.TYPE_CHECKING: # pragma: no cover
@@ -68,8 +68,8 @@ __a_2_data_test_expression = None
 
 
 def _is_json_path(inst, attr, value):
-    if not is_json_path(value):
-        raise exc.ValidationError
+    if not jsonpath.is_valid(value):
+        raise exc.ValidationError(f"{value!r} is not a valid JSON path!")
 
 
 @attr.s
@@ -108,8 +108,11 @@ class DataTestExpression(ChoiceRule):
 
     def _check_expected(self):
         if self.operator.endswith("Path"):
-            if not is_json_path(self.expected):
-                raise exc.ValidationError
+            if not jsonpath.is_valid(self.expected):
+                raise exc.ValidationError(
+                    f"{self.operator} = {self.expected!r} "
+                    f"is not a valid JSON path!"
+                )
 
     def _pre_serialize_validation(self):
         self._check_expected()
@@ -466,7 +469,9 @@ class BooleanExpression(ChoiceRule):
 
 @attr.s
 class And(BooleanExpression):
-    rules: T.List['ChoiceRule'] = attr.ib(factory=list)
+    rules: T.List['ChoiceRule'] = attr.ib(
+        factory=list, metadata={C.NESTED: True},
+    )
 
     _field_order = [
         C.And,
@@ -482,7 +487,9 @@ class And(BooleanExpression):
 
 @attr.s
 class Or(BooleanExpression):
-    rules: T.List['ChoiceRule'] = attr.ib(factory=list)
+    rules: T.List['ChoiceRule'] = attr.ib(
+        factory=list, metadata={C.NESTED: True},
+    )
 
     _field_order = [
         C.Or,
@@ -498,7 +505,9 @@ class Or(BooleanExpression):
 
 @attr.s
 class Not(BooleanExpression):
-    rule: T.Optional['ChoiceRule'] = attr.ib(default=None)
+    rule: T.Optional['ChoiceRule'] = attr.ib(
+        default=None, metadata={C.NESTED: True},
+    )
 
     _field_order = [
         C.Not,
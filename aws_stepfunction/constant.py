@@ -106,6 +106,7 @@ class ErrorCodeEnum(StringEnum):
     BranchFailedError = "States.BranchFailed"
     NoChoiceMatchedError = "States.NoChoiceMatched"
     IntrinsicFailureError = "States.IntrinsicFailure"
+    RuntimeError = "States.Runtime"
 
     DataLimitExceededError = "States.DataLimitExceeded"
 
@@ -271,6 +272,7 @@ class Constant:
     BranchFailedError = ErrorCodeEnum.BranchFailedError.value
     NoChoiceMatchedError = ErrorCodeEnum.NoChoiceMatchedError.value
     IntrinsicFailureError = ErrorCodeEnum.IntrinsicFailureError.value
+    RuntimeError = ErrorCodeEnum.RuntimeError.value
     DataLimitExceededError = ErrorCodeEnum.DataLimitExceededError.value
 
     LambdaUnknownError = ErrorCodeEnum.LambdaUnknownError.value
@@ -343,3 +345,7 @@ class Constant:
     # Python library implementation constant
     Sep = "____"
     ALIAS = "alias"
+    NESTED = "nested"
+
+    # Step Functions service quota
+    DEFINITION_SIZE_LIMIT = 1024 * 1024  # 1 MB
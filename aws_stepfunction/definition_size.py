@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+Definition size budget analyzer.
+
+AWS Step Functions rejects a state machine definition larger than 1 MB
+(``C.DEFINITION_SIZE_LIMIT``). This module measures the byte size of the
+definition JSON (the same JSON uploaded by
+:meth:`~aws_stepfunction.state_machine.StateMachine.create`) per state,
+per ``Parallel`` branch and per ``Map`` iterator, and finds the
+largest contributors, without calling any AWS API.
+
+Usage::
+
+    report = analyze_definition_size(workflow)
+    print(report.to_text())
+    report.raise_for_limit()
+"""
+
+import typing as T
+import json
+import collections
+
+import attr
+
+from . import exc
+from .constant import Constant as C
+from .model import DEFAULT_SEPARATORS
+from .state import Parallel, Map
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .workflow import Workflow
+    from .state import StateType
+
+
+def _n_bytes(s: str) -> int:
+    return len(s.encode("utf-8"))
+
+
+@attr.s
+class FieldSize:
+    """
+    The byte size of a top level field of a state, including the key.
+
+    :param path: the path of the owner state, for example
+        ``Parallel-1.Branches[0].Task-1``
+    """
+    path: str = attr.ib()
+    field: str = attr.ib()
+    bytes: int = attr.ib()
+
+
+@attr.s
+class StateSize:
+    """
+    The byte size of a state.
+
+    :param total_bytes: the size of the ``"state_id": {...}`` entry,
+        including the nested branches / iterator.
+    :param own_bytes: ``total_bytes`` minus the nested branches / iterator.
+    :param fields: byte size of each top level field.
+    """
+    path: str = attr.ib()
+    id: str = attr.ib()
+    type: str = attr.ib()
+    total_bytes: int = attr.ib()
+    own_bytes: int = attr.ib()
+    fields: T.List[FieldSize] = attr.ib(factory=list)
+
+
+@attr.s
+class SubWorkflowSize:
+    """
+    The byte size of a ``Parallel`` branch or a ``Map`` iterator.
+
+    :param path: for example ``Parallel-1.Branches[0]``, ``Map-1.Iterator``
+    """
+    path: str = attr.ib()
+    total_bytes: int = attr.ib()
+    n_state: int = attr.ib()
+
+
+@attr.s
+class RepeatedBlock:
+    """
+    A ``Retry`` or ``Catch`` block that is defined multiple times
+    with exactly the same content, for example, the ``Retry`` added by
+    :class:`~aws_stepfunction.magic.LambdaTask`.
+    """
+    field: str = attr.ib()
+    json: str = attr.ib()
+    count: int = attr.ib()
+    bytes: int = attr.ib()
+
+    @property
+    def total_bytes(self) -> int:
+        return self.count * self.bytes
+
+
+@attr.s
+class DefinitionSizeReport:
+    """
+    The result of :func:`analyze_definition_size`.
+    """
+    workflow_id: str = attr.ib()
+    total_bytes: int = attr.ib()
+    limit: int = attr.ib()
+    states: T.List[StateSize] = attr.ib(factory=list)
+    sub_workflows: T.List[SubWorkflowSize] = attr.ib(factory=list)
+    repeated_blocks: T.List[RepeatedBlock] = attr.ib(factory=list)
+
+    @property
+    def is_over_limit(self) -> bool:
+        return self.total_bytes > self.limit
+
+    def top_states(self, n: int = 10) -> T.List[StateSize]:
+        """
+        The states with the largest ``own_bytes``.
+        """
+        return sorted(self.states, key=lambda x: x.own_bytes, reverse=True)[:n]
+
+    def top_fields(self, n: int = 10) -> T.List[FieldSize]:
+        """
+        The state fields (``Parameters``, ``Retry`` ...) with the largest size.
+        """
+        fields = [
+            field
+            for state in self.states
+            for field in state.fields
+            if field.field not in (C.Branches, C.Iterator)
+        ]
+        return sorted(fields, key=lambda x: x.bytes, reverse=True)[:n]
+
+    def top_repeated_blocks(self, n: int = 10) -> T.List[RepeatedBlock]:
+        return sorted(
+            self.repeated_blocks,
+            key=lambda x: x.total_bytes,
+            reverse=True,
+        )[:n]
+
+    def to_text(self, n: int = 5) -> str:
+        """
+        Human readable summary of the largest contributors.
+        """
+        lines = [
+            f"Workflow(id={self.workflow_id!r}) definition size: "
+            f"{self.total_bytes} bytes, "
+            f"limit {self.limit} bytes ({self.total_bytes / self.limit:.1%})",
+            "largest states:",
+        ]
+        for state in self.top_states(n):
+            lines.append(f"  {state.own_bytes:>10} bytes  {state.path}")
+        lines.append("largest fields:")
+        for field in self.top_fields(n):
+            lines.append(f"  {field.bytes:>10} bytes  {field.path}.{field.field}")
+        if self.sub_workflows:
+            lines.append("largest branches / iterators:")
+            for sub in sorted(
+                self.sub_workflows,
+                key=lambda x: x.total_bytes,
+                reverse=True,
+            )[:n]:
+                lines.append(f"  {sub.total_bytes:>10} bytes  {sub.path}")
+        if self.repeated_blocks:
+            lines.append("repeated blocks:")
+            for block in self.top_repeated_blocks(n):
+                lines.append(
+                    f"  {block.total_bytes:>10} bytes  "
+                    f"{block.count} x {block.field} {block.json[:60]}"
+                )
+        return "\n".join(lines)
+
+    def raise_for_limit(self):
+        """
+        Raise :class:`~aws_stepfunction.exc.DefinitionSizeLimitExceededError`
+        if the definition is larger than the limit.
+        """
+        if self.is_over_limit:
+            raise exc.DefinitionSizeLimitExceededError(
+                f"Workflow(id={self.workflow_id}): definition size "
+                f"{self.total_bytes} bytes exceeds the limit "
+                f"{self.limit} bytes!\n{self.to_text()}"
+            )
+
+
+class _Analyzer:
+    """
+    Walk the workflow once, measure each node bottom up.
+    """
+
+    def __init__(self, separators: T.Tuple[str, str]):
+        self.separators = separators
+        self.item_sep_bytes = _n_bytes(separators[0])
+        self.key_sep_bytes = _n_bytes(separators[1])
+        self.states: T.List[StateSize] = list()
+        self.sub_workflows: T.List[SubWorkflowSize] = list()
+        self.blocks: T.Dict[T.Tuple[str, str], int] = collections.Counter()
+
+    def _dumps(self, value: T.Any) -> str:
+        return json.dumps(value, separators=self.separators)
+
+    def _entry_bytes(self, key: str, value_bytes: int) -> int:
+        return _n_bytes(json.dumps(key)) + self.key_sep_bytes + value_bytes
+
+    def _container_bytes(self, item_bytes: T.List[int]) -> int:
+        # "{" + items joined by item separator + "}", same for "[" "]"
+        n = len(item_bytes)
+        return 2 + sum(item_bytes) + self.item_sep_bytes * max(n - 1, 0)
+
+    def measure_workflow(self, workflow: 'Workflow', path: str) -> int:
+        workflow._validate_incremental()
+        data = workflow._serialize_shallow()
+        items = list()
+        for key, value in data.items():
+            if key == C.States:
+                state_entries = [
+                    self.measure_state(
+                        state,
+                        f"{path}.{state_id}" if path else state_id,
+                    )
+                    for state_id, state in value.items()
+                ]
+                items.append(
+                    self._entry_bytes(key, self._container_bytes(state_entries))
+                )
+            else:
+                items.append(self._entry_bytes(key, _n_bytes(self._dumps(value))))
+        return self._container_bytes(items)
+
+    def measure_state(self, state: 'StateType', path: str) -> int:
+        """
+        :return: the size of the ``"state_id": {...}`` entry.
+        """
+        if isinstance(state, (Parallel, Map)):
+            state._validate_incremental()
+            data = state._sort_field_and_extra(state._serialize_shallow())
+        else:
+            data = state.serialize()
+
+        fields = list()
+        nested_bytes = 0
+        for key, value in data.items():
+            if key == C.Branches:
+                branch_bytes = list()
+                for ith, branch in enumerate(value):
+                    sub_path = f"{path}.{C.Branches}[{ith}]"
+                    n = self.measure_workflow(branch, sub_path)
+                    self.sub_workflows.append(
+                        SubWorkflowSize(sub_path, n, len(branch._states))
+                    )
+                    branch_bytes.append(n)
+                nested_bytes += sum(branch_bytes)
+                value_bytes = self._container_bytes(branch_bytes)
+            elif key == C.Iterator:
+                sub_path = f"{path}.{C.Iterator}"
+                value_bytes = self.measure_workflow(value, sub_path)
+                self.sub_workflows.append(
+                    SubWorkflowSize(sub_path, value_bytes, len(value._states))
+                )
+                nested_bytes += value_bytes
+            else:
+                if key in (C.Retry, C.Catch):
+                    for block in value:
+                        self.blocks[(key, self._dumps(block))] += 1
+                value_bytes = _n_bytes(self._dumps(value))
+            fields.append(FieldSize(path, key, self._entry_bytes(key, value_bytes)))
+
+        state_bytes = self._container_bytes([field.bytes for field in fields])
+        total_bytes = self._entry_bytes(state.id, state_bytes)
+        self.states.append(
+            StateSize(
+                path=path,
+                id=state.id,
+                type=state.type,
+                total_bytes=total_bytes,
+                own_bytes=total_bytes - nested_bytes,
+                fields=fields,
+            )
+        )
+        return total_bytes
+
+    def repeated_blocks(self) -> T.List[RepeatedBlock]:
+        return [
+            RepeatedBlock(
+                field=field,
+                json=block,
+                count=count,
+                bytes=_n_bytes(block),
+            )
+            for (field, block), count in self.blocks.items()
+            if count > 1
+        ]
+
+
+def analyze_definition_size(
+    workflow: 'Workflow',
+    limit: int = C.DEFINITION_SIZE_LIMIT,
+    separators: T.Optional[T.Tuple[str, str]] = None,
+) -> DefinitionSizeReport:
+    """
+    Measure the byte size of the workflow definition JSON.
+
+    :param limit: the size limit in bytes.
+    :param separators: the ``separators`` used to dump the definition,
+        by default it is the same as :meth:`Workflow.to_json`.
+    """
+    if separators is None:
+        separators = DEFAULT_SEPARATORS
+    analyzer = _Analyzer(separators=separators)
+    total_bytes = analyzer.measure_workflow(workflow, path="")
+    return DefinitionSizeReport(
+        workflow_id=workflow.id,
+        total_bytes=total_bytes,
+        limit=limit,
+        states=analyzer.states,
+        sub_workflows=analyzer.sub_workflows,
+        repeated_blocks=analyzer.repeated_blocks(),
+    )
@@ -61,3 +61,64 @@ class WorkflowExecutionError(
     ExecutionError,
 ):
     pass
+
+
+class DefinitionSizeLimitExceededError(WorkflowValidationError):
+    """
+    Raise when the workflow definition is larger than the
+    Step Functions service quota.
+    """
+    pass
+
+
+class WorkflowGraphError(WorkflowValidationError):
+    """
+    Raise when the workflow has dangling, cross scope or unreachable
+    transitions, the message lists all the errors.
+    """
+    pass
+
+
+class DefinitionParseError(ValidationError):
+    """
+    Raise when an Amazon States Language definition cannot be parsed.
+    """
+    pass
+
+
+class JsonPathError(ValidationError):
+    """
+    Raise when a string is not a valid JSON path.
+    """
+    pass
+
+
+class JsonPathNotFoundError(LookupError):
+    """
+    Raise when a JSON path doesn't match anything in the data.
+    """
+    pass
+
+
+class StatesError(ExecutionError):
+    """
+    Raise when a state fails in local execution. ``error`` is the error name
+    matched by ``Retry`` / ``Catch`` ``ErrorEquals``, for example,
+    ``States.TaskFailed``, ``States.Runtime`` or the Python exception
+    class name raised by a task handler.
+
+    :param branch_failed: indicate that the error is from a ``Parallel``
+        branch or a ``Map`` iteration, it also matches ``States.BranchFailed``.
+    """
+
+    def __init__(self, error: str, cause: str = "", branch_failed: bool = False):
+        super().__init__(f"{error}: {cause}" if cause else error)
+        self.error = error
+        self.cause = cause
+        self.branch_failed = branch_failed
+
+    def to_error_output(self) -> dict:
+        """
+        The error output passed to the ``Catch`` fallback state.
+        """
+        return {"Error": self.error, "Cause": self.cause}
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Content addressed sub-workflows.
+
+:meth:`~aws_stepfunction.model.StepFunctionObject.fingerprint` is a Merkle
+hash of the canonical content, this module uses it to find and dedupe the
+identical ``Parallel`` branches and ``Map`` iterators across many generated
+workflows. The workflow id is not part of the definition, so two branches
+built separately with the same states are identical.
+
+Usage::
+
+    duplicates = find_duplicate_workflows(workflows)
+    for fingerprint, locations in duplicates.items():
+        print(fingerprint, [location for location, _ in locations])
+
+    report = dedupe_workflows(workflows)
+    print(report.n_replaced)
+"""
+
+import typing as T
+
+import attr
+
+from .constant import Constant as C
+from .state import Parallel, Map
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .workflow import Workflow
+
+
+def iter_sub_workflows(
+    workflow: 'Workflow',
+    location: str = "$",
+) -> T.Iterable[T.Tuple[str, 'Workflow']]:
+    """
+    Yield (location, workflow) of the workflow itself and all its nested
+    ``Parallel`` branches and ``Map`` iterators, parent first.
+    """
+    yield location, workflow
+    for state_id, state in workflow._states.items():
+        if isinstance(state, Parallel):
+            for ith, branch in enumerate(state.branches):
+                yield from iter_sub_workflows(
+                    branch, f"{location}.{state_id}.{C.Branches}[{ith}]",
+                )
+        elif isinstance(state, Map) and state.iterator is not None:
+            yield from iter_sub_workflows(
+                state.iterator, f"{location}.{state_id}.{C.Iterator}",
+            )
+
+
+def _iter_all(
+    workflows: T.Iterable['Workflow'],
+) -> T.Iterable[T.Tuple[str, 'Workflow']]:
+    for ith, workflow in enumerate(workflows):
+        yield from iter_sub_workflows(workflow, f"[{ith}]$")
+
+
+def find_duplicate_workflows(
+    workflows: T.Iterable['Workflow'],
+) -> T.Dict[str, T.List[T.Tuple[str, 'Workflow']]]:
+    """
+    Group the workflows and all their sub-workflows by fingerprint, return
+    the groups that have more than one member.
+
+    :return: fingerprint -> list of (location, workflow), the location
+        ``[0]$.para.Branches[1]`` is the second branch of the ``para`` state
+        in the first workflow.
+    """
+    groups = dict()
+    for location, workflow in _iter_all(workflows):
+        groups.setdefault(workflow.fingerprint(), list()).append(
+            (location, workflow)
+        )
+    return {
+        fingerprint: members
+        for fingerprint, members in groups.items()
+        if len(members) > 1
+    }
+
+
+@attr.s
+class DedupeReport:
+    """
+    The result of :func:`dedupe_workflows`.
+
+    :param n_workflows: the number of the workflows and sub-workflows.
+    :param n_unique: the number of the unique fingerprints.
+    :param n_replaced: the number of the branches / iterators that are
+        replaced by an identical one.
+    :param canonical: fingerprint -> the shared workflow object.
+    """
+    n_workflows: int = attr.ib(default=0)
+    n_unique: int = attr.ib(default=0)
+    n_replaced: int = attr.ib(default=0)
+    canonical: T.Dict[str, 'Workflow'] = attr.ib(factory=dict)
+
+
+def dedupe_workflows(workflows: T.Iterable['Workflow']) -> DedupeReport:
+    """
+    Replace every ``Parallel`` branch and ``Map`` iterator with the first seen
+    workflow that has the same fingerprint, so the identical sub-workflows
+    are stored, validated, serialized and hashed only once.
+
+    .. note::
+
+        The replaced branches / iterators become shared objects, changing one
+        of them changes all the workflows that use it.
+    """
+    report = DedupeReport()
+    canonical = report.canonical
+
+    def dedupe(workflow: 'Workflow') -> 'Workflow':
+        """
+        Dedupe the sub-workflows bottom up, then return the shared workflow
+        object that has the same fingerprint.
+        """
+        report.n_workflows += 1
+        for state in workflow._states.values():
+            if isinstance(state, Parallel):
+                branches = [dedupe(branch) for branch in state.branches]
+                n_replaced = sum(
+                    new is not old
+                    for new, old in zip(branches, state.branches)
+                )
+                if n_replaced:
+                    report.n_replaced += n_replaced
+                    state.branches = branches
+            elif isinstance(state, Map) and state.iterator is not None:
+                iterator = dedupe(state.iterator)
+                if iterator is not state.iterator:
+                    report.n_replaced += 1
+                    state.iterator = iterator
+        return canonical.setdefault(workflow.fingerprint(), workflow)
+
+    for workflow in workflows:
+        dedupe(workflow)
+    report.n_unique = len(canonical)
+    return report
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""
+Workflow graph validator.
+
+``Workflow.serialize`` only checks the ``StartAt`` of a workflow, the
+transition errors surface only when AWS validates the definition. This
+module builds a state id index and an adjacency list once, then checks the
+whole workflow, including the ``Parallel`` branches and ``Map`` iterators,
+in O(states + edges):
+
+- ``StartAt`` is defined.
+- the state ids are unique in the whole workflow.
+- every ``Next``, ``Catch.Next``, ``ChoiceRule.Next`` and ``Choice.Default``
+  points to a state in the same scope, a transition into or out of a
+  ``Parallel`` branch / ``Map`` iterator is reported as a cross scope
+  transition.
+- every state is reachable from ``StartAt``.
+- every non-terminal state has either ``Next`` or ``End``, the ``Choice``
+  state has at least one rule, every scope has a terminal state.
+
+All the errors are collected in one report.
+
+Usage::
+
+    report = validate_graph(workflow)
+    print(report.to_text())
+    report.raise_for_errors()
+"""
+
+import typing as T
+import collections
+
+import attr
+
+from . import exc
+from .constant import Constant as C
+from .state import Parallel, Map, Choice, Succeed, Fail
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .workflow import Workflow
+    from .state import StateType
+
+
+class GraphErrorEnum:
+    missing_start_at = "MissingStartAt"
+    duplicate_state_id = "DuplicateStateId"
+    dangling_transition = "DanglingTransition"
+    cross_scope_transition = "CrossScopeTransition"
+    unreachable_state = "UnreachableState"
+    next_and_end = "NextAndEnd"
+    no_next_nor_end = "NoNextNorEnd"
+    empty_choice = "EmptyChoice"
+    no_terminal_state = "NoTerminalState"
+
+
+@attr.s
+class GraphError:
+    """
+    :param scope: the location of the workflow, ``$`` is the top level
+        workflow, ``$.{state_id}.Branches[0]`` is a ``Parallel`` branch,
+        ``$.{state_id}.Iterator`` is a ``Map`` iterator.
+    :param state_id: the state id, None if the error is about the scope.
+    :param code: see :class:`GraphErrorEnum`.
+    """
+    scope: str = attr.ib()
+    state_id: T.Optional[str] = attr.ib()
+    code: str = attr.ib()
+    message: str = attr.ib()
+
+    def to_text(self) -> str:
+        if self.state_id is None:
+            return f"{self.scope}: {self.code}: {self.message}"
+        return f"{self.scope}: State(id={self.state_id!r}): {self.code}: {self.message}"
+
+
+@attr.s
+class GraphValidationReport:
+    """
+    The result of :func:`validate_graph`.
+    """
+    workflow_id: str = attr.ib()
+    n_states: int = attr.ib(default=0)
+    n_edges: int = attr.ib(default=0)
+    errors: T.List[GraphError] = attr.ib(factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self.errors) == 0
+
+    def to_text(self) -> str:
+        lines = [
+            f"Workflow(id={self.workflow_id!r}): {self.n_states} states, "
+            f"{self.n_edges} transitions, {len(self.errors)} errors",
+        ]
+        lines.extend(f"- {error.to_text()}" for error in self.errors)
+        return "\n".join(lines)
+
+    def raise_for_errors(self):
+        """
+        :raises: :class:`~aws_stepfunction.exc.WorkflowGraphError`
+            with all the errors.
+        """
+        if self.errors:
+            raise exc.WorkflowGraphError(self.to_text())
+
+
+def _iter_edges(state: 'StateType') -> T.Iterable[T.Tuple[str, str]]:
+    """
+    Yield (field name, target state id) of all transitions of a state.
+    """
+    if isinstance(state, Choice):
+        for ith, rule in enumerate(state.choices):
+            if rule.next is not None:
+                yield f"{C.Choices}[{ith}].{C.Next}", rule.next
+        if state.default is not None:
+            yield C.Default, state.default
+        return
+    next_ = getattr(state, "next", None)
+    if next_:
+        yield C.Next, next_
+    for ith, catch in enumerate(getattr(state, "catch", None) or []):
+        if catch.next is not None:
+            yield f"{C.Catch}[{ith}].{C.Next}", catch.next
+
+
+def _is_terminal(state: 'StateType') -> bool:
+    return isinstance(state, (Succeed, Fail)) or getattr(state, "end", None) is True
+
+
+class _Validator:
+    def __init__(self, workflow: 'Workflow'):
+        self.workflow = workflow
+        self.report = GraphValidationReport(workflow_id=workflow.id)
+        # state id -> scope of all the states in the whole workflow
+        self.scope_index: T.Dict[str, str] = dict()
+        # scope -> workflow
+        self.scopes: T.List[T.Tuple[str, 'Workflow']] = list()
+
+    def add_error(
+        self,
+        scope: str,
+        state_id: T.Optional[str],
+        code: str,
+        message: str,
+    ):
+        self.report.errors.append(GraphError(scope, state_id, code, message))
+
+    def index(self):
+        """
+        Collect all the scopes and the state id index.
+        """
+        stack = [("$", self.workflow)]
+        while stack:
+            scope, workflow = stack.pop()
+            self.scopes.append((scope, workflow))
+            for state_id, state in workflow._states.items():
+                self.report.n_states += 1
+                if state_id in self.scope_index:
+                    self.add_error(
+                        scope, state_id, GraphErrorEnum.duplicate_state_id,
+                        f"it is also defined in {self.scope_index[state_id]}",
+                    )
+                else:
+                    self.scope_index[state_id] = scope
+                if isinstance(state, Parallel):
+                    for ith, branch in enumerate(state.branches):
+                        stack.append(
+                            (f"{scope}.{state_id}.{C.Branches}[{ith}]", branch)
+                        )
+                elif isinstance(state, Map) and state.iterator is not None:
+                    stack.append(
+                        (f"{scope}.{state_id}.{C.Iterator}", state.iterator)
+                    )
+        # report the scopes in the definition order
+        self.scopes.sort(key=lambda x: x[0])
+
+    def check_state(self, scope: str, state: 'StateType'):
+        if isinstance(state, Choice):
+            if len(state.choices) == 0:
+                self.add_error(
+                    scope, state.id, GraphErrorEnum.empty_choice,
+                    f"{C.Choices!r} is empty",
+                )
+            for ith, rule in enumerate(state.choices):
+                if rule.next is None:
+                    self.add_error(
+                        scope, state.id, GraphErrorEnum.no_next_nor_end,
+                        f"{C.Choices}[{ith}] doesn't have {C.Next!r}",
+                    )
+        elif not isinstance(state, (Succeed, Fail)):
+            if state.end is True and state.next:
+                self.add_error(
+                    scope, state.id, GraphErrorEnum.next_and_end,
+                    f"{C.End!r} is True, but the {C.Next!r} is also defined",
+                )
+            elif state.end is not True and not state.next:
+                self.add_error(
+                    scope, state.id, GraphErrorEnum.no_next_nor_end,
+                    f"neither {C.Next!r} nor {C.End!r} is defined",
+                )
+
+    def check_scope(self, scope: str, workflow: 'Workflow'):
+        states = workflow._states
+        adjacency: T.Dict[str, T.List[str]] = dict()
+        has_terminal = False
+        for state_id, state in states.items():
+            self.check_state(scope, state)
+            if _is_terminal(state):
+                has_terminal = True
+            targets = list()
+            for field, target in _iter_edges(state):
+                self.report.n_edges += 1
+                if target in states:
+                    targets.append(target)
+                elif target in self.scope_index:
+                    self.add_error(
+                        scope, state_id, GraphErrorEnum.cross_scope_transition,
+                        f"{field} = {target!r} is defined in "
+                        f"{self.scope_index[target]}, a state can only "
+                        f"transition to a state in the same scope",
+                    )
+                else:
+                    self.add_error(
+                        scope, state_id, GraphErrorEnum.dangling_transition,
+                        f"{field} = {target!r} is not defined",
+                    )
+            adjacency[state_id] = targets
+
+        if states and not has_terminal:
+            self.add_error(
+                scope, None, GraphErrorEnum.no_terminal_state,
+                "there is no terminal state (End, Succeed or Fail)",
+            )
+
+        start_at = workflow._start_at
+        if not start_at or start_at not in states:
+            self.add_error(
+                scope, None, GraphErrorEnum.missing_start_at,
+                f"{C.StartAt!r} {start_at!r} is not defined",
+            )
+            return
+
+        # breadth first search from StartAt
+        visited = {start_at}
+        queue = collections.deque([start_at])
+        while queue:
+            for target in adjacency[queue.popleft()]:
+                if target not in visited:
+                    visited.add(target)
+                    queue.append(target)
+        for state_id in states:
+            if state_id not in visited:
+                self.add_error(
+                    scope, state_id, GraphErrorEnum.unreachable_state,
+                    f"it is not reachable from {C.StartAt!r} {start_at!r}",
+                )
+
+    def validate(self) -> GraphValidationReport:
+        self.index()
+        for scope, workflow in self.scopes:
+            self.check_scope(scope, workflow)
+        return self.report
+
+
+def validate_graph(workflow: 'Workflow') -> GraphValidationReport:
+    """
+    Validate the transitions of the workflow and all its ``Parallel`` branches
+    and ``Map`` iterators, return all the errors in one report.
+    """
+    return _Validator(workflow).validate()
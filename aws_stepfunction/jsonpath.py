@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+
+"""
+The JSON path subset used in Amazon States Language ``InputPath``,
+``OutputPath``, ``ResultPath``, ``ItemsPath``, ``Parameters`` and
+Choice rule ``Variable``.
+
+Supported syntax:
+
+- ``$``, the root of the data.
+- ``$$``, the root of the context object, for example ``$$.Execution.Id``.
+- ``.key``, ``['key']``, ``["key"]``, a dict key.
+- ``[0]``, ``[-1]``, a list index, negative counts from the end.
+- ``.*``, ``[*]``, all the values of a dict or list.
+- ``..key``, ``..*``, ``..[0]``, deep scan, match at any depth.
+- ``[0:2]``, ``[-2:]``, ``[::2]``, a list slice.
+- ``[0,1]``, ``['a','b']``, a union of indexes or keys.
+- ``[?(@.x > 1)]``, a filter of the list items (or dict values). The local
+  engine evaluates ``@.path`` existence and the ``==``, ``!=``, ``<``,
+  ``<=``, ``>``, ``>=`` comparisons with a JSON literal, other filter
+  expressions are valid but can't be evaluated locally.
+
+A path with wildcard, deep scan, slice, union or filter returns a list of
+the matched values, it is not a reference path. A negative index returns a
+single value, but it is not a reference path either, so only the plain
+key / non-negative index paths can be used in ``ResultPath``.
+
+A path is parsed once into a :class:`JsonPath` accessor, the accessors are
+cached in a bounded LRU by :func:`compile_path`.
+
+Reference:
+
+- https://states-language.net/spec.html#path
+- https://github.com/json-path/JsonPath
+"""
+
+import typing as T
+import re
+import json
+import functools
+
+from . import exc
+
+
+class _Wildcard:
+    def __repr__(self):
+        return "*"
+
+
+WILDCARD = _Wildcard()
+
+
+class _DeepScan:
+    def __repr__(self):
+        return ".."
+
+
+#: replaces the current values with all their descendants (and themselves),
+#: the next token is applied to them
+DEEP_SCAN = _DeepScan()
+
+
+class Slice(T.NamedTuple):
+    start: T.Optional[int]
+    stop: T.Optional[int]
+    step: T.Optional[int]
+
+
+class Union(T.NamedTuple):
+    items: T.Tuple[T.Union[str, int], ...]
+
+
+class Filter(T.NamedTuple):
+    expression: str
+
+
+Token = T.Union[str, int, _Wildcard, _DeepScan, Slice, Union, Filter]
+
+CACHE_SIZE = 4096
+
+_UNION_ITEM = r"""(?:-?\d+|'[^']*'|"[^"]*")"""
+
+_TOKEN_PATTERN = re.compile(
+    r"\.([^.\[\]'\"*]+)"  # .key
+    r"|\[(-?\d+)\]"  # [0], [-1]
+    r"|\['([^']*)'\]"  # ['key']
+    r"|\[\"([^\"]*)\"\]"  # ["key"]
+    r"|(\.\*|\[\*\])"  # .* or [*]
+    r"|\[\s*(-?\d*)\s*:\s*(-?\d*)\s*(?::\s*(-?\d*)\s*)?\]"  # [0:2:1]
+    r"|\[(" + _UNION_ITEM + r"(?:\s*,\s*" + _UNION_ITEM + r")+)\]"  # [0,1]
+    r"|\[\?\((.+?)\)\]"  # [?(@.x > 1)]
+)
+
+_UNION_ITEM_PATTERN = re.compile(_UNION_ITEM)
+
+
+def _int_or_none(value: str) -> T.Optional[int]:
+    return int(value) if value else None
+
+
+def _parse_union_item(item: str) -> T.Union[str, int]:
+    if item[0] in "'\"":
+        return item[1:-1]
+    return int(item)
+
+
+def _parse(path: str, start: int) -> T.Tuple[Token, ...]:
+    tokens = list()
+    pos, end = start, len(path)
+    while pos < end:
+        if path.startswith("..", pos):
+            # "..key" and "..*" keep one dot for the next token
+            if tokens and tokens[-1] is DEEP_SCAN:
+                raise exc.JsonPathError(f"{path!r} is not a valid JSON path!")
+            tokens.append(DEEP_SCAN)
+            pos += 2 if path.startswith("..[", pos) else 1
+            continue
+        match = _TOKEN_PATTERN.match(path, pos)
+        if match is None:
+            raise exc.JsonPathError(f"{path!r} is not a valid JSON path!")
+        (
+            key, index, quoted_key1, quoted_key2, wildcard,
+            slice_start, slice_stop, slice_step, union, filter_,
+        ) = match.groups()
+        if index is not None:
+            tokens.append(int(index))
+        elif key is not None:
+            tokens.append(key)
+        elif quoted_key1 is not None:
+            tokens.append(quoted_key1)
+        elif quoted_key2 is not None:
+            tokens.append(quoted_key2)
+        elif wildcard is not None:
+            tokens.append(WILDCARD)
+        elif union is not None:
+            tokens.append(Union(tuple(
+                _parse_union_item(item)
+                for item in _UNION_ITEM_PATTERN.findall(union)
+            )))
+        elif filter_ is not None:
+            tokens.append(Filter(filter_.strip()))
+        else:
+            step = _int_or_none(slice_step)
+            if step == 0:
+                raise exc.JsonPathError(f"{path!r} slice step can't be zero!")
+            tokens.append(Slice(
+                _int_or_none(slice_start), _int_or_none(slice_stop), step,
+            ))
+        pos = match.end()
+    if tokens and tokens[-1] is DEEP_SCAN:
+        raise exc.JsonPathError(f"{path!r} is not a valid JSON path!")
+    return tuple(tokens)
+
+
+def parse(path: str) -> T.Tuple[Token, ...]:
+    """
+    Parse a JSON path into tokens, a ``str`` token is a dict key,
+    an ``int`` token is a list index, :data:`WILDCARD` is ``*``,
+    :data:`DEEP_SCAN` is ``..``, :class:`Slice`, :class:`Union` and
+    :class:`Filter` are the bracket expressions.
+    The ``$$`` context path is parsed as the ``$`` path.
+    """
+    if not isinstance(path, str) or not path.startswith("$"):
+        raise exc.JsonPathError(f"{path!r} is not a valid JSON path!")
+    return _parse(path, 2 if path.startswith("$$") else 1)
+
+
+_FILTER_PATTERN = re.compile(
+    r"^@((?:\.[^.\[\]'\"*\s=!<>]+|\[\d+\]|\['[^']*'\])*)"
+    r"\s*(?:(==|!=|<=|>=|<|>)\s*(.+?))?$"
+)
+
+_COMPARE = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _compile_filter(expression: str) -> T.Optional[T.Callable[[T.Any], bool]]:
+    """
+    Compile the supported filter expressions into a predicate,
+    return None if the local engine can't evaluate it.
+    """
+    match = _FILTER_PATTERN.match(expression)
+    if match is None:
+        return None
+    relative, operator, literal = match.groups()
+    json_path = compile_path("$" + relative)
+    if operator is None:
+        return json_path.has
+    if literal.startswith("'") and literal.endswith("'"):
+        expected = literal[1:-1]
+    else:
+        try:
+            expected = json.loads(literal)
+        except ValueError:
+            return None
+    compare = _COMPARE[operator]
+
+    def predicate(value: T.Any) -> bool:
+        try:
+            return compare(json_path.get(value), expected)
+        except (exc.JsonPathNotFoundError, TypeError):
+            return False
+
+    return predicate
+
+
+def _not_found(path: str) -> exc.JsonPathNotFoundError:
+    return exc.JsonPathNotFoundError(
+        f"JSON path {path!r} doesn't match the data!"
+    )
+
+
+def _iter_children(value: T.Any) -> T.Iterable[T.Any]:
+    if isinstance(value, dict):
+        return value.values()
+    if isinstance(value, list):
+        return value
+    return ()
+
+
+def _iter_descendants(value: T.Any, values: T.List[T.Any]):
+    """
+    Append the value and all its descendants in document order.
+    """
+    values.append(value)
+    for child in _iter_children(value):
+        _iter_descendants(child, values)
+
+
+def _select(value: T.Any, token: Token, values: T.List[T.Any]):
+    """
+    Append the children of the value that match a key, index, wildcard,
+    slice or union token.
+    """
+    if token is WILDCARD:
+        values.extend(_iter_children(value))
+    elif isinstance(token, int):
+        if isinstance(value, list) and -len(value) <= token < len(value):
+            values.append(value[token])
+    elif isinstance(token, str):
+        if isinstance(value, dict) and token in value:
+            values.append(value[token])
+    elif isinstance(token, Slice):
+        if isinstance(value, list):
+            values.extend(value[token.start:token.stop:token.step])
+    elif isinstance(token, Union):
+        for item in token.items:
+            _select(value, item, values)
+
+
+class JsonPath:
+    """
+    A compiled JSON path accessor. Use :func:`compile_path` to create it.
+
+    :param path: the JSON path string.
+    :param tokens: the parsed tokens, see :func:`parse`.
+    :param is_context: the path starts with ``$$``, it is evaluated against
+        the context object.
+    :param is_definite: the path identifies a single node, it only has
+        dict keys and list indexes.
+    :param is_reference: a definite path without negative index, it can be
+        used in ``ResultPath``.
+    """
+
+    __slots__ = (
+        "path", "tokens", "is_context", "is_definite", "is_reference",
+        "_has_index", "_filters",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tokens = parse(path)
+        self.is_context = path.startswith("$$")
+        self.is_definite = all(
+            isinstance(token, (str, int)) for token in self.tokens
+        )
+        self.is_reference = self.is_definite and all(
+            token >= 0 for token in self.tokens if isinstance(token, int)
+        )
+        self._has_index = any(isinstance(token, int) for token in self.tokens)
+        self._filters = dict()
+
+    def __repr__(self):
+        return f"JsonPath({self.path!r})"
+
+    def get(self, data: T.Any, context: T.Any = None) -> T.Any:
+        """
+        Get the value at the path. A path that is not definite returns the
+        list of the matched values.
+
+        :param context: the context object for the ``$$`` path.
+        :raises: :class:`~aws_stepfunction.exc.JsonPathNotFoundError`,
+            :class:`~aws_stepfunction.exc.JsonPathError` if the filter
+            expression can't be evaluated locally.
+        """
+        value = context if self.is_context else data
+        if not self.is_definite:
+            return self._get_wildcard(value, 0)
+        try:
+            if self._has_index:
+                for token in self.tokens:
+                    # the int token only matches a list, not a str
+                    if isinstance(token, int) and not isinstance(value, list):
+                        raise TypeError
+                    value = value[token]
+            else:
+                for token in self.tokens:
+                    value = value[token]
+        except (KeyError, IndexError, TypeError):
+            raise _not_found(self.path)
+        return value
+
+    def _get_wildcard(self, value: T.Any, ith: int) -> T.List[T.Any]:
+        values = [value]
+        for token in self.tokens[ith:]:
+            new_values = list()
+            if token is DEEP_SCAN:
+                for value in values:
+                    _iter_descendants(value, new_values)
+            elif isinstance(token, Filter):
+                predicate = self._get_filter(token)
+                for value in values:
+                    new_values.extend(
+                        child for child in _iter_children(value)
+                        if predicate(child)
+                    )
+            else:
+                for value in values:
+                    _select(value, token, new_values)
+            values = new_values
+        return values
+
+    def _get_filter(self, token: Filter) -> T.Callable[[T.Any], bool]:
+        try:
+            return self._filters[token.expression]
+        except KeyError:
+            predicate = _compile_filter(token.expression)
+            if predicate is None:
+                raise exc.JsonPathError(
+                    f"the filter {token.expression!r} of {self.path!r} "
+                    f"can't be evaluated by the local engine!"
+                )
+            self._filters[token.expression] = predicate
+            return predicate
+
+    def has(self, data: T.Any, context: T.Any = None) -> bool:
+        """
+        Check if the path matches a value.
+        """
+        try:
+            self.get(data, context)
+            return True
+        except exc.JsonPathNotFoundError:
+            return False
+
+    def set(self, data: T.Any, value: T.Any) -> T.Any:
+        """
+        Return a copy of the data with the value at the path set. Only the
+        containers on the path are copied, missing dict keys are created,
+        the original data is not modified.
+
+        :raises: :class:`~aws_stepfunction.exc.JsonPathError` if it is not
+            a reference path of the data,
+            :class:`~aws_stepfunction.exc.JsonPathNotFoundError` if the
+            data doesn't match the path.
+        """
+        if self.is_context or not self.is_reference:
+            raise exc.JsonPathError(
+                f"{self.path!r} is not a reference path, can't set value!"
+            )
+        tokens = self.tokens
+        if not tokens:
+            return value
+        last = len(tokens) - 1
+
+        def _set(node: T.Any, ith: int) -> T.Any:
+            token = tokens[ith]
+            if isinstance(token, int):
+                if not isinstance(node, list) or token >= len(node):
+                    raise _not_found(self.path)
+                new_node = list(node)
+            else:
+                if node is None:
+                    node = dict()
+                if not isinstance(node, dict):
+                    raise _not_found(self.path)
+                new_node = dict(node)
+            if ith == last:
+                new_node[token] = value
+            else:
+                child = node[token] if (
+                    isinstance(token, int) or token in node
+                ) else None
+                new_node[token] = _set(child, ith + 1)
+            return new_node
+
+        return _set(data, 0)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_path(path: str) -> JsonPath:
+    """
+    Parse the path once, the compiled accessors are cached in a bounded LRU.
+
+    :raises: :class:`~aws_stepfunction.exc.JsonPathError`
+    """
+    return JsonPath(path)
+
+
+def is_valid(
+    path: str,
+    reference: bool = False,
+    context: bool = True,
+) -> bool:
+    """
+    Verify if string is a valid JSON path.
+
+    :param reference: it has to be a reference path, no wildcard.
+    :param context: allow the ``$$`` context path.
+    """
+    if not isinstance(path, str):
+        return False
+    try:
+        json_path = compile_path(path)
+    except exc.JsonPathError:
+        return False
+    if reference and not json_path.is_reference:
+        return False
+    if not context and json_path.is_context:
+        return False
+    return True
+
+
+def get_value(data: T.Any, path: str, context: T.Any = None) -> T.Any:
+    """
+    Get the value at the path.
+    """
+    return compile_path(path).get(data, context)
+
+
+def has_value(data: T.Any, path: str, context: T.Any = None) -> bool:
+    """
+    Check if the path matches a value.
+    """
+    return compile_path(path).has(data, context)
+
+
+def set_value(data: T.Any, path: str, value: T.Any) -> T.Any:
+    """
+    Return a copy of the data with the value at the path set,
+    see :meth:`JsonPath.set`.
+    """
+    return compile_path(path).set(data, value)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the workflow locally without AWS.
+"""
+
+from .engine import (
+    LocalRunner,
+    resolve_parameters,
+    is_error_matched,
+)
+from .choice import (
+    evaluate_rule,
+    choose_next,
+)
+from .concurrency import ConcurrentRunner
+from .aio import AsyncRunner
+from .compiler import (
+    compile_rule,
+    compile_choice,
+)
+from .batch import (
+    MISSING,
+    evaluate_batch,
+)
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio version of the local interpreter. The ``Parallel`` branches run
+concurrently as coroutines, the task handlers can be ``async def``
+functions, so the branches calling slow IO stand-ins overlap like they do
+in AWS.
+
+Usage::
+
+    runner = AsyncRunner()
+
+    @runner.register("arn:aws:lambda:us-east-1:111122223333:function:fetch")
+    async def fetch(event):
+        await asyncio.sleep(1)
+        return event
+
+    results = asyncio.run(runner.run_parallel(parallel_state, {"key": "value"}))
+"""
+
+import typing as T
+import asyncio
+import inspect
+
+import attr
+
+from .. import exc
+from ..constant import Constant as C
+from .engine import (
+    LocalRunner,
+    _Execution,
+    _utc_now,
+    apply_input_path,
+    apply_parameters,
+    apply_output_path,
+    process_result,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..workflow import Workflow
+    from ..state import StateType, Task, Parallel, Map, Wait
+
+
+async def _no_async_sleep(seconds: float):
+    pass
+
+
+@attr.s
+class AsyncRunner(LocalRunner):
+    """
+    Execute a workflow locally with asyncio. A handler can be a regular
+    function or an ``async def`` function.
+
+    The ``Parallel`` branches run concurrently, the first failed branch
+    cancels the other branches and fails the ``Parallel`` with the
+    ``States.BranchFailed`` semantics. The ``Map`` iterations run
+    concurrently up to ``Map.max_concurrency``.
+
+    :param async_sleep: the coroutine function to wait for ``Wait`` states
+        and ``Retry`` intervals, by default it doesn't wait. Use
+        ``asyncio.sleep`` to simulate the real timing.
+    """
+    async_sleep: T.Callable[[float], T.Awaitable] = attr.ib(
+        default=_no_async_sleep,
+    )
+
+    async def execute(
+        self,
+        workflow: 'Workflow',
+        input: T.Any = None,
+        name: T.Optional[str] = None,
+    ) -> T.Any:
+        """
+        Execute the workflow and return the output.
+
+        :raises: :class:`~aws_stepfunction.exc.StatesError` if the
+            execution failed.
+        """
+        if input is None:
+            input = dict()
+        execution = _Execution(
+            context=self._new_context(workflow, input, name),
+            max_transitions=self.max_transitions,
+        )
+        return await self.run_workflow(workflow, input, execution)
+
+    async def run_state(
+        self,
+        state: 'StateType',
+        input: T.Any = None,
+        name: T.Optional[str] = None,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        """
+        Run a single state outside of a workflow.
+
+        :return: the state output and the next state id.
+        """
+        if input is None:
+            input = dict()
+        execution = _Execution(
+            context=self._new_state_context(state, input, name),
+            max_transitions=self.max_transitions,
+        )
+        return await self._arun_state(state, input, execution, execution.context)
+
+    async def run_parallel(
+        self,
+        state: 'Parallel',
+        input: T.Any = None,
+        name: T.Optional[str] = None,
+    ) -> T.Any:
+        """
+        Run a ``Parallel`` state, return the state output. Without
+        ``ResultSelector``, ``ResultPath`` and ``OutputPath`` it is the
+        branch outputs array in the branch order.
+        """
+        output, _ = await self.run_state(state, input, name)
+        return output
+
+    async def run_workflow(
+        self,
+        workflow: 'Workflow',
+        data: T.Any,
+        execution: '_Execution',
+        context: T.Optional[dict] = None,
+    ) -> T.Any:
+        if context is None:
+            context = execution.context
+        state_id = workflow._start_at
+        while True:
+            execution.transition()
+            try:
+                state = workflow._states[state_id]
+            except KeyError:
+                raise exc.StatesError(
+                    C.RuntimeError, f"State(id={state_id!r}) is not defined!"
+                )
+            state_context = dict(context)
+            state_context["State"] = {
+                "Name": state_id,
+                "EnteredTime": _utc_now().isoformat(),
+            }
+            data, state_id = await self._arun_state(
+                state, data, execution, state_context,
+            )
+            if state_id is None:
+                return data
+
+    async def _arun_state(
+        self,
+        state: 'StateType',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        if state.type in self._async_state_runners:
+            run_state = getattr(self, self._async_state_runners[state.type])
+            return await run_state(state, data, execution, context)
+        run_state = getattr(self, self._state_runners[state.type])
+        return run_state(state, data, execution, context)
+
+    async def _awith_retry_catch(
+        self,
+        state: T.Union['Task', 'Parallel', 'Map'],
+        data: T.Any,
+        context: dict,
+        run: T.Callable[[], T.Awaitable],
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        n_attempts: T.Dict[int, int] = dict()
+        while True:
+            try:
+                return await run(), state.next
+            except exc.StatesError as e:
+                error = e
+            interval = self._get_retry_interval(state, error, n_attempts)
+            if interval is None:
+                return self._catch_error(state, data, error)
+            await self.async_sleep(interval)
+
+    async def _arun_task(
+        self,
+        state: 'Task',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        handler = self._get_handler(state)
+
+        async def run():
+            effective_input = apply_parameters(
+                state, apply_input_path(state, data, context), context,
+            )
+            try:
+                result = handler(effective_input)
+                if inspect.isawaitable(result):
+                    result = await result
+            except exc.StatesError:
+                raise
+            except Exception as e:
+                raise exc.StatesError(e.__class__.__name__, str(e))
+            return process_result(state, data, result, context)
+
+        return await self._awith_retry_catch(state, data, context, run)
+
+    async def _arun_wait(
+        self,
+        state: 'Wait',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        effective_input = apply_input_path(state, data, context)
+        seconds = self._get_wait_seconds(state, effective_input, context)
+        if seconds > 0:
+            await self.async_sleep(seconds)
+        return apply_output_path(state, effective_input, context), state.next
+
+    @staticmethod
+    async def _gather(coroutines: T.List[T.Awaitable]) -> T.List[T.Any]:
+        """
+        Run the branch / iteration coroutines concurrently, return the
+        results in order. The first failure cancels the others and is
+        re-raised with ``branch_failed=True``.
+        """
+        tasks = [asyncio.ensure_future(coro) for coro in coroutines]
+        try:
+            done, pending = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_EXCEPTION,
+            )
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            # re-raise the error of the first failed one in order
+            for task in tasks:
+                if (
+                    task.done()
+                    and not task.cancelled()
+                    and task.exception() is not None
+                ):
+                    raise task.exception()
+            return [task.result() for task in tasks]
+        except exc.StatesError as e:
+            raise exc.StatesError(e.error, e.cause, branch_failed=True)
+        finally:
+            # the caller is cancelled
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _arun_parallel(
+        self,
+        state: 'Parallel',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        async def run():
+            effective_input = apply_parameters(
+                state, apply_input_path(state, data, context), context,
+            )
+            result = await self._gather([
+                self.run_workflow(branch, effective_input, execution.fork())
+                for branch in state.branches
+            ])
+            return process_result(state, data, result, context)
+
+        return await self._awith_retry_catch(state, data, context, run)
+
+    async def _arun_map(
+        self,
+        state: 'Map',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        async def run_iteration(semaphore, iteration_input, iteration_context):
+            async with semaphore:
+                return await self.run_workflow(
+                    state.iterator,
+                    iteration_input,
+                    execution.fork(),
+                    iteration_context,
+                )
+
+        async def run():
+            effective_input = apply_input_path(state, data, context)
+            items = self.get_map_items(state, effective_input, context)
+            semaphore = asyncio.Semaphore(state.max_concurrency or len(items) or 1)
+            coroutines = list()
+            for index, item in enumerate(items):
+                iteration_input, iteration_context = self.get_map_iteration_input(
+                    state, effective_input, index, item, context,
+                )
+                coroutines.append(
+                    run_iteration(semaphore, iteration_input, iteration_context)
+                )
+            result = await self._gather(coroutines)
+            return process_result(state, data, result, context)
+
+        return await self._awith_retry_catch(state, data, context, run)
+
+    # state type -> coroutine method name, the other states are not
+    # blocking, they use the synchronous method in ``_state_runners``
+    _async_state_runners = {
+        C.Task: "_arun_task",
+        C.Wait: "_arun_wait",
+        C.Parallel: "_arun_parallel",
+        C.Map: "_arun_map",
+    }
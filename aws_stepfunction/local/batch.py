@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized batch evaluation of the Choice rules. Every data test expression
+is evaluated as a boolean mask over all the rows, ``And`` / ``Or`` / ``Not``
+are combined with array operations, then the ``Next`` state id of each row
+is picked in one pass per choice rule.
+
+The input is either a list of dicts (the state inputs), or the columnar
+data, a dict of ``Var.path`` -> array / list of the value per row. A
+numeric, boolean or string column is compared with NumPy vectorized
+operations, the other columns fall back to the per element compiled
+predicate. NumPy is optional, without it the masks are Python lists.
+
+Usage::
+
+    next_state_ids = evaluate_batch(choice_state, {"$.n": np.array([1, 2, 3])})
+    counter = collections.Counter(next_state_ids)
+"""
+
+import typing as T
+import operator
+
+from .. import exc
+from .. import jsonpath
+from ..constant import Constant as C
+from ..choice_rule import ChoiceRule, DataTestExpression, And, Or, Not
+from .compiler import compile_rule
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..state import Choice
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+#: the value of a column when the ``Var.path`` doesn't exist in the row
+MISSING = _Missing()
+
+# operator suffix -> relation, the longer suffix goes first
+_relations = [
+    ("GreaterThanEquals", operator.ge),
+    ("GreaterThan", operator.gt),
+    ("LessThanEquals", operator.le),
+    ("LessThan", operator.lt),
+    ("Equals", operator.eq),
+]
+
+# the result of the vectorized type check per column kind
+_type_check_results = {
+    # numpy dtype kind: number, boolean, string
+    "n": {C.IsNull: False, C.IsNumeric: True, C.IsString: False, C.IsBoolean: False},
+    "b": {C.IsNull: False, C.IsNumeric: False, C.IsString: False, C.IsBoolean: True},
+    "U": {C.IsNull: False, C.IsNumeric: False, C.IsString: True, C.IsBoolean: False},
+}
+
+# the operator family that can be compared vectorized per column kind
+_vectorized_families = {
+    "n": "Numeric",
+    "b": "Boolean",
+    "U": "String",
+}
+
+
+def _column_kind(column: T.Any) -> T.Optional[str]:
+    """
+    Return ``"n"``, ``"b"``, ``"U"`` if the column is a NumPy array that
+    can be evaluated vectorized, otherwise None.
+    """
+    if np is None or not isinstance(column, np.ndarray):
+        return None
+    kind = column.dtype.kind
+    if kind in "iuf":
+        return "n"
+    if kind in "bU":
+        return kind
+    return None
+
+
+def _to_array(values: T.List[T.Any]) -> T.Any:
+    """
+    Convert the column values to a NumPy array if all the values are
+    the same JSON type, so NumPy won't coerce the number to string etc.
+    """
+    types = set(map(type, values))
+    if types and types.issubset({int, float}):
+        try:
+            return np.array(values)
+        except OverflowError:  # pragma: no cover
+            return values
+    if types == {bool} or types == {str}:
+        return np.array(values)
+    return values
+
+
+def _to_list(column: T.Any) -> T.List[T.Any]:
+    """
+    Convert the NumPy array to a list of Python objects, ``numpy.int64`` is
+    not an ``int``.
+    """
+    if np is not None and isinstance(column, np.ndarray):
+        return column.tolist()
+    return column
+
+
+class _Mask:
+    """
+    The evaluation result of a rule over all the rows.
+
+    :param true: the rows the rule is True.
+    :param error: the rows the evaluation fails with ``States.Runtime``
+        (the variable doesn't exist), it is False in ``true``.
+    """
+
+    __slots__ = ("true", "error")
+
+    def __init__(self, true, error):
+        self.true = true
+        self.error = error
+
+
+class BatchEvaluator:
+    """
+    Evaluate the rules of a ``Choice`` state over many rows.
+
+    :param use_numpy: by default, NumPy is used if it is installed.
+    """
+
+    def __init__(self, state: 'Choice', use_numpy: T.Optional[bool] = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        elif use_numpy and np is None:  # pragma: no cover
+            raise ImportError("you have to install numpy to use use_numpy=True")
+        self.state = state
+        self.use_numpy = use_numpy
+
+    # --- mask operations, NumPy array or Python list of bool
+    def _full(self, value: bool):
+        if self.use_numpy:
+            return np.full(self.n_rows, value, dtype=bool)
+        return [value] * self.n_rows
+
+    def _and(self, a, b):
+        if self.use_numpy:
+            return a & b
+        return [x and y for x, y in zip(a, b)]
+
+    def _or(self, a, b):
+        if self.use_numpy:
+            return a | b
+        return [x or y for x, y in zip(a, b)]
+
+    def _not(self, a):
+        if self.use_numpy:
+            return ~a
+        return [not x for x in a]
+
+    def _mask(self, values: T.Iterable[bool]):
+        if self.use_numpy:
+            return np.fromiter(values, dtype=bool, count=self.n_rows)
+        return list(values)
+
+    # --- columns
+    def _set_data(self, data: T.Union[T.List[T.Any], T.Dict[str, T.Any]]):
+        if isinstance(data, dict):
+            self.rows = None
+            self.columns = dict(data)
+            lengths = {len(column) for column in self.columns.values()}
+            if len(lengths) > 1:
+                raise ValueError("all the columns must have the same length!")
+            self.n_rows = lengths.pop() if lengths else 0
+        else:
+            self.rows = data
+            self.columns = dict()
+            self.n_rows = len(data)
+
+    def _get_column(self, path: str) -> T.Any:
+        try:
+            return self.columns[path]
+        except KeyError:
+            pass
+        if self.rows is None:
+            column = [MISSING] * self.n_rows
+        else:
+            get = jsonpath.compile_path(path).get
+            column = list()
+            has_missing = False
+            for row in self.rows:
+                try:
+                    column.append(get(row))
+                except exc.JsonPathNotFoundError:
+                    column.append(MISSING)
+                    has_missing = True
+            if self.use_numpy and not has_missing:
+                column = _to_array(column)
+        self.columns[path] = column
+        return column
+
+    # --- evaluation
+    def _evaluate_vectorized(
+        self,
+        rule: DataTestExpression,
+        column: T.Any,
+        kind: str,
+    ) -> T.Optional[_Mask]:
+        """
+        Return None if the rule can't be evaluated vectorized.
+        """
+        operator_ = rule.operator
+        false = _Mask(self._full(False), self._full(False))
+        if operator_ == C.IsPresent:
+            return _Mask(self._full(rule.expected is True), self._full(False))
+        if operator_ in _type_check_results[kind]:
+            result = _type_check_results[kind][operator_] is rule.expected
+            return _Mask(self._full(result), self._full(False))
+        if operator_ == C.StringMatches:
+            return None
+        is_path = operator_.endswith("Path")
+        if is_path:
+            operator_ = operator_[:-4]
+        family = next(
+            (family for family in ("String", "Numeric", "Boolean")
+             if operator_.startswith(family)),
+            None,
+        )
+        if family is None:
+            # timestamp is compared per element
+            return None
+        relation = next(
+            func for suffix, func in _relations if operator_.endswith(suffix)
+        )
+        if is_path:
+            expected_column = self._get_column(rule.expected)
+            expected_kind = _column_kind(expected_column)
+            if expected_kind is None:
+                return None
+            if (
+                family != _vectorized_families[kind]
+                or family != _vectorized_families[expected_kind]
+            ):
+                return false
+            return _Mask(
+                np.asarray(relation(column, expected_column), dtype=bool),
+                self._full(False),
+            )
+        if family != _vectorized_families[kind]:
+            # type mismatch, for example NumericEquals on a string column
+            return false
+        expected = rule.expected
+        if family == "Numeric":
+            if not isinstance(expected, (int, float)) or isinstance(expected, bool):
+                return false
+        elif family == "Boolean":
+            if not isinstance(expected, bool):
+                return false
+        elif not isinstance(expected, str):
+            return false
+        return _Mask(
+            np.asarray(relation(column, expected), dtype=bool),
+            self._full(False),
+        )
+
+    def _evaluate_per_element(
+        self,
+        rule: DataTestExpression,
+        column: T.Any,
+    ) -> _Mask:
+        """
+        Evaluate the rule on each element with the compiled predicate.
+        """
+        column = _to_list(column)
+        if rule.operator.endswith("Path"):
+            expected_column = _to_list(self._get_column(rule.expected))
+            test = compile_rule(
+                DataTestExpression(
+                    variable="$.v", operator=rule.operator, expected="$.e",
+                )
+            )
+        else:
+            expected_column = None
+            test = compile_rule(
+                DataTestExpression(
+                    variable="$.v", operator=rule.operator,
+                    expected=rule.expected,
+                )
+            )
+        true, error = list(), list()
+        for ith, value in enumerate(column):
+            data = dict()
+            if value is not MISSING:
+                data["v"] = value
+            if expected_column is not None:
+                expected_value = expected_column[ith]
+                if expected_value is not MISSING:
+                    data["e"] = expected_value
+            try:
+                true.append(test(data))
+                error.append(False)
+            except exc.StatesError:
+                true.append(False)
+                error.append(True)
+        return _Mask(self._mask(true), self._mask(error))
+
+    def _evaluate_data_test_expression(self, rule: DataTestExpression) -> _Mask:
+        column = self._get_column(rule.variable)
+        kind = _column_kind(column) if self.use_numpy else None
+        if kind is not None:
+            mask = self._evaluate_vectorized(rule, column, kind)
+            if mask is not None:
+                return mask
+        return self._evaluate_per_element(rule, column)
+
+    def evaluate_rule(self, rule: ChoiceRule) -> _Mask:
+        if isinstance(rule, DataTestExpression):
+            return self._evaluate_data_test_expression(rule)
+        if isinstance(rule, And):
+            # a sub rule is evaluated only if the previous ones are True,
+            # so its error counts only in those rows
+            result = _Mask(self._full(True), self._full(False))
+            for sub_rule in rule.rules:
+                mask = self.evaluate_rule(sub_rule)
+                error = self._and(result.true, mask.error)
+                result = _Mask(
+                    self._and(result.true, mask.true),
+                    self._or(result.error, error),
+                )
+            return result
+        if isinstance(rule, Or):
+            # a sub rule is evaluated only if the previous ones are False
+            result = _Mask(self._full(False), self._full(False))
+            for sub_rule in rule.rules:
+                mask = self.evaluate_rule(sub_rule)
+                undecided = self._not(self._or(result.true, result.error))
+                result = _Mask(
+                    self._or(result.true, self._and(undecided, mask.true)),
+                    self._or(result.error, self._and(undecided, mask.error)),
+                )
+            return result
+        if isinstance(rule, Not):
+            mask = self.evaluate_rule(rule.rule)
+            return _Mask(
+                self._and(self._not(mask.true), self._not(mask.error)),
+                mask.error,
+            )
+        raise TypeError(f"{rule!r} is not a supported choice rule!")
+
+    def evaluate(
+        self,
+        data: T.Union[T.List[T.Any], T.Dict[str, T.Any]],
+    ) -> T.List[T.Optional[str]]:
+        """
+        Return the ``Next`` state id per row. None means the row fails,
+        either no rule matches and there is no ``Default``, or a variable
+        doesn't exist (``States.Runtime``). With NumPy, it is an object
+        array.
+        """
+        self._set_data(data)
+        if self.use_numpy:
+            result = np.full(self.n_rows, None, dtype=object)
+        else:
+            result = [None] * self.n_rows
+        undecided = self._full(True)
+        for rule in self.state.choices:
+            mask = self.evaluate_rule(rule)
+            matched = self._and(undecided, mask.true)
+            decided = self._or(mask.true, mask.error)
+            if self.use_numpy:
+                result[matched] = rule.next
+                undecided = undecided & ~decided
+                if not undecided.any():
+                    break
+            else:
+                for ith, flag in enumerate(matched):
+                    if flag:
+                        result[ith] = rule.next
+                undecided = self._and(undecided, self._not(decided))
+                if not any(undecided):
+                    break
+        if self.state.default is not None:
+            if self.use_numpy:
+                result[undecided] = self.state.default
+            else:
+                for ith, flag in enumerate(undecided):
+                    if flag:
+                        result[ith] = self.state.default
+        return result
+
+
+def evaluate_batch(
+    state: 'Choice',
+    data: T.Union[T.List[T.Any], T.Dict[str, T.Any]],
+    use_numpy: T.Optional[bool] = None,
+) -> T.List[T.Optional[str]]:
+    """
+    Return the ``Next`` state id per row, see :meth:`BatchEvaluator.evaluate`.
+
+    :param data: a list of the state inputs, or a dict of ``Var.path`` ->
+        the column values, use :data:`MISSING` for a path that doesn't
+        exist in the row.
+    """
+    return BatchEvaluator(state, use_numpy=use_numpy).evaluate(data)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+Evaluate the Choice rules against the state input.
+
+Reference:
+
+- https://states-language.net/spec.html#choice-state
+"""
+
+import typing as T
+import re
+import datetime
+
+from .. import exc
+from .. import jsonpath
+from ..constant import Constant as C
+from ..choice_rule import ChoiceRule, DataTestExpression, And, Or, Not
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..state import Choice
+
+
+def is_numeric(value: T.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# RFC3339 with the Amazon States Language restrictions: an uppercase ``T``
+# between the date and the time, and an uppercase ``Z`` or a numeric offset
+_TIMESTAMP_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?"
+    r"(?:Z|([+-])(\d{2}):(\d{2}))"
+)
+
+
+def parse_timestamp(value: T.Any) -> T.Optional[datetime.datetime]:
+    """
+    Parse a RFC3339 timestamp string, return None if it is not a timestamp.
+
+    The time zone is required, ``"2022-01-05"`` and ``"2022-01-05T00:00:00"``
+    are not timestamps. The fraction of second can have any number of
+    digits, it is truncated to microseconds.
+    """
+    if not isinstance(value, str):
+        return None
+    match = _TIMESTAMP_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    (
+        year, month, day, hour, minute, second, fraction,
+        sign, offset_hour, offset_minute,
+    ) = match.groups()
+    if sign is None:
+        tzinfo = datetime.timezone.utc
+    else:
+        if int(offset_hour) > 23 or int(offset_minute) > 59:
+            return None
+        offset = datetime.timedelta(
+            hours=int(offset_hour), minutes=int(offset_minute),
+        )
+        tzinfo = datetime.timezone(-offset if sign == "-" else offset)
+    microsecond = int((fraction or "").ljust(6, "0")[:6])
+    try:
+        return datetime.datetime(
+            int(year), int(month), int(day),
+            int(hour), int(minute), int(second), microsecond,
+            tzinfo=tzinfo,
+        )
+    except ValueError:
+        return None
+
+
+def wildcard_to_regex(pattern: str) -> T.Pattern:
+    """
+    Convert a ``StringMatches`` pattern to regex, ``*`` matches any string,
+    ``\\*`` is a literal ``*``.
+    """
+    parts = list()
+    ith, n = 0, len(pattern)
+    while ith < n:
+        char = pattern[ith]
+        if char == "\\" and ith + 1 < n and pattern[ith + 1] in "*\\":
+            parts.append(re.escape(pattern[ith + 1]))
+            ith += 2
+            continue
+        parts.append(".*" if char == "*" else re.escape(char))
+        ith += 1
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _compare(operator: str, value: T.Any, expected: T.Any) -> bool:
+    if operator == C.StringMatches:
+        return isinstance(value, str) and bool(
+            wildcard_to_regex(expected).fullmatch(value)
+        )
+    if operator.startswith("String"):
+        if not (isinstance(value, str) and isinstance(expected, str)):
+            return False
+    elif operator.startswith("Numeric"):
+        if not (is_numeric(value) and is_numeric(expected)):
+            return False
+    elif operator.startswith("Boolean"):
+        return (
+            isinstance(value, bool)
+            and isinstance(expected, bool)
+            and value is expected
+        )
+    elif operator.startswith("Timestamp"):
+        value, expected = parse_timestamp(value), parse_timestamp(expected)
+        if value is None or expected is None:
+            return False
+    if operator.endswith("GreaterThanEquals"):
+        return value >= expected
+    if operator.endswith("GreaterThan"):
+        return value > expected
+    if operator.endswith("LessThanEquals"):
+        return value <= expected
+    if operator.endswith("LessThan"):
+        return value < expected
+    return value == expected
+
+
+# type checking operator -> check the value
+_type_checkers = {
+    C.IsNull: lambda value: value is None,
+    C.IsNumeric: is_numeric,
+    C.IsString: lambda value: isinstance(value, str),
+    C.IsBoolean: lambda value: isinstance(value, bool),
+    C.IsTimestamp: lambda value: parse_timestamp(value) is not None,
+}
+
+
+def evaluate_data_test_expression(
+    rule: DataTestExpression,
+    data: T.Any,
+) -> bool:
+    operator = rule.operator
+    if operator == C.IsPresent:
+        return jsonpath.has_value(data, rule.variable) is rule.expected
+    try:
+        value = jsonpath.get_value(data, rule.variable)
+    except exc.JsonPathNotFoundError as e:
+        raise exc.StatesError(C.RuntimeError, str(e))
+    if operator in _type_checkers:
+        return _type_checkers[operator](value) is rule.expected
+    expected = rule.expected
+    if operator.endswith("Path"):
+        operator = operator[:-4]
+        try:
+            expected = jsonpath.get_value(data, expected)
+        except exc.JsonPathNotFoundError as e:
+            raise exc.StatesError(C.RuntimeError, str(e))
+    return _compare(operator, value, expected)
+
+
+def evaluate_rule(rule: ChoiceRule, data: T.Any) -> bool:
+    """
+    Evaluate a data test expression or a boolean expression.
+    """
+    if isinstance(rule, DataTestExpression):
+        return evaluate_data_test_expression(rule, data)
+    if isinstance(rule, And):
+        return all(evaluate_rule(sub_rule, data) for sub_rule in rule.rules)
+    if isinstance(rule, Or):
+        return any(evaluate_rule(sub_rule, data) for sub_rule in rule.rules)
+    if isinstance(rule, Not):
+        return not evaluate_rule(rule.rule, data)
+    raise TypeError(f"{rule!r} is not a supported choice rule!")
+
+
+def choose_next(state: 'Choice', data: T.Any) -> str:
+    """
+    Return the ``Next`` state id of the first matched choice rule, or the
+    ``Default`` state id.
+    """
+    for rule in state.choices:
+        if evaluate_rule(rule, data):
+            return rule.next
+    if state.default is None:
+        raise exc.StatesError(
+            C.NoChoiceMatchedError,
+            f"no choice rule matched in State(id={state.id!r})",
+        )
+    return state.default
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compile the Choice rules into Python closures. The variable paths are
+resolved to compiled JSON path accessors, the timestamps are parsed and the
+``StringMatches`` wildcards are converted to regex once, so evaluating a
+rule is just a few function calls. The result is the same as
+:func:`~aws_stepfunction.local.choice.evaluate_rule`.
+
+Usage::
+
+    route = compile_choice(choice_state)
+    next_state_id = route({"n": 1})
+
+    # routing distribution of a million historical inputs
+    counter = route.replay(inputs)
+"""
+
+import typing as T
+import operator
+import collections
+
+from .. import exc
+from .. import jsonpath
+from ..constant import Constant as C
+from ..choice_rule import ChoiceRule, DataTestExpression, And, Or, Not
+from .choice import (
+    is_numeric, parse_timestamp, wildcard_to_regex, _type_checkers,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..state import Choice
+
+Predicate = T.Callable[[T.Any], bool]
+
+_INVALID = object()
+
+
+def _prepare_string(value: T.Any) -> T.Any:
+    return value if isinstance(value, str) else _INVALID
+
+
+def _prepare_numeric(value: T.Any) -> T.Any:
+    return value if is_numeric(value) else _INVALID
+
+
+def _prepare_boolean(value: T.Any) -> T.Any:
+    return value if isinstance(value, bool) else _INVALID
+
+
+def _prepare_timestamp(value: T.Any) -> T.Any:
+    timestamp = parse_timestamp(value)
+    return _INVALID if timestamp is None else timestamp
+
+
+# operator family -> convert the value to a comparable value or _INVALID
+_preparers = [
+    ("String", _prepare_string),
+    ("Numeric", _prepare_numeric),
+    ("Boolean", _prepare_boolean),
+    ("Timestamp", _prepare_timestamp),
+]
+
+# operator suffix -> relation, the longer suffix goes first
+_relations = [
+    ("GreaterThanEquals", operator.ge),
+    ("GreaterThan", operator.gt),
+    ("LessThanEquals", operator.le),
+    ("LessThan", operator.lt),
+    ("Equals", operator.eq),
+]
+
+
+def _runtime_error(error: exc.JsonPathNotFoundError) -> exc.StatesError:
+    return exc.StatesError(C.RuntimeError, str(error))
+
+
+def _compile_getter(path: str) -> T.Callable[[T.Any], T.Any]:
+    get = jsonpath.compile_path(path).get
+
+    def getter(data: T.Any) -> T.Any:
+        try:
+            return get(data)
+        except exc.JsonPathNotFoundError as e:
+            raise _runtime_error(e)
+
+    return getter
+
+
+def _compile_literal_test(
+    get: T.Callable[[T.Any], T.Any],
+    family: str,
+    relation: T.Callable[[T.Any, T.Any], bool],
+    expected: T.Any,
+) -> Predicate:
+    """
+    Compile the comparison with a literal expected value, the most common
+    families have their type check inlined.
+
+    :param get: the raw JSON path accessor of the variable.
+    """
+    if family == "Numeric":
+        def test(data: T.Any) -> bool:
+            try:
+                value = get(data)
+            except exc.JsonPathNotFoundError as e:
+                raise _runtime_error(e)
+            return (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and relation(value, expected)
+            )
+    elif family == "String":
+        def test(data: T.Any) -> bool:
+            try:
+                value = get(data)
+            except exc.JsonPathNotFoundError as e:
+                raise _runtime_error(e)
+            return isinstance(value, str) and relation(value, expected)
+    elif family == "Boolean":
+        def test(data: T.Any) -> bool:
+            try:
+                value = get(data)
+            except exc.JsonPathNotFoundError as e:
+                raise _runtime_error(e)
+            return value is expected
+    else:
+        prepare = dict(_preparers)[family]
+
+        def test(data: T.Any) -> bool:
+            try:
+                value = get(data)
+            except exc.JsonPathNotFoundError as e:
+                raise _runtime_error(e)
+            value = prepare(value)
+            return value is not _INVALID and relation(value, expected)
+
+    return test
+
+
+def _compile_data_test_expression(rule: DataTestExpression) -> Predicate:
+    operator_ = rule.operator
+    expected = rule.expected
+
+    if operator_ == C.IsPresent:
+        has = jsonpath.compile_path(rule.variable).has
+        return lambda data: has(data) is expected
+
+    if operator_ in _type_checkers:
+        get = _compile_getter(rule.variable)
+        check = _type_checkers[operator_]
+        return lambda data: check(get(data)) is expected
+
+    if operator_ == C.StringMatches:
+        get = _compile_getter(rule.variable)
+        match = wildcard_to_regex(expected).fullmatch
+
+        def test(data: T.Any) -> bool:
+            value = get(data)
+            return isinstance(value, str) and match(value) is not None
+
+        return test
+
+    is_path = operator_.endswith("Path")
+    if is_path:
+        operator_ = operator_[:-4]
+    family, prepare = next(
+        (family, func)
+        for family, func in _preparers
+        if operator_.startswith(family)
+    )
+    relation = next(
+        func for suffix, func in _relations if operator_.endswith(suffix)
+    )
+
+    if is_path:
+        get = _compile_getter(rule.variable)
+        get_expected = _compile_getter(expected)
+
+        def test(data: T.Any) -> bool:
+            value = get(data)
+            expected_value = get_expected(data)
+            value = prepare(value)
+            expected_value = prepare(expected_value)
+            if value is _INVALID or expected_value is _INVALID:
+                return False
+            return relation(value, expected_value)
+
+        return test
+
+    expected = prepare(expected)
+    if expected is _INVALID:
+        get = _compile_getter(rule.variable)
+
+        def test(data: T.Any) -> bool:
+            get(data)  # still raise States.Runtime if the variable is missing
+            return False
+
+        return test
+
+    return _compile_literal_test(
+        jsonpath.compile_path(rule.variable).get, family, relation, expected,
+    )
+
+
+def compile_rule(rule: ChoiceRule) -> Predicate:
+    """
+    Compile a data test expression or a boolean expression into a function
+    that takes the state input and returns the test result.
+    """
+    if isinstance(rule, DataTestExpression):
+        return _compile_data_test_expression(rule)
+    if isinstance(rule, And):
+        tests = tuple(compile_rule(sub_rule) for sub_rule in rule.rules)
+
+        def test_and(data: T.Any) -> bool:
+            for test in tests:
+                if not test(data):
+                    return False
+            return True
+
+        return test_and
+    if isinstance(rule, Or):
+        tests = tuple(compile_rule(sub_rule) for sub_rule in rule.rules)
+
+        def test_or(data: T.Any) -> bool:
+            for test in tests:
+                if test(data):
+                    return True
+            return False
+
+        return test_or
+    if isinstance(rule, Not):
+        test = compile_rule(rule.rule)
+        return lambda data: not test(data)
+    raise TypeError(f"{rule!r} is not a supported choice rule!")
+
+
+class CompiledChoice:
+    """
+    A compiled ``Choice`` state, call it with the state input to get the
+    ``Next`` state id. Use :func:`compile_choice` to create it.
+
+    The compiled choice is a snapshot, compile it again after changing the
+    ``Choice`` state.
+    """
+
+    __slots__ = ("state_id", "rules", "default")
+
+    def __init__(self, state: 'Choice'):
+        self.state_id = state.id
+        self.rules = tuple(
+            (compile_rule(rule), rule.next)
+            for rule in state.choices
+        )
+        self.default = state.default
+
+    def __call__(self, data: T.Any) -> str:
+        for test, next_ in self.rules:
+            if test(data):
+                return next_
+        if self.default is None:
+            raise exc.StatesError(
+                C.NoChoiceMatchedError,
+                f"no choice rule matched in State(id={self.state_id!r})",
+            )
+        return self.default
+
+    def replay(
+        self,
+        inputs: T.Iterable[T.Any],
+        count_errors: bool = False,
+    ) -> T.Counter[str]:
+        """
+        Route all the inputs, return the number of inputs per ``Next``
+        state id.
+
+        :param count_errors: if True, an input that fails the routing
+            (for example, ``States.NoChoiceMatched``) is counted by the error
+            name instead of raising the error.
+        """
+        counter = collections.Counter()
+        if count_errors:
+            for data in inputs:
+                try:
+                    counter[self(data)] += 1
+                except exc.StatesError as e:
+                    counter[e.error] += 1
+        else:
+            for data in inputs:
+                counter[self(data)] += 1
+        return counter
+
+
+def compile_choice(state: 'Choice') -> CompiledChoice:
+    """
+    Compile all the rules of a ``Choice`` state.
+    """
+    return CompiledChoice(state)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the ``Map`` iterations concurrently on a :mod:`concurrent.futures`
+thread pool (IO bound task handlers) or process pool (CPU bound task
+handlers).
+
+Usage::
+
+    runner = ConcurrentRunner(executor="thread", max_workers=16)
+    runner.register("arn:aws:lambda:us-east-1:111122223333:function:fetch", fetch)
+    output, next_state_id = runner.run_state(map_state, {"items": [...]})
+
+With the process pool, the handlers, the ``Map`` iterator and the
+iteration inputs are pickled and sent to the worker processes, so the
+handlers have to be module level functions.
+"""
+
+import typing as T
+import os
+import concurrent.futures
+
+import attr
+
+from .. import exc
+from .engine import LocalRunner, _Execution
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..workflow import Workflow
+    from ..state import Map
+
+
+class ExecutorEnum:
+    thread = "thread"
+    process = "process"
+
+
+_executor_classes = {
+    ExecutorEnum.thread: concurrent.futures.ThreadPoolExecutor,
+    ExecutorEnum.process: concurrent.futures.ProcessPoolExecutor,
+}
+
+
+def _run_chunk(
+    runner: LocalRunner,
+    iterator: 'Workflow',
+    execution: _Execution,
+    chunk: T.List[T.Tuple[T.Any, dict]],
+) -> T.List[T.Any]:
+    """
+    Run the ``Map`` iterator for a chunk of (iteration input, context object).
+    It is a module level function so the process pool can pickle it.
+    """
+    results = list()
+    for iteration_input, iteration_context in chunk:
+        try:
+            results.append(
+                runner.run_workflow(
+                    iterator,
+                    iteration_input,
+                    execution.fork(),
+                    iteration_context,
+                )
+            )
+        except exc.StatesError as e:
+            raise exc.StatesError(e.error, e.cause, branch_failed=True)
+    return results
+
+
+@attr.s
+class ConcurrentRunner(LocalRunner):
+    """
+    A :class:`~aws_stepfunction.local.engine.LocalRunner` that runs the
+    ``Map`` iterations concurrently. The number of concurrent iterations is
+    ``Map.max_concurrency``, if it is 0 (no limit) then ``max_workers``.
+    The outputs are in the same order as the items, the first failed
+    iteration cancels the pending iterations and fails the ``Map``.
+
+    :param executor: ``"thread"`` or ``"process"``.
+    :param max_workers: the pool size when ``Map.max_concurrency`` is 0,
+        by default it is the ``concurrent.futures`` default.
+    :param chunk_size: the number of iterations sent to the pool in one
+        task, a worker runs the iterations of a chunk one by one. A bigger
+        chunk reduces the scheduling, pickle and IPC overhead. By default,
+        the items are split into about 4 chunks per worker.
+    """
+    executor: str = attr.ib(
+        default=ExecutorEnum.thread,
+        validator=attr.validators.in_(list(_executor_classes)),
+    )
+    max_workers: T.Optional[int] = attr.ib(default=None)
+    chunk_size: T.Optional[int] = attr.ib(default=None)
+
+    def get_max_workers(self, state: 'Map', n_items: int) -> int:
+        if state.max_concurrency:
+            max_workers = state.max_concurrency
+        elif self.max_workers:
+            max_workers = self.max_workers
+        elif self.executor == ExecutorEnum.process:
+            max_workers = os.cpu_count() or 1
+        else:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        return max(1, min(max_workers, n_items))
+
+    def get_chunk_size(self, n_items: int, max_workers: int) -> int:
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, -(-n_items // (max_workers * 4)))
+
+    def _get_worker_runner(self) -> LocalRunner:
+        # a nested Map in a worker process runs on a thread pool,
+        # the pool worker processes can't start their own process pool
+        if self.executor == ExecutorEnum.process:
+            return attr.evolve(self, executor=ExecutorEnum.thread)
+        return self
+
+    def run_iterations(
+        self,
+        state: 'Map',
+        data: T.Any,
+        items: T.List[T.Any],
+        execution: '_Execution',
+        context: dict,
+    ) -> T.List[T.Any]:
+        if len(items) <= 1:
+            return super().run_iterations(
+                state, data, items, execution, context,
+            )
+
+        max_workers = self.get_max_workers(state, len(items))
+        chunk_size = self.get_chunk_size(len(items), max_workers)
+        iterations = [
+            self.get_map_iteration_input(state, data, index, item, context)
+            for index, item in enumerate(items)
+        ]
+        worker_runner = self._get_worker_runner()
+
+        executor_class = _executor_classes[self.executor]
+        with executor_class(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(
+                    _run_chunk,
+                    worker_runner,
+                    state.iterator,
+                    execution,
+                    iterations[start:start + chunk_size],
+                )
+                for start in range(0, len(iterations), chunk_size)
+            ]
+            done, not_done = concurrent.futures.wait(
+                futures,
+                return_when=concurrent.futures.FIRST_EXCEPTION,
+            )
+            if not_done:
+                for future in not_done:
+                    future.cancel()
+                # re-raise the error of the first failed chunk
+                for future in futures:
+                    if (
+                        future.done()
+                        and not future.cancelled()
+                        and future.exception() is not None
+                    ):
+                        raise future.exception()
+            results = list()
+            for future in futures:
+                results.extend(future.result())
+            return results
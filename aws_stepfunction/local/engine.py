@@ -0,0 +1,668 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local Amazon States Language interpreter. Run a
+:class:`~aws_stepfunction.workflow.Workflow` in process, the ``Task`` states
+call the Python handlers registered by ``Task.resource``.
+
+Usage::
+
+    runner = LocalRunner()
+
+    @runner.register("arn:aws:lambda:us-east-1:111122223333:function:add")
+    def add(event):
+        return event["a"] + event["b"]
+
+    output = runner.execute(workflow, {"a": 1, "b": 2})
+
+Reference:
+
+- https://states-language.net/spec.html
+- https://docs.aws.amazon.com/step-functions/latest/dg/concepts-input-output-filtering.html
+"""
+
+import typing as T
+import uuid
+import datetime
+
+import attr
+
+from .. import exc
+from .. import jsonpath
+from ..constant import Constant as C
+from .choice import choose_next, parse_timestamp
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..workflow import Workflow
+    from ..state import (
+        StateType, Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail,
+        Retry, Catch,
+    )
+
+Handler = T.Callable[[T.Any], T.Any]
+
+
+def _utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _no_sleep(seconds: float):
+    pass
+
+
+# ------------------------------------------------------------------------------
+# Input and output processing
+# ------------------------------------------------------------------------------
+def _get_path(data: T.Any, path: str, context: dict) -> T.Any:
+    try:
+        return jsonpath.get_value(data, path, context)
+    except (exc.JsonPathError, exc.JsonPathNotFoundError) as e:
+        raise exc.StatesError(C.RuntimeError, str(e))
+
+
+def resolve_parameters(template: T.Any, data: T.Any, context: dict) -> T.Any:
+    """
+    Build the ``Parameters`` / ``ResultSelector`` payload, the value of the
+    key ending with ``.$`` is a path of the data (``$``) or the
+    context object (``$$``).
+    """
+    if isinstance(template, dict):
+        result = dict()
+        for key, value in template.items():
+            if key.endswith(".$"):
+                if not isinstance(value, str) or not value.startswith("$"):
+                    raise exc.StatesError(
+                        C.IntrinsicFailureError,
+                        f"{key!r}: {value!r}, intrinsic function "
+                        f"is not supported in local execution",
+                    )
+                result[key[:-2]] = _get_path(data, value, context)
+            else:
+                result[key] = resolve_parameters(value, data, context)
+        return result
+    if isinstance(template, list):
+        return [resolve_parameters(value, data, context) for value in template]
+    return template
+
+
+def apply_input_path(state: 'StateType', data: T.Any, context: dict) -> T.Any:
+    if state.input_path is None:
+        return data
+    return _get_path(data, state.input_path, context)
+
+
+def apply_parameters(state: 'StateType', data: T.Any, context: dict) -> T.Any:
+    if not state.parameters:
+        return data
+    return resolve_parameters(state.parameters, data, context)
+
+
+def apply_result_path(
+    result_path: T.Optional[str],
+    data: T.Any,
+    result: T.Any,
+) -> T.Any:
+    """
+    :param result_path: None is ``$``, ``"null"`` discards the result.
+    """
+    if result_path is None or result_path == "$":
+        return result
+    if result_path == "null":
+        return data
+    try:
+        return jsonpath.set_value(data, result_path, result)
+    except (exc.JsonPathError, exc.JsonPathNotFoundError) as e:
+        raise exc.StatesError(C.ResultPathMatchFailureError, str(e))
+
+
+def apply_output_path(state: 'StateType', data: T.Any, context: dict) -> T.Any:
+    if state.output_path is None:
+        return data
+    return _get_path(data, state.output_path, context)
+
+
+def process_result(
+    state: 'StateType',
+    data: T.Any,
+    result: T.Any,
+    context: dict,
+) -> T.Any:
+    """
+    Apply ``ResultSelector``, ``ResultPath``, ``OutputPath`` to the result.
+
+    :param data: the raw state input
+    """
+    if getattr(state, "result_selector", None):
+        result = resolve_parameters(state.result_selector, result, context)
+    output = apply_result_path(state.result_path, data, result)
+    return apply_output_path(state, output, context)
+
+
+# ------------------------------------------------------------------------------
+# Error handling
+# ------------------------------------------------------------------------------
+def is_error_matched(error: 'exc.StatesError', error_equals: T.List[str]) -> bool:
+    """
+    Check if the error matches the ``ErrorEquals`` of a ``Retry`` / ``Catch``.
+    ``States.Runtime`` is a terminal error, it can not be retried or caught.
+    """
+    if error.error == C.RuntimeError:
+        return False
+    for error_name in error_equals:
+        if error_name == error.error:
+            return True
+        if error_name == C.AllError:
+            return True
+        if error_name == C.TaskFailedError and error.error != C.TimeoutError:
+            return True
+        if error_name == C.BranchFailedError and error.branch_failed:
+            return True
+    return False
+
+
+def _find_matched(
+    error: 'exc.StatesError',
+    items: T.List[T.Union['Retry', 'Catch']],
+) -> T.Optional[int]:
+    for ith, item in enumerate(items):
+        if is_error_matched(error, item.error_equals):
+            return ith
+    return None
+
+
+class _Execution:
+    """
+    The state shared by all the states of an execution.
+    """
+
+    def __init__(self, context: dict, max_transitions: int):
+        self.context = context
+        self.max_transitions = max_transitions
+        self.n_transition = 0
+
+    def fork(self) -> '_Execution':
+        """
+        Create an execution for a ``Parallel`` branch or a ``Map`` iteration,
+        it shares the context object but counts its own transitions.
+        """
+        return _Execution(
+            context=self.context,
+            max_transitions=self.max_transitions,
+        )
+
+    def transition(self):
+        self.n_transition += 1
+        if self.n_transition > self.max_transitions:
+            raise exc.StatesError(
+                C.RuntimeError,
+                f"exceeded the max transitions {self.max_transitions}",
+            )
+
+
+# ------------------------------------------------------------------------------
+# Interpreter
+# ------------------------------------------------------------------------------
+@attr.s
+class LocalRunner:
+    """
+    Execute a workflow locally.
+
+    :param handlers: ``Task.resource`` -> a callable that takes the task input
+        and returns the task result. Raise :class:`~aws_stepfunction.exc.StatesError`
+        to fail with a specific error name, other exceptions fail with the
+        exception class name as the error name.
+    :param sleep: the function to wait for ``Wait`` states and ``Retry``
+        intervals, by default it doesn't wait. Use ``time.sleep`` to
+        simulate the real timing.
+    :param max_transitions: fail the execution if the workflow, a
+        ``Parallel`` branch or a ``Map`` iteration has more state transitions
+        than this, to prevent infinite loops.
+    """
+    handlers: T.Dict[str, Handler] = attr.ib(factory=dict)
+    sleep: T.Callable[[float], None] = attr.ib(default=_no_sleep)
+    max_transitions: int = attr.ib(default=25000)
+
+    def register(
+        self,
+        resource: str,
+        handler: T.Optional[Handler] = None,
+    ):
+        """
+        Register a handler for the ``Task.resource``, it can be also used
+        as a decorator.
+        """
+        if handler is None:
+            def decorator(func: Handler) -> Handler:
+                self.handlers[resource] = func
+                return func
+
+            return decorator
+        self.handlers[resource] = handler
+        return handler
+
+    def _new_context(
+        self,
+        workflow: 'Workflow',
+        input: T.Any,
+        name: T.Optional[str],
+    ) -> dict:
+        if name is None:
+            name = str(uuid.uuid4())
+        return {
+            "Execution": {
+                "Id": f"local:{workflow.id}:{name}",
+                "Input": input,
+                "Name": name,
+                "StartTime": _utc_now().isoformat(),
+            },
+            "StateMachine": {
+                "Id": f"local:{workflow.id}",
+                "Name": workflow.id,
+            },
+        }
+
+    def _new_state_context(
+        self,
+        state: 'StateType',
+        input: T.Any,
+        name: T.Optional[str],
+    ) -> dict:
+        if name is None:
+            name = str(uuid.uuid4())
+        return {
+            "Execution": {
+                "Id": f"local:{state.id}:{name}",
+                "Input": input,
+                "Name": name,
+                "StartTime": _utc_now().isoformat(),
+            },
+            "State": {
+                "Name": state.id,
+                "EnteredTime": _utc_now().isoformat(),
+            },
+        }
+
+    def execute(
+        self,
+        workflow: 'Workflow',
+        input: T.Any = None,
+        name: T.Optional[str] = None,
+    ) -> T.Any:
+        """
+        Execute the workflow and return the output.
+
+        :raises: :class:`~aws_stepfunction.exc.StatesError` if the
+            execution failed.
+        """
+        if input is None:
+            input = dict()
+        execution = _Execution(
+            context=self._new_context(workflow, input, name),
+            max_transitions=self.max_transitions,
+        )
+        return self.run_workflow(workflow, input, execution)
+
+    def run_state(
+        self,
+        state: 'StateType',
+        input: T.Any = None,
+        name: T.Optional[str] = None,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        """
+        Run a single state outside of a workflow, for example, simulate a
+        ``Map`` state with an input list.
+
+        :return: the state output and the next state id, the next state id
+            is None if it is the end of the workflow.
+        """
+        if input is None:
+            input = dict()
+        execution = _Execution(
+            context=self._new_state_context(state, input, name),
+            max_transitions=self.max_transitions,
+        )
+        run_state = getattr(self, self._state_runners[state.type])
+        return run_state(state, input, execution, execution.context)
+
+    def run_workflow(
+        self,
+        workflow: 'Workflow',
+        data: T.Any,
+        execution: '_Execution',
+        context: T.Optional[dict] = None,
+    ) -> T.Any:
+        """
+        Run a workflow, a ``Parallel`` branch or a ``Map`` iterator.
+
+        :param context: the context object, by default it is
+            ``execution.context``.
+        """
+        if context is None:
+            context = execution.context
+        state_id = workflow._start_at
+        while True:
+            execution.transition()
+            try:
+                state = workflow._states[state_id]
+            except KeyError:
+                raise exc.StatesError(
+                    C.RuntimeError, f"State(id={state_id!r}) is not defined!"
+                )
+            state_context = dict(context)
+            state_context["State"] = {
+                "Name": state_id,
+                "EnteredTime": _utc_now().isoformat(),
+            }
+            run_state = getattr(self, self._state_runners[state.type])
+            data, state_id = run_state(state, data, execution, state_context)
+            if state_id is None:
+                return data
+
+    @staticmethod
+    def _get_retry_interval(
+        state: T.Union['Task', 'Parallel', 'Map'],
+        error: 'exc.StatesError',
+        n_attempts: T.Dict[int, int],
+    ) -> T.Optional[float]:
+        """
+        Return the seconds to wait before the next attempt, or None if
+        no ``Retry`` matches the error or the max attempts is reached.
+
+        :param n_attempts: the ``Retry`` index -> the number of retries,
+            it is updated in place.
+        """
+        ith = _find_matched(error, state.retry)
+        if ith is None:
+            return None
+        retry = state.retry[ith]
+        n_attempt = n_attempts.get(ith, 0)
+        max_attempts = 3 if retry.max_attempts is None else retry.max_attempts
+        if n_attempt >= max_attempts:
+            return None
+        interval = 1 if retry.interval_seconds is None else retry.interval_seconds
+        backoff_rate = 2.0 if retry.backoff_rate is None else retry.backoff_rate
+        n_attempts[ith] = n_attempt + 1
+        return interval * backoff_rate ** n_attempt
+
+    @staticmethod
+    def _catch_error(
+        state: T.Union['Task', 'Parallel', 'Map'],
+        data: T.Any,
+        error: 'exc.StatesError',
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        """
+        Return the output and the next state id of the matched ``Catch``,
+        re-raise the error if no ``Catch`` matches.
+        """
+        ith = _find_matched(error, state.catch)
+        if ith is None:
+            raise error
+        catch = state.catch[ith]
+        output = apply_result_path(
+            catch.result_path, data, error.to_error_output(),
+        )
+        return output, catch.next
+
+    def _with_retry_catch(
+        self,
+        state: T.Union['Task', 'Parallel', 'Map'],
+        data: T.Any,
+        context: dict,
+        run: T.Callable[[], T.Any],
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        n_attempts: T.Dict[int, int] = dict()
+        while True:
+            try:
+                return run(), state.next
+            except exc.StatesError as e:
+                error = e
+            interval = self._get_retry_interval(state, error, n_attempts)
+            if interval is None:
+                return self._catch_error(state, data, error)
+            self.sleep(interval)
+
+    @staticmethod
+    def _call_handler(handler: Handler, data: T.Any) -> T.Any:
+        try:
+            return handler(data)
+        except exc.StatesError:
+            raise
+        except Exception as e:
+            raise exc.StatesError(e.__class__.__name__, str(e))
+
+    def _get_handler(self, state: 'Task') -> Handler:
+        try:
+            return self.handlers[state.resource]
+        except KeyError:
+            raise exc.StatesError(
+                C.RuntimeError,
+                f"no handler registered for resource {state.resource!r}",
+            )
+
+    def _run_task(
+        self,
+        state: 'Task',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        handler = self._get_handler(state)
+
+        def run():
+            effective_input = apply_parameters(
+                state, apply_input_path(state, data, context), context,
+            )
+            result = self._call_handler(handler, effective_input)
+            return process_result(state, data, result, context)
+
+        return self._with_retry_catch(state, data, context, run)
+
+    def _run_pass(
+        self,
+        state: 'Pass',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        effective_input = apply_parameters(
+            state, apply_input_path(state, data, context), context,
+        )
+        result = effective_input if state.result is None else state.result
+        output = apply_result_path(state.result_path, data, result)
+        return apply_output_path(state, output, context), state.next
+
+    @staticmethod
+    def _get_wait_seconds(
+        state: 'Wait',
+        effective_input: T.Any,
+        context: dict,
+    ) -> float:
+        if state.seconds is not None:
+            return state.seconds
+        if state.seconds_path is not None:
+            return _get_path(effective_input, state.seconds_path, context)
+        if state.timestamp is not None:
+            timestamp = state.timestamp
+        else:
+            timestamp = _get_path(
+                effective_input, state.timestamp_path, context,
+            )
+        until = parse_timestamp(timestamp)
+        if until is None:
+            raise exc.StatesError(
+                C.RuntimeError, f"{timestamp!r} is not a valid timestamp",
+            )
+        return (until - _utc_now()).total_seconds()
+
+    def _run_wait(
+        self,
+        state: 'Wait',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        effective_input = apply_input_path(state, data, context)
+        seconds = self._get_wait_seconds(state, effective_input, context)
+        if seconds > 0:
+            self.sleep(seconds)
+        return apply_output_path(state, effective_input, context), state.next
+
+    def _run_choice(
+        self,
+        state: 'Choice',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        effective_input = apply_input_path(state, data, context)
+        next_ = choose_next(state, effective_input)
+        return apply_output_path(state, effective_input, context), next_
+
+    def _run_succeed(
+        self,
+        state: 'Succeed',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        effective_input = apply_input_path(state, data, context)
+        return apply_output_path(state, effective_input, context), None
+
+    def _run_fail(
+        self,
+        state: 'Fail',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        raise exc.StatesError(state.error or "", state.cause or "")
+
+    def run_branches(
+        self,
+        state: 'Parallel',
+        data: T.Any,
+        execution: '_Execution',
+    ) -> T.List[T.Any]:
+        """
+        Run the ``Parallel`` branches with the same input, return the
+        branch outputs in order. Any branch failure fails the ``Parallel``.
+        """
+        results = list()
+        for branch in state.branches:
+            try:
+                results.append(
+                    self.run_workflow(branch, data, execution.fork())
+                )
+            except exc.StatesError as e:
+                raise exc.StatesError(e.error, e.cause, branch_failed=True)
+        return results
+
+    def _run_parallel(
+        self,
+        state: 'Parallel',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        def run():
+            effective_input = apply_parameters(
+                state, apply_input_path(state, data, context), context,
+            )
+            result = self.run_branches(state, effective_input, execution)
+            return process_result(state, data, result, context)
+
+        return self._with_retry_catch(state, data, context, run)
+
+    def get_map_items(
+        self,
+        state: 'Map',
+        data: T.Any,
+        context: dict,
+    ) -> T.List[T.Any]:
+        """
+        Get the ``ItemsPath`` array from the effective input.
+        """
+        items = data if state.items_path is None \
+            else _get_path(data, state.items_path, context)
+        if not isinstance(items, list):
+            raise exc.StatesError(
+                C.RuntimeError,
+                f"State(id={state.id!r}): {C.ItemsPath} doesn't point to an array",
+            )
+        return items
+
+    def get_map_iteration_input(
+        self,
+        state: 'Map',
+        data: T.Any,
+        index: int,
+        item: T.Any,
+        context: dict,
+    ) -> T.Tuple[T.Any, dict]:
+        """
+        Return the iteration input and context object of a ``Map`` item.
+        """
+        iteration_context = dict(context)
+        iteration_context["Map"] = {"Item": {"Index": index, "Value": item}}
+        if state.parameters:
+            item = resolve_parameters(state.parameters, data, iteration_context)
+        return item, iteration_context
+
+    def run_iterations(
+        self,
+        state: 'Map',
+        data: T.Any,
+        items: T.List[T.Any],
+        execution: '_Execution',
+        context: dict,
+    ) -> T.List[T.Any]:
+        """
+        Run the ``Map`` iterator for each item, return the outputs in order.
+        Any iteration failure fails the ``Map``.
+        """
+        results = list()
+        for index, item in enumerate(items):
+            iteration_input, iteration_context = self.get_map_iteration_input(
+                state, data, index, item, context,
+            )
+            try:
+                results.append(
+                    self.run_workflow(
+                        state.iterator,
+                        iteration_input,
+                        execution.fork(),
+                        iteration_context,
+                    )
+                )
+            except exc.StatesError as e:
+                raise exc.StatesError(e.error, e.cause, branch_failed=True)
+        return results
+
+    def _run_map(
+        self,
+        state: 'Map',
+        data: T.Any,
+        execution: '_Execution',
+        context: dict,
+    ) -> T.Tuple[T.Any, T.Optional[str]]:
+        def run():
+            effective_input = apply_input_path(state, data, context)
+            items = self.get_map_items(state, effective_input, context)
+            result = self.run_iterations(
+                state, effective_input, items, execution, context,
+            )
+            return process_result(state, data, result, context)
+
+        return self._with_retry_catch(state, data, context, run)
+
+    # state type -> method name
+    _state_runners = {
+        C.Task: "_run_task",
+        C.Pass: "_run_pass",
+        C.Wait: "_run_wait",
+        C.Choice: "_run_choice",
+        C.Succeed: "_run_succeed",
+        C.Fail: "_run_fail",
+        C.Parallel: "_run_parallel",
+        C.Map: "_run_map",
+    }
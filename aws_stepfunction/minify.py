@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Minify the workflow definition JSON.
+
+The generated state ids like ``Parallel-after-Task-abc1234`` are great for
+human, but they are repeated in ``StartAt``, ``States``, ``Next``,
+``Default`` and ``Catch``. For a huge definition, this module:
+
+- dumps the JSON with compact separators.
+- optionally shortens the state ids (``a``, ``b``, ..., ``aa``, ``ab``, ...),
+  the id mapping table is kept to restore the readable ids.
+- drops the fields that equal to the Amazon States Language default value.
+
+Usage::
+
+    minified = minify_definition(workflow.serialize())
+    minified.to_json() # upload this
+    minified.restore() # the definition with readable ids
+"""
+
+import typing as T
+import json
+import string
+
+import attr
+
+from .constant import Constant as C
+
+COMPACT_SEPARATORS = (",", ":")
+
+_ID_CHARSET = string.ascii_lowercase + string.ascii_uppercase + string.digits
+
+# The field value that is the same as the Amazon States Language default
+_STATE_DEFAULT_VALUES = {
+    C.InputPath: "$",
+    C.OutputPath: "$",
+    C.ResultPath: "$",
+    C.ItemsPath: "$",
+    C.MaxConcurrency: 0,
+}
+
+_RETRY_DEFAULT_VALUES = {
+    C.IntervalSeconds: 1,
+    C.MaxAttempts: 3,
+    C.BackoffRate: 2.0,
+}
+
+_CATCH_DEFAULT_VALUES = {
+    C.ResultPath: "$",
+}
+
+_WORKFLOW_DEFAULT_VALUES = {
+    C.Version: "1.0",
+}
+
+
+def make_short_id(ith: int) -> str:
+    """
+    Convert a zero based index to a short id, 0 -> "a", 1 -> "b", ...
+    """
+    base = len(_ID_CHARSET)
+    chars = [_ID_CHARSET[ith % base]]
+    ith = ith // base
+    while ith:
+        ith -= 1
+        chars.append(_ID_CHARSET[ith % base])
+        ith = ith // base
+    return "".join(reversed(chars))
+
+
+def _drop_default(data: dict, defaults: dict) -> dict:
+    return {
+        key: value
+        for key, value in data.items()
+        if not (
+            key in defaults
+            and type(value) is not bool
+            and value == defaults[key]
+        )
+    }
+
+
+class _Transformer:
+    """
+    Walk the definition dict, returns a new dict, the input dict is
+    not modified (it may be shared with the serialization cache).
+
+    :param rename: the function to rename a state id, None to keep the id
+    """
+
+    def __init__(
+        self,
+        rename: T.Optional[T.Callable[[str], str]],
+        drop_default: bool,
+    ):
+        self.rename = rename
+        self.drop_default = drop_default
+
+    def _id(self, state_id: str) -> str:
+        if self.rename is None:
+            return state_id
+        return self.rename(state_id)
+
+    def _retry_or_catch(self, data: dict, defaults: dict) -> dict:
+        data = dict(data)
+        if C.Next in data:
+            data[C.Next] = self._id(data[C.Next])
+        if self.drop_default:
+            data = _drop_default(data, defaults)
+        return data
+
+    def workflow(self, data: dict) -> dict:
+        data = dict(data)
+        if C.StartAt in data:
+            data[C.StartAt] = self._id(data[C.StartAt])
+        if C.States in data:
+            data[C.States] = {
+                self._id(state_id): self.state(state_data)
+                for state_id, state_data in data[C.States].items()
+            }
+        if self.drop_default:
+            data = _drop_default(data, _WORKFLOW_DEFAULT_VALUES)
+        return data
+
+    def state(self, data: dict) -> dict:
+        data = dict(data)
+        for key in (C.Next, C.Default):
+            if key in data:
+                data[key] = self._id(data[key])
+        if C.Choices in data:
+            choices = list()
+            for rule in data[C.Choices]:
+                rule = dict(rule)
+                if C.Next in rule:
+                    rule[C.Next] = self._id(rule[C.Next])
+                choices.append(rule)
+            data[C.Choices] = choices
+        if C.Retry in data:
+            data[C.Retry] = [
+                self._retry_or_catch(retry, _RETRY_DEFAULT_VALUES)
+                for retry in data[C.Retry]
+            ]
+        if C.Catch in data:
+            data[C.Catch] = [
+                self._retry_or_catch(catch, _CATCH_DEFAULT_VALUES)
+                for catch in data[C.Catch]
+            ]
+        if C.Branches in data:
+            data[C.Branches] = [
+                self.workflow(branch)
+                for branch in data[C.Branches]
+            ]
+        if C.Iterator in data:
+            data[C.Iterator] = self.workflow(data[C.Iterator])
+        if self.drop_default:
+            data = _drop_default(data, _STATE_DEFAULT_VALUES)
+        return data
+
+
+@attr.s
+class MinifiedDefinition:
+    """
+    The result of :func:`minify_definition`.
+
+    :param definition: the minified definition dict.
+    :param id_mapping: short id -> original readable id. It is empty
+        if the state id is not shortened.
+    """
+    definition: dict = attr.ib()
+    id_mapping: T.Dict[str, str] = attr.ib(factory=dict)
+
+    def to_json(
+        self,
+        separators: T.Tuple[str, str] = COMPACT_SEPARATORS,
+    ) -> str:
+        return json.dumps(self.definition, separators=separators)
+
+    def get_readable_id(self, state_id: str) -> str:
+        """
+        Find the original readable id of a (shortened) state id,
+        for example, the state id in the execution history.
+        """
+        return self.id_mapping.get(state_id, state_id)
+
+    def restore(self) -> dict:
+        """
+        Restore the readable state ids.
+        """
+        return restore_definition(self.definition, self.id_mapping)
+
+
+def minify_definition(
+    definition: dict,
+    shorten_id: bool = True,
+    drop_default: bool = True,
+) -> MinifiedDefinition:
+    """
+    Minify a serialized workflow definition.
+
+    :param definition: the output of :meth:`Workflow.serialize`.
+    :param shorten_id: replace the state id with a short one.
+    :param drop_default: drop the field that equals to the ASL default value.
+    """
+    id_mapping: T.Dict[str, str] = dict()
+    if shorten_id:
+        short_ids: T.Dict[str, str] = dict()
+
+        def rename(state_id: str) -> str:
+            try:
+                return short_ids[state_id]
+            except KeyError:
+                short_id = make_short_id(len(short_ids))
+                short_ids[state_id] = short_id
+                id_mapping[short_id] = state_id
+                return short_id
+    else:
+        rename = None
+
+    data = _Transformer(rename=rename, drop_default=drop_default) \
+        .workflow(definition)
+    return MinifiedDefinition(definition=data, id_mapping=id_mapping)
+
+
+def restore_definition(
+    definition: dict,
+    id_mapping: T.Dict[str, str],
+) -> dict:
+    """
+    Restore the readable state ids of a minified definition.
+
+    :param id_mapping: short id -> original readable id.
+    """
+    return _Transformer(
+        rename=lambda state_id: id_mapping.get(state_id, state_id),
+        drop_default=False,
+    ).workflow(definition)
@@ -5,10 +5,278 @@ AWS StepFunction data model common module.
 """
 
 import typing as T
+import copy
+import json
+import hashlib
+import collections.abc
+
 import attr
 from .constant import Constant as C
 
 
+# ------------------------------------------------------------------------------
+# Compiled serializer
+# ------------------------------------------------------------------------------
+_SCALAR_TYPES = (str, int, float, bool)
+
+
+def _asdict_value(value: T.Any) -> T.Any:
+    """
+    Convert a field value the same way ``attr.asdict(recurse=True)`` does,
+    but skip the work for scalar values (the most common case).
+    """
+    if value is None or value.__class__ in _SCALAR_TYPES:
+        return value
+    if attr.has(value.__class__):
+        return attr.asdict(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_asdict_value(v) for v in value]
+    if isinstance(value, dict):
+        return {
+            _asdict_value(k): _asdict_value(v)
+            for k, v in value.items()
+        }
+    return value
+
+
+SerializerType = T.Callable[['StepFunctionObject'], dict]
+
+_serializer_cache: T.Dict[tuple, SerializerType] = dict()
+_alias_mapper_cache: T.Dict[type, T.Dict[str, str]] = dict()
+
+
+def _get_alias_mapper(cls: T.Type['StepFunctionObject']) -> T.Dict[str, str]:
+    """
+    Get the ``{attribute_name: alias_name}`` mapper of a class. It is built
+    from the ``attr.fields`` metadata only once per class.
+    """
+    try:
+        return _alias_mapper_cache[cls]
+    except KeyError:
+        mapper = {
+            field.name: field.metadata.get(C.ALIAS, field.name)
+            for field in attr.fields(cls)
+        }
+        _alias_mapper_cache[cls] = mapper
+        return mapper
+
+
+def _compile_serializer(
+    cls: T.Type['StepFunctionObject'],
+    exclude_none: bool,
+    exclude_empty_string: bool,
+    exclude_empty_collection: bool,
+    exclude_private_attr: bool,
+    use_alias: bool,
+    exclude_nested: bool,
+) -> SerializerType:
+    """
+    Build a specialized "attrs object to dict" function for a class.
+
+    Everything that only depends on the class definition (the field list,
+    the alias names and the exclusion rules) is resolved here, so the
+    returned function only loops over a pre-computed list of
+    ``(attribute_name, output_key)`` pairs.
+
+    :param exclude_nested: skip the fields marked with ``C.NESTED`` metadata.
+        These fields hold nested StepFunction objects (``Retry``, ``Catch``,
+        ``Workflow``, ``ChoiceRule``), the owner serializes them
+        by calling their own ``serialize()`` method.
+    """
+    mapper = _get_alias_mapper(cls)
+    field_list = [
+        (field.name, mapper[field.name] if use_alias else field.name)
+        for field in attr.fields(cls)
+        if not (exclude_private_attr and field.name.startswith("_"))
+        and not (exclude_nested and field.metadata.get(C.NESTED, False))
+    ]
+
+    def serializer(obj: 'StepFunctionObject') -> dict:
+        data = dict()
+        for name, key in field_list:
+            v = _asdict_value(getattr(obj, name))
+            if v is None:
+                if exclude_none:
+                    continue
+            elif isinstance(v, str):
+                if len(v) == 0:
+                    if exclude_empty_string:
+                        continue
+            elif isinstance(v, (list, dict)):
+                if len(v) == 0:
+                    if exclude_empty_collection:
+                        continue
+            data[key] = v
+        return data
+
+    return serializer
+
+
+def get_serializer(
+    cls: T.Type['StepFunctionObject'],
+    exclude_none: bool = True,
+    exclude_empty_string: bool = True,
+    exclude_empty_collection: bool = True,
+    exclude_private_attr: bool = True,
+    use_alias: bool = False,
+    exclude_nested: bool = False,
+) -> SerializerType:
+    """
+    Get the compiled serializer of a class, it is compiled on first use
+    and reused afterwards.
+    """
+    key = (
+        cls,
+        exclude_none,
+        exclude_empty_string,
+        exclude_empty_collection,
+        exclude_private_attr,
+        use_alias,
+        exclude_nested,
+    )
+    try:
+        return _serializer_cache[key]
+    except KeyError:
+        serializer = _compile_serializer(
+            cls,
+            exclude_none=exclude_none,
+            exclude_empty_string=exclude_empty_string,
+            exclude_empty_collection=exclude_empty_collection,
+            exclude_private_attr=exclude_private_attr,
+            use_alias=use_alias,
+            exclude_nested=exclude_nested,
+        )
+        _serializer_cache[key] = serializer
+        return serializer
+
+
+# ------------------------------------------------------------------------------
+# Streaming JSON
+# ------------------------------------------------------------------------------
+DEFAULT_SEPARATORS = (", ", ": ")  # the json.dumps default
+
+
+def iter_json_object(
+    data: dict,
+    separators: T.Tuple[str, str] = DEFAULT_SEPARATORS,
+) -> T.Iterable[str]:
+    """
+    Encode a dict to JSON chunk by chunk. The values that are
+    :class:`StepFunctionObject` (or list / dict of them) are streamed by their
+    ``_iter_json`` method instead of being serialized to a dict first.
+    The output is identical to ``json.dumps(data, separators=separators)``.
+    """
+    item_sep, key_sep = separators
+    yield "{"
+    for ith, (key, value) in enumerate(data.items()):
+        prefix = json.dumps(key) + key_sep
+        if ith:
+            prefix = item_sep + prefix
+        if isinstance(value, StepFunctionObject):
+            yield prefix
+            yield from value._iter_json(separators)
+        elif (
+            isinstance(value, list)
+            and len(value)
+            and isinstance(value[0], StepFunctionObject)
+        ):
+            yield prefix + "["
+            for jth, obj in enumerate(value):
+                if jth:
+                    yield item_sep
+                yield from obj._iter_json(separators)
+            yield "]"
+        elif (
+            isinstance(value, dict)
+            and len(value)
+            and isinstance(next(iter(value.values())), StepFunctionObject)
+        ):
+            yield prefix
+            yield from iter_json_object(value, separators)
+        else:
+            yield prefix + json.dumps(value, separators=separators)
+    yield "}"
+
+
+_nested_fields_cache: T.Dict[type, T.List[str]] = dict()
+
+
+def _get_nested_fields(cls: T.Type['StepFunctionObject']) -> T.List[str]:
+    """
+    Get the name of the fields marked with ``C.NESTED`` metadata of a class.
+    """
+    try:
+        return _nested_fields_cache[cls]
+    except KeyError:
+        names = [
+            field.name
+            for field in attr.fields(cls)
+            if field.metadata.get(C.NESTED, False)
+        ]
+        _nested_fields_cache[cls] = names
+        return names
+
+
+# ------------------------------------------------------------------------------
+# Dirty tracked cache
+# ------------------------------------------------------------------------------
+# These keys are stored in the instance ``__dict__`` directly, they are not
+# attrs fields, so they never show up in repr, eq and serialization.
+_CACHE_ENABLED = "_sfn_cache_enabled"
+_CACHE = "_sfn_cache"
+_PARENTS = "_sfn_parents"
+# the validation key of the last successful pre serialization validation
+_VALIDATED = "_sfn_validated"
+# the fields that are not modeled by the class, see StepFunctionObject.extra
+_EXTRA = "_sfn_extra"
+
+_SERIALIZE = "serialize"
+_FINGERPRINT = "fingerprint"
+
+# the canonical JSON encoder of the fingerprint content
+_fingerprint_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+_container_fields_cache: T.Dict[type, T.List[str]] = dict()
+
+
+def _get_container_fields(cls: T.Type['StepFunctionObject']) -> T.List[str]:
+    """
+    Get the name of the public list / dict fields (``factory=list`` or
+    ``factory=dict``) that are not marked with ``C.NESTED`` metadata of
+    a class, they can be mutated in place without ``__setattr__``.
+    """
+    try:
+        return _container_fields_cache[cls]
+    except KeyError:
+        names = [
+            field.name
+            for field in attr.fields(cls)
+            if not field.name.startswith("_")
+            and not field.metadata.get(C.NESTED, False)
+            and isinstance(field.default, attr.Factory)
+            and field.default.factory in (list, dict)
+        ]
+        _container_fields_cache[cls] = names
+        return names
+
+
+@attr.s
+class ValidationReport:
+    """
+    The result of :meth:`StepFunctionObject.validate`.
+
+    :param n_checked: the number of objects validated in this call.
+    :param n_skipped: the number of unchanged objects that are not validated
+        again.
+    :param checked: the location of the validated objects, for example,
+        ``$.States.Task1.Retry[0]``.
+    """
+    n_checked: int = attr.ib(default=0)
+    n_skipped: int = attr.ib(default=0)
+    checked: T.List[str] = attr.ib(factory=list)
+
+
 class _StepFunctionObject:
     """
     Attributes:
@@ -23,8 +291,157 @@ class _StepFunctionObject:
 class StepFunctionObject(_StepFunctionObject):
     """
     Base class for all serializable StepFunction object.
+
+    **Serialization cache**
+
+    Call :meth:`enable_cache` to memoize the :meth:`serialize` output.
+    The nested objects (``Retry``, ``Catch``, states of a ``Workflow``,
+    branches of a ``Parallel`` ...) automatically opt in when their owner
+    is serialized. Setting any attribute invalidates the cache of the object
+    and of all objects that contain it, so only the changed nodes and
+    their ancestors are serialized again.
+
+    Mutating a list or dict attribute in place (for example,
+    ``task.retry.append(...)`` or ``task.parameters["key"] = value``) is not
+    seen by ``__setattr__``, so the cached output is stored with a key made
+    of the list / dict fields and the nested objects. Before reusing it,
+    :meth:`serialize` walks the tree and drops the cache of the objects
+    whose key changed.
+
+    .. note::
+
+        The cached output is shared, don't mutate the returned dict.
     """
 
+    def __setattr__(self, name: str, value: T.Any):
+        object.__setattr__(self, name, value)
+        dct = self.__dict__
+        if _VALIDATED in dct:
+            del dct[_VALIDATED]
+        if _CACHE in dct or _PARENTS in dct:
+            self.invalidate_cache()
+
+    def _nested_objects(self) -> T.List['StepFunctionObject']:
+        """
+        Return the nested StepFunction objects stored in the fields marked
+        with ``C.NESTED`` metadata.
+        """
+        return [obj for _, obj in self._iter_nested_items()]
+
+    def _iter_nested_items(self) -> T.Iterable[T.Tuple[str, 'StepFunctionObject']]:
+        """
+        Yield (location, object) of the nested StepFunction objects, the
+        location is relative to this object, for example, ``.Retry[0]``.
+        """
+        mapper = _get_alias_mapper(self.__class__)
+        for name in _get_nested_fields(self.__class__):
+            value = getattr(self, name)
+            key = mapper[name]
+            if value is None:
+                continue
+            elif isinstance(value, collections.abc.Mapping):
+                for k, v in value.items():
+                    yield f".{key}.{k}", v
+            elif isinstance(value, list):
+                for ith, v in enumerate(value):
+                    yield f".{key}[{ith}]", v
+            else:
+                yield f".{key}", value
+
+    @property
+    def extra(self) -> T.Dict[str, T.Any]:
+        """
+        The fields that are not modeled by the class, for example, the
+        ``ItemProcessor`` of a ``Map`` or the ``Credentials`` of a ``Task``
+        parsed from an existing definition. They are appended to the
+        serialization output as they are, the modeled fields take precedence.
+        """
+        return self.__dict__.setdefault(_EXTRA, dict())
+
+    @extra.setter
+    def extra(self, value: T.Dict[str, T.Any]):
+        self.__dict__[_EXTRA] = dict(value)
+        self.invalidate_cache()
+
+    def enable_cache(self) -> 'StepFunctionObject':
+        """
+        Memoize the :meth:`serialize` output of this object and
+        all its nested objects.
+        """
+        self.__dict__[_CACHE_ENABLED] = True
+        return self
+
+    def disable_cache(self) -> 'StepFunctionObject':
+        """
+        Turn off the serialization cache of this object and all its nested
+        objects, and drop the cached data.
+        """
+        self.__dict__.pop(_CACHE_ENABLED, None)
+        self.invalidate_cache()
+        for obj in self._nested_objects():
+            obj.disable_cache()
+        return self
+
+    def invalidate_cache(self):
+        """
+        Drop the cached data of this object and all the objects that contain
+        it (the parent state, the workflow, the parallel state that use
+        the workflow as a branch ...).
+        """
+        dct = self.__dict__
+        dct.pop(_CACHE, None)
+        parents = dct.pop(_PARENTS, None)
+        if parents:
+            for parent in parents.values():
+                parent.invalidate_cache()
+
+    def _link_parent(self, parent: 'StepFunctionObject'):
+        """
+        Register the object that uses this object to build its cached data,
+        so it will be invalidated when this object changes.
+        """
+        # attrs object is not hashable, use id as the key
+        self.__dict__.setdefault(_PARENTS, dict())[id(parent)] = parent
+
+    def _serialize_cache_key(
+        self,
+        nested_items: T.List[T.Tuple[str, 'StepFunctionObject']],
+    ) -> T.Tuple[list, list]:
+        """
+        The content of the cached :meth:`serialize` output that can change
+        without ``__setattr__``: the list / dict fields and the identity of
+        the nested objects by location.
+        """
+        return (
+            [
+                getattr(self, name)
+                for name in _get_container_fields(self.__class__)
+            ] + [self.__dict__.get(_EXTRA)],
+            [(location, id(obj)) for location, obj in nested_items],
+        )
+
+    def _drop_stale_cache(self):
+        """
+        Drop the cached :meth:`serialize` output of the objects in the tree
+        that are mutated in place since they were serialized, their
+        ancestors are invalidated too.
+        """
+        nested_items = list(self._iter_nested_items())
+        for _, obj in nested_items:
+            obj._drop_stale_cache()
+        cached = self._get_cache(_SERIALIZE)
+        if (
+            cached is not None
+            and cached[2] != self._serialize_cache_key(nested_items)
+        ):
+            self.invalidate_cache()
+
+    def _get_cache(self, key: str) -> T.Any:
+        return self.__dict__.get(_CACHE, {}).get(key)
+
+    def _set_cache(self, key: str, value: T.Any):
+        self.__dict__.setdefault(_CACHE, dict())[key] = value
+
     def to_dict(
         self,
         exclude_none: bool = True,
@@ -40,28 +457,17 @@ class StepFunctionObject(_StepFunctionObject):
         - None
         - empty string
         - empty collection (list, dict)
-        """
-        data = dict()
-        for k, v in attr.asdict(self).items():
-            if k.startswith("_"):
-                if exclude_private_attr:
-                    continue
 
-            if v is None:
-                if exclude_none:
-                    continue
-            elif isinstance(v, str):
-                if len(v) == 0:
-                    if exclude_empty_string:
-                        continue
-            elif isinstance(v, (list, dict)):
-                if len(v) == 0:
-                    if exclude_empty_collection:
-                        continue
-            else:
-                pass
-            data[k] = v
-        return data
+        The per class conversion function is compiled once and cached,
+        see :func:`get_serializer`.
+        """
+        return get_serializer(
+            self.__class__,
+            exclude_none=exclude_none,
+            exclude_empty_string=exclude_empty_string,
+            exclude_empty_collection=exclude_empty_collection,
+            exclude_private_attr=exclude_private_attr,
+        )(self)
 
     @classmethod
     def _to_alias(cls, data: dict) -> dict:
@@ -72,10 +478,7 @@ class StepFunctionObject(_StepFunctionObject):
 
         For example, ``Workflow._start_at`` -> ``StartAt``.
         """
-        mapper = {
-            field.name: field.metadata.get(C.ALIAS, field.name)
-            for field in attr.fields(cls)
-        }
+        mapper = _get_alias_mapper(cls)
         return {
             mapper.get(k, k): v
             for k, v in data.items()
@@ -88,11 +491,89 @@ class StepFunctionObject(_StepFunctionObject):
         """
         if cls._field_order is None:
             return data
-        ordered_data = dict()
-        for key in cls._field_order:
-            if key in data:
-                ordered_data[key] = data[key]
-        return ordered_data
+        return {
+            key: data[key]
+            for key in cls._field_order
+            if key in data
+        }
+
+    def _sort_field_and_extra(self, data: dict) -> dict:
+        """
+        :meth:`_sort_field`, then append the ``extra`` fields.
+        """
+        data = self._sort_field(data)
+        extra = self.__dict__.get(_EXTRA)
+        if extra:
+            data = dict(data)
+            for key, value in extra.items():
+                data.setdefault(key, value)
+        return data
+
+    def _serialize_fields(self) -> dict:
+        """
+        Similar to ``self._to_alias(self.to_dict())``, but it uses
+        the compiled serializer to convert and rename the fields in one pass.
+
+        Unlike :meth:`to_dict`, it does NOT recursively convert the nested
+        StepFunction objects (fields marked with ``C.NESTED`` metadata),
+        they are excluded from the output. The subclass is responsible to
+        serialize them, so each node in the object tree is converted
+        exactly once.
+        """
+        return get_serializer(
+            self.__class__,
+            use_alias=True,
+            exclude_nested=True,
+        )(self)
+
+    def _fingerprint_fields(self) -> dict:
+        """
+        The own content of the object in the fingerprint, the nested objects
+        are excluded, they have their own fingerprint.
+        """
+        return self._serialize_fields()
+
+    def _fingerprint_key(self) -> str:
+        """
+        The canonical JSON of the list / dict fields, they can be mutated in
+        place without ``__setattr__``, so :meth:`fingerprint` compares it
+        before reusing the stored fingerprint.
+        """
+        return _fingerprint_encoder.encode([
+            getattr(self, name)
+            for name in _get_container_fields(self.__class__)
+        ] + [self.__dict__.get(_EXTRA)])
+
+    def fingerprint(self) -> str:
+        """
+        A stable SHA256 hex digest of the canonical content of this object
+        and all its nested objects. Two objects with the same fingerprint
+        produce the same definition.
+
+        It is a Merkle hash, the fingerprint of an object is computed from its
+        own fields and the fingerprints of its nested objects. The result is
+        stored with a key made of the list / dict fields and the nested
+        fingerprints, setting an attribute drops it. Every call walks the
+        whole tree and compares the keys, so in place changes such as
+        ``task.retry.append(...)`` or ``task.parameters["key"] = value`` are
+        detected, but only the changed objects and their ancestors are
+        hashed again.
+        """
+        nested = dict()
+        for location, obj in self._iter_nested_items():
+            nested[location] = obj.fingerprint()
+        key = (self._fingerprint_key(), nested)
+        cached = self._get_cache(_FINGERPRINT)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        content = [self.__class__.__name__, self._fingerprint_fields(), nested]
+        extra = self.__dict__.get(_EXTRA)
+        if extra:
+            content.append(extra)
+        content = _fingerprint_encoder.encode(content)
+        fingerprint = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self._set_cache(_FINGERPRINT, (key, fingerprint))
+        return fingerprint
 
     def _pre_serialize_validation(self): # pragma: no cover
         """
@@ -100,6 +581,73 @@ class StepFunctionObject(_StepFunctionObject):
         """
         pass
 
+    def _validation_key(self) -> T.Any:
+        """
+        The content that :meth:`_pre_serialize_validation` depends on,
+        besides the attributes. Setting any attribute drops the validation
+        result, so the key only has to cover what can change without
+        ``__setattr__``: a copy of the list / dict fields and the size of the
+        nested fields, the nested objects validate themselves. Subclass can
+        override it, None means "always validate".
+        """
+        key = [
+            getattr(self, name).copy()
+            for name in _get_container_fields(self.__class__)
+        ]
+        for name in _get_nested_fields(self.__class__):
+            value = getattr(self, name)
+            if isinstance(value, (list, dict)):
+                key.append(len(value))
+            else:
+                key.append(value is None)
+        return key
+
+    def _validate_incremental(self) -> bool:
+        """
+        Run :meth:`_pre_serialize_validation` unless the object already
+        passed it with the same validation key.
+
+        :return: indicate whether the validation is executed.
+        """
+        key = self._validation_key()
+        if key is not None and self.__dict__.get(_VALIDATED) == key:
+            return False
+        self._pre_serialize_validation()
+        if key is not None:
+            self.__dict__[_VALIDATED] = key
+        return True
+
+    def validate(
+        self,
+        incremental: bool = True,
+        _location: str = "$",
+        _report: T.Optional[ValidationReport] = None,
+    ) -> ValidationReport:
+        """
+        Run the pre serialization validation of this object and all its
+        nested objects, the first error is raised.
+
+        :param incremental: skip the objects that passed the validation and
+            are not changed since then. If False, validate everything.
+        :return: what was validated in this call.
+        """
+        if _report is None:
+            _report = ValidationReport()
+        if not incremental:
+            self.__dict__.pop(_VALIDATED, None)
+        if self._validate_incremental():
+            _report.n_checked += 1
+            _report.checked.append(_location)
+        else:
+            _report.n_skipped += 1
+        for location, obj in self._iter_nested_items():
+            obj.validate(
+                incremental=incremental,
+                _location=_location + location,
+                _report=_report,
+            )
+        return _report
+
     def _post_serialize_validation(self, data: dict): # pragma: no cover
         """
         A post-serialization hook for validation.
@@ -114,6 +662,16 @@ class StepFunctionObject(_StepFunctionObject):
         """
         raise NotImplementedError
 
+    def _iter_json(
+        self,
+        separators: T.Tuple[str, str] = DEFAULT_SEPARATORS,
+    ) -> T.Iterable[str]:
+        """
+        Yield the JSON of the serialized object chunk by chunk. By default,
+        it is a single chunk, subclass can stream the nested objects.
+        """
+        yield json.dumps(self.serialize(), separators=separators)
+
     def serialize(
         self,
         do_pre_validation=True,
@@ -122,12 +680,36 @@ class StepFunctionObject(_StepFunctionObject):
         """
         Public API for serialization
         """
+        use_cache = self.__dict__.get(_CACHE_ENABLED, False)
+        validated = do_pre_validation and do_post_validation
+        if use_cache:
+            if self._get_cache(_SERIALIZE) is not None:
+                self._drop_stale_cache()
+            cached = self._get_cache(_SERIALIZE)
+            if cached is not None:
+                # data serialized without validation can not be reused
+                # when validation is required
+                if cached[0] or (not validated):
+                    return cached[1]
+            for obj in self._nested_objects():
+                obj.__dict__[_CACHE_ENABLED] = True
+                obj._link_parent(self)
+
         if do_pre_validation:
-            self._pre_serialize_validation()
+            self._validate_incremental()
         data = self._serialize()
         # DO NOT call self._to_alias here, let the subclass decides
         # when should call it
-        new_data = self._sort_field(data)
+        new_data = self._sort_field_and_extra(data)
         if do_post_validation:
             self._post_serialize_validation(new_data)
+        if use_cache:
+            fields, nested = self._serialize_cache_key(
+                list(self._iter_nested_items())
+            )
+            # store a deep copy of the list / dict fields, they are compared
+            # with the content at this moment
+            self._set_cache(
+                _SERIALIZE, (validated, new_data, (copy.deepcopy(fields), nested)),
+            )
         return new_data
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+
+"""
+Amazon States Language JSON definition parser.
+
+Convert an existing definition, for example, the ``definition`` returned by
+``describe_state_machine``, into :class:`~aws_stepfunction.workflow.Workflow`,
+:class:`~aws_stepfunction.state.State` and
+:class:`~aws_stepfunction.choice_rule.ChoiceRule` objects.
+
+Usage::
+
+    workflow = parse_definition(definition_json)
+    workflow = parse_file("definition.json")
+
+    # only the StartAt / States index is materialized,
+    # the states are parsed on first access
+    workflow = parse_definition(definition_json, lazy=True)
+"""
+
+import typing as T
+import json
+import collections.abc
+
+import attr
+
+from . import exc
+from .constant import Constant as C, TestExpressionEnum
+from .state import (
+    State, Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail, Retry, Catch,
+)
+from .choice_rule import ChoiceRule, DataTestExpression, And, Or, Not
+from .workflow import Workflow
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .state import StateType
+
+_state_classes: T.Dict[str, T.Type['State']] = {
+    C.Task: Task,
+    C.Parallel: Parallel,
+    C.Map: Map,
+    C.Pass: Pass,
+    C.Wait: Wait,
+    C.Choice: Choice,
+    C.Succeed: Succeed,
+    C.Fail: Fail,
+}
+
+_reverse_alias_mapper_cache: T.Dict[T.Type, T.Dict[str, str]] = dict()
+
+
+def _get_reverse_alias_mapper(cls: T.Type) -> T.Dict[str, str]:
+    """
+    Get the ASL field name -> attribute name mapper of a class.
+    """
+    try:
+        return _reverse_alias_mapper_cache[cls]
+    except KeyError:
+        mapper = {
+            field.metadata[C.ALIAS]: field.name
+            for field in attr.fields(cls)
+            if C.ALIAS in field.metadata
+        }
+        _reverse_alias_mapper_cache[cls] = mapper
+        return mapper
+
+
+def _to_kwargs(
+    cls: T.Type,
+    data: dict,
+    skip: T.Iterable[str] = (),
+) -> T.Tuple[dict, dict]:
+    """
+    :return: the ``__init__`` kwargs of the modeled fields, and the fields
+        that are not modeled by the class, they are kept in
+        :attr:`~aws_stepfunction.model.StepFunctionObject.extra`.
+    """
+    mapper = _get_reverse_alias_mapper(cls)
+    kwargs, extra = dict(), dict()
+    for key, value in data.items():
+        if key in skip:
+            continue
+        try:
+            kwargs[mapper[key]] = value
+        except KeyError:
+            extra[key] = value
+    return kwargs, extra
+
+
+def _set_extra(obj: T.Any, extra: dict) -> T.Any:
+    if extra:
+        obj.extra = extra
+    return obj
+
+
+def _check_type(data: T.Any, type_: T.Type, path: str):
+    if not isinstance(data, type_):
+        raise exc.DefinitionParseError(
+            f"{path}: expect a {type_.__name__}, got {data!r}!"
+        )
+
+
+def parse_retry(data: dict, path: str = C.Retry) -> Retry:
+    _check_type(data, dict, path)
+    kwargs, extra = _to_kwargs(Retry, data)
+    return _set_extra(Retry(**kwargs), extra)
+
+
+def parse_catch(data: dict, path: str = C.Catch) -> Catch:
+    _check_type(data, dict, path)
+    kwargs, extra = _to_kwargs(Catch, data)
+    if C.ResultPath in data and data[C.ResultPath] is None:
+        kwargs["result_path"] = "null"
+    return _set_extra(Catch(**kwargs), extra)
+
+
+def parse_choice_rule(data: dict, path: str = C.Choices) -> ChoiceRule:
+    """
+    Parse a choice rule, a data test expression or a boolean expression
+    (``And``, ``Or``, ``Not``).
+    """
+    _check_type(data, dict, path)
+    next_ = data.get(C.Next)
+    if C.And in data:
+        return And(
+            rules=[
+                parse_choice_rule(rule, f"{path}.{C.And}[{ith}]")
+                for ith, rule in enumerate(data[C.And])
+            ],
+            next=next_,
+        )
+    if C.Or in data:
+        return Or(
+            rules=[
+                parse_choice_rule(rule, f"{path}.{C.Or}[{ith}]")
+                for ith, rule in enumerate(data[C.Or])
+            ],
+            next=next_,
+        )
+    if C.Not in data:
+        return Not(
+            rule=parse_choice_rule(data[C.Not], f"{path}.{C.Not}"),
+            next=next_,
+        )
+    operators = [
+        key
+        for key in data
+        if key not in (C.Variable, C.Next)
+    ]
+    if (
+        C.Variable not in data
+        or len(operators) != 1
+        or not TestExpressionEnum.contains(operators[0])
+    ):
+        raise exc.DefinitionParseError(
+            f"{path}: {data!r} is not a valid choice rule!"
+        )
+    try:
+        return DataTestExpression(
+            variable=data[C.Variable],
+            operator=operators[0],
+            expected=data[operators[0]],
+            next=next_,
+        )
+    except exc.ValidationError:
+        raise exc.DefinitionParseError(
+            f"{path}: {data!r} is not a valid choice rule!"
+        )
+
+
+_STATE_SPECIAL_FIELDS = (
+    C.Type,
+    C.Retry,
+    C.Catch,
+    C.Branches,
+    C.Iterator,
+    C.Choices,
+)
+
+
+def parse_state(
+    state_id: str,
+    data: dict,
+    path: str = "",
+    lazy: bool = False,
+) -> 'StateType':
+    """
+    Parse a state definition.
+
+    :param path: the path of the parent workflow, used in the error message.
+    :param lazy: if True, the ``Parallel`` branches and ``Map`` iterator
+        are lazy loaded workflows, see :class:`LazyStates`.
+    """
+    path = f"{path}.{state_id}" if path else state_id
+    _check_type(data, dict, path)
+    try:
+        cls = _state_classes[data[C.Type]]
+    except KeyError:
+        raise exc.DefinitionParseError(
+            f"{path}: unknown state {C.Type!r} {data.get(C.Type)!r}!"
+        )
+    kwargs, extra = _to_kwargs(cls, data, skip=_STATE_SPECIAL_FIELDS)
+    kwargs["id"] = state_id
+    if C.ResultPath in data and data[C.ResultPath] is None:
+        kwargs["result_path"] = "null"
+    if C.Retry in data:
+        kwargs["retry"] = [
+            parse_retry(retry, f"{path}.{C.Retry}[{ith}]")
+            for ith, retry in enumerate(data[C.Retry])
+        ]
+    if C.Catch in data:
+        kwargs["catch"] = [
+            parse_catch(catch, f"{path}.{C.Catch}[{ith}]")
+            for ith, catch in enumerate(data[C.Catch])
+        ]
+    if C.Branches in data:
+        kwargs["branches"] = [
+            parse_workflow(branch, f"{path}.{C.Branches}[{ith}]", lazy)
+            for ith, branch in enumerate(data[C.Branches])
+        ]
+    if C.Iterator in data:
+        kwargs["iterator"] = parse_workflow(
+            data[C.Iterator], f"{path}.{C.Iterator}", lazy,
+        )
+    if C.Choices in data:
+        kwargs["choices"] = [
+            parse_choice_rule(rule, f"{path}.{C.Choices}[{ith}]")
+            for ith, rule in enumerate(data[C.Choices])
+        ]
+    try:
+        state = cls(**kwargs)
+    except TypeError as e:
+        raise exc.DefinitionParseError(f"{path}: {e}")
+    return _set_extra(state, extra)
+
+
+_WORKFLOW_FIELDS = {
+    C.Comment: "comment",
+    C.Version: "version",
+    C.TimeoutSeconds: "timeout_seconds",
+}
+
+
+class LazyStates(collections.abc.MutableMapping):
+    """
+    The ``{state_id: State}`` mapping of a lazy loaded workflow. The state
+    definition dict is parsed into a ``State`` object on first access,
+    the ``Parallel`` branches and ``Map`` iterator of it are also
+    lazy loaded workflows.
+
+    Checking membership, iterating the state ids and ``len()`` don't parse
+    anything.
+    """
+
+    def __init__(self, data: T.Dict[str, dict], path: str = ""):
+        # state_id -> state definition dict or the parsed State object
+        self._data: T.Dict[str, T.Union[dict, 'StateType']] = dict(data)
+        self._path = path
+
+    def __getitem__(self, state_id: str) -> 'StateType':
+        value = self._data[state_id]
+        if type(value) is dict:
+            value = parse_state(state_id, value, self._path, lazy=True)
+            self._data[state_id] = value
+        return value
+
+    def __setitem__(self, state_id: str, state: 'StateType'):
+        self._data[state_id] = state
+
+    def __delitem__(self, state_id: str):
+        del self._data[state_id]
+
+    def __iter__(self) -> T.Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, state_id: T.Any) -> bool:
+        return state_id in self._data
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"(n_state={len(self)}, n_loaded={self.n_loaded})"
+        )
+
+    def is_loaded(self, state_id: str) -> bool:
+        return type(self._data[state_id]) is not dict
+
+    @property
+    def n_loaded(self) -> int:
+        return sum([type(value) is not dict for value in self._data.values()])
+
+
+def parse_workflow(data: dict, path: str = "", lazy: bool = False) -> Workflow:
+    """
+    Parse a workflow definition dict, it could be the top level state machine,
+    a ``Parallel`` branch or a ``Map`` iterator.
+
+    :param lazy: if True, only the ``StartAt`` / ``States`` index is
+        materialized, the states are parsed on first access,
+        see :class:`LazyStates`.
+    """
+    _check_type(data, dict, path or "Workflow")
+    kwargs, extra = dict(), dict()
+    states = None
+    for key, value in data.items():
+        if key == C.StartAt:
+            kwargs["start_at"] = value
+        elif key == C.States:
+            _check_type(value, dict, f"{path}.{C.States}" if path else C.States)
+            states = value
+        elif key in _WORKFLOW_FIELDS:
+            kwargs[_WORKFLOW_FIELDS[key]] = value
+        else:
+            extra[key] = value
+    if states is not None and lazy is False:
+        kwargs["states"] = {
+            state_id: parse_state(state_id, state_data, path)
+            for state_id, state_data in states.items()
+        }
+    try:
+        workflow = Workflow(**kwargs)
+    except TypeError as e:
+        raise exc.DefinitionParseError(f"{path or 'Workflow'}: {e}")
+    if states is not None and lazy is True:
+        # assign after __init__, the states validator would load all states
+        workflow._states = LazyStates(states, path)
+    return _set_extra(workflow, extra)
+
+
+def parse_definition(
+    definition: T.Union[str, bytes, dict],
+    lazy: bool = False,
+) -> Workflow:
+    """
+    Parse an Amazon States Language definition.
+
+    :param definition: the JSON string, JSON bytes or the loaded dict.
+    :param lazy: if True, parse the states on first access,
+        see :class:`LazyStates`.
+    """
+    if isinstance(definition, (str, bytes, bytearray)):
+        try:
+            definition = json.loads(definition)
+        except ValueError as e:
+            raise exc.DefinitionParseError(f"invalid JSON: {e}")
+    return parse_workflow(definition, lazy=lazy)
+
+
+def parse_file(
+    path_or_fp: T.Union[str, T.Any],
+    lazy: bool = False,
+) -> Workflow:
+    """
+    Parse an Amazon States Language definition JSON file.
+
+    :param path_or_fp: the file path (``str`` or ``pathlib.Path``)
+        or a file-like object in text or binary mode.
+    :param lazy: if True, parse the states on first access,
+        see :class:`LazyStates`.
+    """
+    if hasattr(path_or_fp, "read"):
+        return parse_definition(path_or_fp.read(), lazy=lazy)
+    with open(path_or_fp, "rb") as f:
+        return parse_definition(f.read(), lazy=lazy)
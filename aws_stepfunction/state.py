@@ -10,13 +10,15 @@ import attr
 import attr.validators as vs
 
 from . import exc
+from . import jsonpath
 from .constant import (
     Constant as C,
     ErrorCodeEnum,
 )
-from .utils import short_uuid, is_json_path
-from .model import StepFunctionObject
+from .utils import short_uuid
+from .model import StepFunctionObject, DEFAULT_SEPARATORS, iter_json_object
 from .choice_rule import ChoiceRule
+from .choice_optimizer import ChoiceOptimizationResult, optimize_choice
 
 if T.TYPE_CHECKING:  # pragma: no cover
     from .workflow import Workflow
@@ -55,20 +57,34 @@ class State(StepFunctionObject):
     )
 
     def _serialize(self) -> dict:
-        data = self.to_dict()
-        data = self._to_alias(data)
+        data = self._serialize_fields()
         data.pop("id")
         if data.get(C.ResultPath, None) == "null":
             data[C.ResultPath] = None
         return data
 
+    def _fingerprint_fields(self) -> dict:
+        # the state id is the key in the workflow, the nested objects
+        # (Retry, Catch, Branches ...) are excluded by State._serialize
+        return State._serialize(self)
+
     def _short_repr(self) -> str:
         return f"{self.type}(id={self.id!r})"
 
     # since json path attribute is so common,
     # we should create a validator for that
-    def _check_json_path(self, attr: str, value: str):
-        if not is_json_path(value):
+    def _check_json_path(
+        self,
+        attr: str,
+        value: str,
+        reference: bool = False,
+        context: bool = True,
+    ):
+        """
+        :param reference: it has to be a reference path, no wildcard.
+        :param context: allow the ``$$`` context path.
+        """
+        if not jsonpath.is_valid(value, reference=reference, context=context):
             raise exc.StateValidationError.make(
                 self,
                 (
@@ -76,9 +92,15 @@ class State(StepFunctionObject):
                 )
             )
 
-    def _check_opt_json_path(self, attr: str, value: T.Optional[str]):
+    def _check_opt_json_path(
+        self,
+        attr: str,
+        value: T.Optional[str],
+        reference: bool = False,
+        context: bool = True,
+    ):
         if value is not None:
-            self._check_json_path(attr, value)
+            self._check_json_path(attr, value, reference, context)
 
     def _is_magic(self) -> bool:
         return False
@@ -149,7 +171,10 @@ class _HasResultPath(State):
     def _check_result_path(self):
         if self.result_path is not None:
             if self.result_path != "null":
-                self._check_json_path(C.ResultPath, self.result_path)
+                self._check_json_path(
+                    C.ResultPath, self.result_path,
+                    reference=True, context=False,
+                )
 
     def use_task_result(self) -> T.Union[
         'Task', 'Parallel', 'Map', 'Pass'
@@ -188,6 +213,7 @@ class _RetryOrCatch(StepFunctionObject):
     def _add_error(self, error_code: str) -> '_RetryOrCatch':
         if error_code not in self.error_equals:
             self.error_equals.append(error_code)
+            self.invalidate_cache()
         return self
 
     def if_all_error(self) -> '_RetryOrCatch':
@@ -239,9 +265,7 @@ class _RetryOrCatch(StepFunctionObject):
         return self._add_error(ErrorCodeEnum.LambdaTooManyRequestsError.value)
 
     def _serialize(self) -> dict:
-        data = self.to_dict()
-        data = self._to_alias(data)
-        return data
+        return self._serialize_fields()
 
 
 @attr.s
@@ -308,8 +332,10 @@ class Catch(_RetryOrCatch):
             raise exc.ValidationError(f"{C.Catch}.{C.Next} is not defined!")
 
     def _check_result(self):
-        if self.result_path is not None:
-            if not is_json_path(self.result_path):
+        if self.result_path is not None and self.result_path != "null":
+            if not jsonpath.is_valid(
+                self.result_path, reference=True, context=False,
+            ):
                 raise exc.ValidationError(
                     f"{C.Catch}.{C.ResultPath} = {self.result_path!r} "
                     f"is not a valid JSON path!"
@@ -318,15 +344,22 @@ class Catch(_RetryOrCatch):
     def _pre_serialize_validation(self):
         self._check_error_codes()
         self._check_next()
+        self._check_result()
+
+    def _serialize(self) -> dict:
+        data = super()._serialize()
+        if data.get(C.ResultPath, None) == "null":
+            data[C.ResultPath] = None
+        return data
 
 
 @attr.s
 class _HasRetryCatch(State):
     retry: T.List['Retry'] = attr.ib(
-        factory=list, metadata={C.ALIAS: C.Retry},
+        factory=list, metadata={C.ALIAS: C.Retry, C.NESTED: True},
     )
     catch: T.List['Catch'] = attr.ib(
-        factory=list, metadata={C.ALIAS: C.Catch},
+        factory=list, metadata={C.ALIAS: C.Catch, C.NESTED: True},
     )
 
     def _serialize_retry_catch_fields(self, data: dict) -> dict:
@@ -555,7 +588,7 @@ class Parallel(
         default=C.Parallel, metadata={C.ALIAS: C.Type},
     )
     branches: T.List['Workflow'] = attr.ib(
-        factory=list, metadata={C.ALIAS: C.Branches},
+        factory=list, metadata={C.ALIAS: C.Branches, C.NESTED: True},
     )
 
     _field_order = [
@@ -595,16 +628,31 @@ class Parallel(
 
         self._check_branches()
 
-    def _serialize(self) -> dict:
+    def _serialize_shallow(self) -> dict:
+        """
+        Serialize the state but keep the branches as ``Workflow`` objects.
+        """
         data = super()._serialize()
         data = self._serialize_retry_catch_fields(data)
-        branches = list()
-        for state_machine in self.branches:
-            dct = state_machine.serialize()
-            branches.append(dct)
-        data[C.Branches] = branches
+        data[C.Branches] = list(self.branches)
         return data
 
+    def _serialize(self) -> dict:
+        data = self._serialize_shallow()
+        data[C.Branches] = [
+            state_machine.serialize()
+            for state_machine in self.branches
+        ]
+        return data
+
+    def _iter_json(
+        self,
+        separators: T.Tuple[str, str] = DEFAULT_SEPARATORS,
+    ) -> T.Iterable[str]:
+        self._validate_incremental()
+        data = self._sort_field_and_extra(self._serialize_shallow())
+        yield from iter_json_object(data, separators)
+
 
 @attr.s
 class Map(
@@ -647,7 +695,7 @@ class Map(
     )
 
     iterator: T.Optional['Workflow'] = attr.ib(
-        default=None, metadata={C.ALIAS: C.Iterator},
+        default=None, metadata={C.ALIAS: C.Iterator, C.NESTED: True},
     )
     items_path: T.Optional[str] = attr.ib(
         default=None, metadata={C.ALIAS: C.ItemsPath},
@@ -684,14 +732,34 @@ class Map(
         self._check_input_output_path()
         self._check_result_path()
 
-        self._check_opt_json_path(C.ItemsPath, self.items_path)
+        self._check_opt_json_path(
+            C.ItemsPath, self.items_path, reference=True,
+        )
 
-    def _serialize(self) -> dict:
+    def _serialize_shallow(self) -> dict:
+        """
+        Serialize the state but keep the iterator as a ``Workflow`` object.
+        """
         data = super()._serialize()
         data = self._serialize_retry_catch_fields(data)
-        data[C.Iterator] = self.iterator.serialize()
+        if self.iterator is not None:
+            data[C.Iterator] = self.iterator
         return data
 
+    def _serialize(self) -> dict:
+        data = self._serialize_shallow()
+        if self.iterator is not None:
+            data[C.Iterator] = self.iterator.serialize()
+        return data
+
+    def _iter_json(
+        self,
+        separators: T.Tuple[str, str] = DEFAULT_SEPARATORS,
+    ) -> T.Iterable[str]:
+        self._validate_incremental()
+        data = self._sort_field_and_extra(self._serialize_shallow())
+        yield from iter_json_object(data, separators)
+
 
 @attr.s
 class Pass(
@@ -879,7 +947,7 @@ class Choice(
     )
 
     choices: T.List['ChoiceRule'] = attr.ib(
-        factory=list, metadata={C.ALIAS: C.Choices},
+        factory=list, metadata={C.ALIAS: C.Choices, C.NESTED: True},
     )
     default: T.Optional[str] = attr.ib(
         default=None, metadata={C.ALIAS: C.Default},
@@ -916,6 +984,21 @@ class Choice(
         data[C.Choices] = choices
         return data
 
+    def optimize(
+        self,
+        reorder: bool = False,
+        remove_unreachable: bool = False,
+    ) -> ChoiceOptimizationResult:
+        """
+        Return the optimized copy of this state and the unreachable rules.
+        See :func:`~aws_stepfunction.choice_optimizer.optimize_choice`.
+        """
+        return optimize_choice(
+            self,
+            reorder=reorder,
+            remove_unreachable=remove_unreachable,
+        )
+
 
 @attr.s
 class Succeed(
@@ -7,6 +7,7 @@ State Machine management module
 import typing as T
 import json
 import time
+import hashlib
 
 import attr
 import attr.validators as vs
@@ -15,9 +16,12 @@ from boto_session_manager import BotoSesManager, AwsServiceEnum
 
 from .state import Task, Parallel
 from .model import StepFunctionObject
+from .definition_size import analyze_definition_size
+from .minify import COMPACT_SEPARATORS
 from .constant import Constant as C
 from .logger import logger
 from .utils import slugify, snake_case, camel_case
+from .better_boto.rate_limit import call_api
 from .boto import (
     BotoMan,
     StateMachineNotExist,
@@ -40,6 +44,20 @@ if T.TYPE_CHECKING:  # pragma: no cover
     from .workflow import Workflow
 
 
+def _call(func: T.Callable, *args, **kwargs) -> T.Any:
+    return func(*args, **kwargs)
+
+
+def get_deploy_hash(config: dict) -> str:
+    """
+    The SHA256 hex digest of the canonical JSON of a state machine
+    configuration, the ``definition`` has to be a dict, so the whitespace
+    and the key order of the definition JSON don't matter.
+    """
+    content = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 @attr.s
 class StateMachine(StepFunctionObject):
     """
@@ -54,7 +72,7 @@ class StateMachine(StepFunctionObject):
     :param tags:
     """
     name: str = attr.ib()
-    workflow: 'Workflow' = attr.ib()
+    workflow: 'Workflow' = attr.ib(metadata={C.NESTED: True})
     role_arn: str = attr.ib(
         metadata={C.ALIAS: "roleArn"},
     )
@@ -114,55 +132,116 @@ class StateMachine(StepFunctionObject):
 
     def describe(self, bsm: 'BotoSesManager'):
         sfn_client = bsm.get_client(AwsServiceEnum.SFN)
-        return sfn_client.describe_state_machine(
-            stateMachineArn=self.get_state_machine_arn(bsm)
+        return call_api(
+            sfn_client,
+            "describe_state_machine",
+            stateMachineArn=self.get_state_machine_arn(bsm),
         )
 
-    def exists(self, bsm: 'BotoSesManager') -> bool:
+    def _describe_or_none(self, bsm: 'BotoSesManager') -> T.Optional[dict]:
         """
-        Check if the state machine exists.
+        Return the ``describe_state_machine`` response, or None if the state
+        machine doesn't exist.
         """
         try:
-            self.describe(bsm)
-            return True
+            return self.describe(bsm)
         except Exception as e:
             if "StateMachineDoesNotExist" in e.__class__.__name__:
-                return False
+                return None
             else:  # pragma: no cover
                 raise e
 
-    def create(self, bsm: 'BotoSesManager'):
+    def exists(self, bsm: 'BotoSesManager') -> bool:
+        """
+        Check if the state machine exists.
+        """
+        return self._describe_or_none(bsm) is not None
+
+    def _get_deploy_config(self, definition: T.Union[str, dict]) -> dict:
+        """
+        The configuration that :meth:`update` sends. The logging and tracing
+        configuration are only included when they are defined, otherwise
+        ``update`` doesn't change them.
+        """
+        if isinstance(definition, str):
+            definition = json.loads(definition)
+        config = {
+            "definition": definition,
+            "roleArn": self.role_arn,
+        }
+        if self.logging_configuration is not None:
+            config["loggingConfiguration"] = self.logging_configuration
+        if self.tracing_configuration is not None:
+            config["tracingConfiguration"] = self.tracing_configuration
+        return config
+
+    def get_local_deploy_hash(self, minify: bool = False) -> str:
+        """
+        The canonical hash of the local definition, role, logging and
+        tracing configuration, see :func:`get_deploy_hash`.
+
+        The definition is the one :meth:`get_definition` uploads. With the
+        serialization cache enabled, the objects mutated in place since the
+        last serialization are serialized again, so a ``task.parameters``
+        edit is never hashed as unchanged.
+        """
+        return get_deploy_hash(
+            self._get_deploy_config(self.get_definition(minify=minify))
+        )
+
+    def get_remote_deploy_hash(self, describe_response: dict) -> str:
+        """
+        The canonical hash of the deployed state machine, computed from the
+        ``describe_state_machine`` response. Only the fields that are
+        defined locally are compared.
+        """
+        config = self._get_deploy_config(describe_response["definition"])
+        config["roleArn"] = describe_response["roleArn"]
+        for key in ["loggingConfiguration", "tracingConfiguration"]:
+            if key in config:
+                config[key] = describe_response.get(key)
+        return get_deploy_hash(config)
+
+    def get_definition(self, minify: bool = False) -> str:
+        """
+        Return the definition JSON string to upload.
+
+        :param minify: if True, use the minified definition, see
+            :meth:`~aws_stepfunction.workflow.Workflow.minify`.
+        """
+        if minify:
+            return self.workflow.minify().to_json()
+        else:
+            return self.workflow.to_json()
+
+    def create(self, bsm: 'BotoSesManager', minify: bool = False):
         """
         Reference:
 
         - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.create_state_machine
         """
         sfn_client = bsm.get_client(AwsServiceEnum.SFN)
-        kwargs = self.to_dict()
-        kwargs = self._to_alias(kwargs)
-        kwargs.pop("workflow")
-        kwargs["definition"] = json.dumps(self.workflow.serialize())
+        kwargs = self._serialize_fields()
+        kwargs["definition"] = self.get_definition(minify=minify)
         if self.tags:
             kwargs["tags"] = self._convert_tags()
-        return sfn_client.create_state_machine(**kwargs)
+        return call_api(sfn_client, "create_state_machine", **kwargs)
 
-    def update(self, bsm: 'BotoSesManager'):
+    def update(self, bsm: 'BotoSesManager', minify: bool = False):
         """
         Reference:
 
         - https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/stepfunctions.html#SFN.Client.update_state_machine
         """
         sfn_client = bsm.get_client(AwsServiceEnum.SFN)
-        kwargs = self.to_dict()
-        kwargs = self._to_alias(kwargs)
+        kwargs = self._serialize_fields()
         kwargs["stateMachineArn"] = f"arn:aws:states:{bsm.aws_region}:{bsm.aws_account_id}:stateMachine:{self.name}"
         kwargs.pop("name")
         kwargs.pop("type")
-        kwargs.pop("workflow")
-        kwargs["definition"] = json.dumps(self.workflow.serialize())
+        kwargs["definition"] = self.get_definition(minify=minify)
         if self.tags:
             kwargs.pop("tags")
-        return sfn_client.update_state_machine(**kwargs)
+        return call_api(sfn_client, "update_state_machine", **kwargs)
 
     def delete(self, bsm: 'BotoSesManager'):
         """
@@ -173,7 +252,11 @@ class StateMachine(StepFunctionObject):
         state_machine_arn = self.get_state_machine_arn(bsm)
         logger.info(f"delete state machine {state_machine_arn!r}")
         sfn_client = bsm.get_client(AwsServiceEnum.SFN)
-        res = sfn_client.delete_state_machine(stateMachineArn=state_machine_arn)
+        res = call_api(
+            sfn_client,
+            "delete_state_machine",
+            stateMachineArn=state_machine_arn,
+        )
         logger.info(f"  done, exam at: {self.get_state_machine_console_url(bsm)}")
         return res
 
@@ -213,9 +296,9 @@ class StateMachine(StepFunctionObject):
             kwargs["traceHeader"] = trace_header
 
         if sync:  # pragma: no cover
-            res = sfn_client.start_sync_execution(**kwargs)
+            res = call_api(sfn_client, "start_sync_execution", **kwargs)
         else:
-            res = sfn_client.start_execution(**kwargs)
+            res = call_api(sfn_client, "start_execution", **kwargs)
 
         execution_arn = res["executionArn"]
 
@@ -240,22 +323,96 @@ class StateMachine(StepFunctionObject):
         logger.info(f"  preview at: {execution_console_url}")
         return res
 
+    def check_definition_size(
+        self,
+        limit: int = C.DEFINITION_SIZE_LIMIT,
+        minify: bool = False,
+    ):
+        """
+        Fail fast if the workflow definition is larger than the limit,
+        the error message lists the largest contributors.
+        No AWS API call is made.
+        """
+        if minify:
+            size = len(self.get_definition(minify=True).encode("utf-8"))
+            separators = COMPACT_SEPARATORS
+        else:
+            size = self.workflow.get_definition_size()
+            separators = None
+        if size > limit:
+            analyze_definition_size(
+                self.workflow,
+                limit=limit,
+                separators=separators,
+            ).raise_for_limit()
+
     @logger.decorator
-    def deploy(self, bsm: 'BotoSesManager') -> dict:
+    def deploy(
+        self,
+        bsm: 'BotoSesManager',
+        minify: bool = False,
+        skip_unchanged: bool = False,
+    ) -> dict:
+        """
+        :param minify: if True, deploy the minified definition, the state ids
+            are shortened, use ``self.workflow.minify().id_mapping`` to find
+            the original readable state id.
+        :param skip_unchanged: if True, describe the deployed state machine
+            once and compare its definition, role, logging and tracing
+            configuration with the local one, skip the
+            ``update_state_machine`` call if they are identical. The
+            ``_deploy_action`` of the response is ``"skip"``.
+        """
+        self.check_definition_size(minify=minify)
         self._deploy_magic(bsm)
         logger.info(
             f"deploy state machine to {self.get_state_machine_arn(bsm)!r} ..."
         )
-        if self.exists(bsm):
-            logger.info("  already exists, update state machine ...")
-            res = self.update(bsm)
-            logger.info(f"  done, preview at: {self.get_state_machine_visual_editor_console_url(bsm)}")
+        res = self._deploy_state_machine(
+            bsm, minify=minify, skip_unchanged=skip_unchanged,
+        )
+        action = res["_deploy_action"]
+        if action == "skip":
+            logger.info("  already exists and nothing changed, skip update")
+        else:
+            logger.info(f"  {action} state machine done, preview at: {self.get_state_machine_visual_editor_console_url(bsm)}")
+        return res
+
+    def _deploy_state_machine(
+        self,
+        bsm: 'BotoSesManager',
+        minify: bool = False,
+        skip_unchanged: bool = False,
+        call: T.Callable = _call,
+    ) -> dict:
+        """
+        Create or update the state machine, without the definition size check,
+        the magic task and the logging.
+
+        :param call: ``call(func, *args, **kwargs)`` is used to invoke
+            the method that makes an API call, for example, to retry on
+            throttling.
+        """
+        if skip_unchanged:
+            describe_response = call(self._describe_or_none, bsm)
+            exists = describe_response is not None
+        else:
+            describe_response = None
+            exists = call(self.exists, bsm)
+        if exists and skip_unchanged and (
+            self.get_local_deploy_hash(minify=minify)
+            == self.get_remote_deploy_hash(describe_response)
+        ):
+            res = {
+                "stateMachineArn": describe_response["stateMachineArn"],
+                "_deploy_action": "skip",
+            }
+        elif exists:
+            res = call(self.update, bsm, minify=minify)
             res["_deploy_action"] = "update"
         else:
-            logger.info("  not exists, create state machine ...")
-            res = self.create(bsm)
+            res = call(self.create, bsm, minify=minify)
             res["_deploy_action"] = "create"
-            logger.info(f"  done, preview at: {self.get_state_machine_visual_editor_console_url(bsm)}")
         return res
 
     # -------------------------------------------------------------------------
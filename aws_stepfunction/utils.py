@@ -8,6 +8,8 @@ import typing as T
 import uuid
 import hashlib
 
+from . import jsonpath
+
 
 def short_uuid(n: int = 7) -> str:
     """
@@ -22,7 +24,7 @@ def is_json_path(path: str) -> bool:
     """
     Verify if string is a valid JSON path.
     """
-    return path.startswith("$")
+    return jsonpath.is_valid(path)
 
 
 DELIMITERS = ["_", "-", " "]
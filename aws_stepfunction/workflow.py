@@ -4,6 +4,7 @@
 
 """
 
+import io
 import typing as T
 
 import attr
@@ -12,8 +13,12 @@ import attr.validators as vs
 from . import exc
 from .constant import Constant as C
 from .utils import short_uuid
-from .model import StepFunctionObject
+from .model import (
+    StepFunctionObject, ValidationReport, DEFAULT_SEPARATORS, iter_json_object,
+)
 from .choice_rule import ChoiceRule
+from .minify import MinifiedDefinition, minify_definition
+from .graph import GraphValidationReport, validate_graph
 from .state import (
     StateType, Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail
 )
@@ -64,6 +69,7 @@ class Workflow(StepFunctionObject):
             key_validator=vs.instance_of(str),
             value_validator=vs.instance_of(StateType),
         ),
+        metadata={C.ALIAS: C.States, C.NESTED: True},
     )
 
     _started: bool = attr.ib(default=False)
@@ -97,6 +103,7 @@ class Workflow(StepFunctionObject):
             return False
         else:
             self._states[state.id] = state
+            self.invalidate_cache()
             return True
 
     def _remove_state(
@@ -119,6 +126,7 @@ class Workflow(StepFunctionObject):
             return False
         else:
             self._states.pop(state.id)
+            self.invalidate_cache()
             return True
 
     def _parallel(
@@ -493,14 +501,45 @@ class Workflow(StepFunctionObject):
                 "You have to define at least ONE state!"
             )
 
-    def _serialize(self) -> dict:
+    def _validation_key(self) -> T.Any:
+        return (self._start_at, tuple(self._states))
+
+    def _fingerprint_fields(self) -> dict:
+        # the workflow id is not part of the definition, two branches with
+        # the same states have the same fingerprint
+        data = self._serialize_shallow()
+        data.pop(C.States)
+        return data
+
+    def validate(
+        self,
+        incremental: bool = True,
+        _location: str = "$",
+        _report: T.Optional[ValidationReport] = None,
+    ) -> ValidationReport:
+        """
+        Validate the workflow and all its states, ``Retry``, ``Catch``,
+        choice rules, ``Parallel`` branches and ``Map`` iterators, the first
+        error is raised.
+
+        With ``incremental=True``, an object that passed the validation
+        before is validated again only if its content changed, so calling
+        it (or :meth:`serialize`) repeatedly while building a large workflow
+        only re-checks the touched objects. The report tells what was
+        re-checked, for example ``["$", "$.States.Task1.Retry[0]"]``.
+        """
+        return super().validate(
+            incremental=incremental, _location=_location, _report=_report,
+        )
+
+    def _serialize_shallow(self) -> dict:
+        """
+        Serialize the workflow but keep the states as ``State`` objects.
+        """
         # set required fields
         data = {
             C.StartAt: self._start_at,
-            C.States: {
-                state_id: state.serialize()
-                for state_id, state in self._states.items()
-            },
+            C.States: dict(self._states),
         }
 
         # set optional fields
@@ -512,6 +551,107 @@ class Workflow(StepFunctionObject):
             data[C.TimeoutSeconds] = self.timeout_seconds
 
         # sort the fields
-        data = self._sort_field(data)
+        data = self._sort_field_and_extra(data)
 
         return data
+
+    def _serialize(self) -> dict:
+        data = self._serialize_shallow()
+        data[C.States] = {
+            state_id: state.serialize()
+            for state_id, state in self._states.items()
+        }
+        return data
+
+    def _iter_json(
+        self,
+        separators: T.Tuple[str, str] = DEFAULT_SEPARATORS,
+    ) -> T.Iterable[str]:
+        self._validate_incremental()
+        yield from iter_json_object(self._serialize_shallow(), separators)
+
+    def iter_json(
+        self,
+        separators: T.Optional[T.Tuple[str, str]] = None,
+    ) -> T.Iterable[str]:
+        """
+        Yield the Amazon States Language JSON definition chunk by chunk.
+
+        States are serialized one by one, the branches of ``Parallel``
+        and the iterator of ``Map`` are streamed recursively, so the full
+        nested dict of the definition is never built in memory.
+        ``"".join(workflow.iter_json())`` is identical to
+        ``json.dumps(workflow.serialize())``.
+
+        :param separators: same as the ``separators`` argument of
+            ``json.dumps``, use ``(",", ":")`` for the most compact output.
+        """
+        if separators is None:
+            separators = DEFAULT_SEPARATORS
+        yield from self._iter_json(separators)
+
+    def to_json(
+        self,
+        separators: T.Optional[T.Tuple[str, str]] = None,
+    ) -> str:
+        """
+        Return the Amazon States Language JSON definition string.
+        """
+        return "".join(self.iter_json(separators=separators))
+
+    def write_json(
+        self,
+        fp: T.Union[T.TextIO, T.BinaryIO],
+        separators: T.Optional[T.Tuple[str, str]] = None,
+    ) -> int:
+        """
+        Stream the Amazon States Language JSON definition to a text or binary
+        file-like object.
+
+        :return: the size of the definition in bytes.
+        """
+        binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase))
+        size = 0
+        for chunk in self.iter_json(separators=separators):
+            b = chunk.encode("utf-8")
+            size += len(b)
+            fp.write(b if binary else chunk)
+        return size
+
+    def get_definition_size(
+        self,
+        separators: T.Optional[T.Tuple[str, str]] = None,
+    ) -> int:
+        """
+        Get the size of the definition in bytes without building
+        the full definition, compare it with ``C.DEFINITION_SIZE_LIMIT``
+        to check the Step Functions service quota.
+        """
+        return sum(
+            len(chunk.encode("utf-8"))
+            for chunk in self.iter_json(separators=separators)
+        )
+
+    def minify(
+        self,
+        shorten_id: bool = True,
+        drop_default: bool = True,
+    ) -> MinifiedDefinition:
+        """
+        Return the minified definition, use ``.to_json()`` to get the compact
+        JSON and ``.id_mapping`` to find the original readable state id.
+        See :func:`~aws_stepfunction.minify.minify_definition`.
+        """
+        return minify_definition(
+            self.serialize(),
+            shorten_id=shorten_id,
+            drop_default=drop_default,
+        )
+
+    def validate_graph(self) -> GraphValidationReport:
+        """
+        Check the transitions of the whole workflow, including the
+        ``Parallel`` branches and ``Map`` iterators, and return all the
+        errors in one report. See :func:`~aws_stepfunction.graph.validate_graph`.
+        """
+        return validate_graph(self)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark replaying 1M inputs through a ``Choice`` state, the interpreted
+``choose_next`` vs the compiled ``compile_choice``.
+
+Usage::
+
+    python benchmark/bench_choice.py
+"""
+
+import time
+import random
+
+from aws_stepfunction.state import Choice
+from aws_stepfunction.choice_rule import Var, and_, or_, not_
+from aws_stepfunction.local import choose_next, compile_choice
+
+N_INPUT = 1000000
+
+
+def make_choice() -> Choice:
+    rules = [
+        and_(
+            Var("$.order.amount").numeric_greater_than(1000),
+            Var("$.order.country").string_equals("US"),
+        ),
+        or_(
+            Var("$.order.sku").string_matches("gift-*"),
+            Var("$.order.created").timestamp_less_than("2022-01-01T00:00:00Z"),
+        ),
+        not_(Var("$.order.vip").boolean_equals(True)),
+    ]
+    for rule, next_ in zip(rules, ["review", "gift", "standard"]):
+        rule.next = next_
+    return Choice(id="route", choices=rules, default="vip")
+
+
+def make_inputs(n: int) -> list:
+    rnd = random.Random(0)
+    return [
+        {
+            "order": {
+                "amount": rnd.randint(0, 2000),
+                "country": rnd.choice(["US", "CA"]),
+                "sku": rnd.choice(["gift-card", "book"]),
+                "created": rnd.choice(
+                    ["2021-06-01T00:00:00Z", "2022-06-01T00:00:00Z"]
+                ),
+                "vip": rnd.random() < 0.5,
+            }
+        }
+        for _ in range(n)
+    ]
+
+
+def main():
+    state = make_choice()
+    inputs = make_inputs(N_INPUT)
+
+    start = time.perf_counter()
+    for data in inputs[:N_INPUT // 10]:
+        choose_next(state, data)
+    elapsed = (time.perf_counter() - start) * 10
+    print(f"interpreted (estimated): {elapsed:.3f} sec for {N_INPUT} inputs")
+
+    start = time.perf_counter()
+    counter = compile_choice(state).replay(inputs)
+    elapsed = time.perf_counter() - start
+    print(f"compiled: {elapsed:.3f} sec for {N_INPUT} inputs, {dict(counter)}")
+
+
+if __name__ == "__main__":
+    main()
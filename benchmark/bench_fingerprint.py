@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the Merkle fingerprint on a generated workflow with 1,000
+``Parallel`` states, each has 4 branches of 5 states.
+
+Usage::
+
+    python benchmark/bench_fingerprint.py
+"""
+
+import time
+
+import aws_stepfunction as sfn
+
+N_PARALLEL = 1000
+N_BRANCH = 4
+N_BRANCH_STATE = 5
+
+
+def make_branch(ith: int) -> sfn.Workflow:
+    # only 2 distinct branches per parallel state, the others are duplicates
+    workflow = sfn.Workflow()
+    for jth in range(N_BRANCH_STATE):
+        task = sfn.Task(
+            id=f"branch-task-{jth}",
+            resource="arn",
+            retry=[sfn.Retry.new().if_all_error().with_max_attempts(ith % 2 + 1)],
+        )
+        if jth == 0:
+            workflow.start_from(task)
+        else:
+            workflow.next_then(task)
+    return workflow.end()
+
+
+def make_workflow() -> sfn.Workflow:
+    workflow = sfn.Workflow(id="big")
+    for ith in range(N_PARALLEL):
+        parallel = sfn.Parallel(
+            id=f"parallel-{ith}",
+            branches=[make_branch(jth) for jth in range(N_BRANCH)],
+        )
+        if ith == 0:
+            workflow.start_from(parallel)
+        else:
+            workflow.next_then(parallel)
+    return workflow.end()
+
+
+def timeit(title: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{title}: {time.perf_counter() - start:.4f} sec")
+    return result
+
+
+def main():
+    workflow = make_workflow()
+    fingerprint = timeit("first fingerprint", workflow.fingerprint)
+    timeit("cached fingerprint", workflow.fingerprint)
+
+    # change one state in one branch, only its ancestors are hashed again
+    state = workflow._states["parallel-500"].branches[3]._states["branch-task-2"]
+    state.comment = "changed"
+    new_fingerprint = timeit("after one change", workflow.fingerprint)
+    assert new_fingerprint != fingerprint
+
+    duplicates = timeit(
+        "find duplicates",
+        lambda: sfn.find_duplicate_workflows([workflow]),
+    )
+    report = timeit("dedupe", lambda: sfn.dedupe_workflows([workflow]))
+    print(
+        f"{len(duplicates)} duplicated groups, {report.n_workflows} workflows, "
+        f"{report.n_unique} unique, {report.n_replaced} replaced"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the graph validator on a generated 20,000 states workflow with
+``Choice`` fan out, ``Catch`` fallbacks, ``Parallel`` branches and
+``Map`` iterators.
+
+Usage::
+
+    python benchmark/bench_graph.py
+"""
+
+import time
+
+import aws_stepfunction as sfn
+from aws_stepfunction.graph import validate_graph
+
+N_STATES = 20000
+
+
+def make_workflow(n_states: int) -> sfn.Workflow:
+    workflow = sfn.Workflow(id="big")
+    fallback = sfn.Fail(id="fallback")
+    workflow._add_state(fallback)
+    n_block = n_states // 8
+    previous = None
+    for ith in range(n_block):
+        task = sfn.Task(
+            id=f"task-{ith}",
+            resource="arn",
+            catch=[sfn.Catch(error_equals=["States.ALL"], next=fallback.id)],
+        )
+        yes, no = sfn.Pass(id=f"yes-{ith}"), sfn.Pass(id=f"no-{ith}")
+        rule = sfn.Var("$.n").numeric_greater_than(ith)
+        rule.next = yes.id
+        choice = sfn.Choice(id=f"choice-{ith}", choices=[rule], default=no.id)
+        parallel = sfn.Parallel(
+            id=f"parallel-{ith}",
+            branches=[
+                sfn.Workflow().start_from(sfn.Pass(id=f"branch-{ith}")).end(),
+            ],
+        )
+        map_ = sfn.Map(
+            id=f"map-{ith}",
+            iterator=sfn.Workflow().start_from(sfn.Pass(id=f"item-{ith}")).end(),
+        )
+        task.next = choice.id
+        yes.next = parallel.id
+        no.next = parallel.id
+        parallel.next = map_.id
+        for state in [task, choice, yes, no, parallel, map_]:
+            workflow._add_state(state)
+        if previous is None:
+            workflow._start_at = task.id
+        else:
+            previous.next = task.id
+        previous = map_
+    previous.end = True
+    return workflow
+
+
+def main():
+    workflow = make_workflow(N_STATES)
+    start = time.perf_counter()
+    report = validate_graph(workflow)
+    elapsed = time.perf_counter() - start
+    assert report.is_valid, report.to_text()[:1000]
+    print(
+        f"{report.n_states} states, {report.n_edges} transitions: "
+        f"{elapsed:.4f} sec"
+    )
+
+    # break some transitions, all errors are reported in one pass
+    workflow._states["task-10"].next = "missing"
+    workflow._states["yes-20"].next = "branch-30"
+    start = time.perf_counter()
+    report = validate_graph(workflow)
+    elapsed = time.perf_counter() - start
+    print(f"{len(report.errors)} errors: {elapsed:.4f} sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark 1M JSON path lookups: parse on every lookup vs the LRU cached
+``get_value`` vs a pre-compiled accessor.
+
+Usage::
+
+    python benchmark/bench_jsonpath.py
+"""
+
+import time
+
+from aws_stepfunction import jsonpath
+
+N_LOOKUP = 1000000
+
+DATA = {
+    "order": {
+        "id": "o-1",
+        "items": [{"sku": "a", "qty": 1}, {"sku": "b", "qty": 2}],
+        "customer": {"address": {"zip": "10001"}},
+    },
+}
+PATHS = [
+    "$.order.id",
+    "$.order.items[1].qty",
+    "$.order.customer.address.zip",
+    "$['order']['items'][0]['sku']",
+]
+
+
+def bench(title: str, lookup):
+    n_paths = len(PATHS)
+    start = time.perf_counter()
+    for ith in range(N_LOOKUP):
+        lookup(PATHS[ith % n_paths])
+    elapsed = time.perf_counter() - start
+    print(
+        f"{title:<28} {elapsed:.3f} sec, "
+        f"{N_LOOKUP / elapsed:,.0f} lookups / sec"
+    )
+
+
+def main():
+    bench("parse every time", lambda path: jsonpath.JsonPath(path).get(DATA))
+    bench("get_value (LRU cached)", lambda path: jsonpath.get_value(DATA, path))
+
+    compiled = {path: jsonpath.compile_path(path) for path in PATHS}
+    bench("compiled accessor", lambda path: compiled[path].get(DATA))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark :class:`aws_stepfunction.local.LocalRunner` executions per second
+on a small Task -> Choice -> Pass / Task workflow.
+
+Usage::
+
+    python benchmark/bench_local.py
+"""
+
+import time
+
+import aws_stepfunction as sfn
+from aws_stepfunction.local import LocalRunner
+
+N_EXECUTION = 10000
+
+ADD = "arn:aws:lambda:us-east-1:111122223333:function:add"
+DOUBLE = "arn:aws:lambda:us-east-1:111122223333:function:double"
+
+
+def make_workflow() -> sfn.Workflow:
+    workflow = sfn.Workflow()
+    workflow.start_from(
+        sfn.Task(
+            id="add",
+            resource=ADD,
+            parameters={"a.$": "$.a", "b.$": "$.b"},
+            result_path="$.sum",
+        )
+    )
+    big = sfn.Task(id="double", resource=DOUBLE, input_path="$.sum")
+    small = sfn.Pass(id="small", parameters={"sum.$": "$.sum"})
+    workflow.choice(
+        [sfn.Var("$.sum").numeric_greater_than(100).next_then(big)],
+        default=small,
+    )
+    workflow.continue_from(big).end()
+    workflow.continue_from(small).end()
+    return workflow
+
+
+def main():
+    runner = LocalRunner()
+    runner.register(ADD, lambda event: event["a"] + event["b"])
+    runner.register(DOUBLE, lambda event: event * 2)
+    workflow = make_workflow()
+
+    start = time.perf_counter()
+    for ith in range(N_EXECUTION):
+        runner.execute(workflow, {"a": ith % 200, "b": 1})
+    elapsed = time.perf_counter() - start
+    print(
+        f"{N_EXECUTION} local executions: {elapsed:.4f} sec, "
+        f"{N_EXECUTION / elapsed:,.0f} executions / sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the local ``Map`` simulation of 50k items, sequential vs
+thread pool (IO bound handler) vs process pool (CPU bound handler).
+
+Usage::
+
+    python benchmark/bench_local_map.py
+"""
+
+import time
+
+import aws_stepfunction as sfn
+from aws_stepfunction.local import LocalRunner, ConcurrentRunner
+
+N_ITEMS = 50000
+N_SEQUENTIAL_ITEMS = 1000
+
+IO_BOUND = "arn:aws:lambda:us-east-1:111122223333:function:io_bound"
+CPU_BOUND = "arn:aws:lambda:us-east-1:111122223333:function:cpu_bound"
+
+
+def io_bound(event):
+    time.sleep(0.001)
+    return event
+
+
+def cpu_bound(event):
+    return sum(i * i for i in range(2000)) + event
+
+
+def make_map(resource: str) -> sfn.Map:
+    return sfn.Map(
+        iterator=sfn.Workflow().start_from(sfn.Task(resource=resource)).end(),
+        items_path="$.items",
+        end=True,
+    )
+
+
+def bench(title: str, runner: LocalRunner, resource: str, n_items: int):
+    runner.register(IO_BOUND, io_bound)
+    runner.register(CPU_BOUND, cpu_bound)
+    items = list(range(n_items))
+    start = time.perf_counter()
+    output, _ = runner.run_state(make_map(resource), {"items": items})
+    elapsed = time.perf_counter() - start
+    assert len(output) == n_items
+    print(
+        f"{title:<40} {n_items:>6} items: {elapsed:.3f} sec, "
+        f"{n_items / elapsed:,.0f} items / sec"
+    )
+
+
+def main():
+    bench("io bound, sequential", LocalRunner(), IO_BOUND, N_SEQUENTIAL_ITEMS)
+    bench(
+        "io bound, thread pool 64 workers",
+        ConcurrentRunner(executor="thread", max_workers=64),
+        IO_BOUND,
+        N_ITEMS,
+    )
+    bench("cpu bound, sequential", LocalRunner(), CPU_BOUND, N_SEQUENTIAL_ITEMS)
+    bench(
+        "cpu bound, process pool",
+        ConcurrentRunner(executor="process"),
+        CPU_BOUND,
+        N_ITEMS,
+    )
+
+
+if __name__ == "__main__":
+    main()
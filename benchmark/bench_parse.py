@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark :func:`aws_stepfunction.parser.parse_file` on a directory of
+1,000 generated definition files, then compare the eager parser with
+the lazy loader on a large definition when only a few states are accessed.
+
+Usage::
+
+    python benchmark/bench_parse.py
+"""
+
+import json
+import time
+import random
+import tempfile
+from pathlib import Path
+
+import aws_stepfunction as sfn
+from aws_stepfunction.parser import parse_file, parse_definition
+
+N_DEFINITION = 1000
+N_ROUND = 3
+
+
+def make_workflow(rnd: random.Random, depth: int = 2) -> sfn.Workflow:
+    workflow = sfn.Workflow(comment="benchmark")
+    fail = sfn.Fail()
+    for ith in range(rnd.randint(5, 30)):
+        task = sfn.Task(
+            resource="arn:aws:states:::lambda:invoke",
+            parameters={
+                "FunctionName": f"arn:aws:lambda:us-east-1:111122223333:function:f{ith}",
+                "Payload.$": "$",
+            },
+            output_path="$.Payload",
+            retry=[
+                sfn.Retry.new()
+                .with_interval_seconds(2)
+                .with_back_off_rate(2)
+                .with_max_attempts(3)
+                .if_lambda_service_error()
+            ],
+            catch=[sfn.Catch.new().if_all_error().next_then(fail)],
+        )
+        if ith == 0:
+            workflow.start_from(task)
+        else:
+            workflow.next_then(task)
+    if depth > 0:
+        workflow.parallel([make_workflow(rnd, depth - 1) for _ in range(2)])
+        workflow.map(make_workflow(rnd, depth - 1))
+    succeed = sfn.Succeed()
+    workflow.choice(
+        [
+            sfn.and_(
+                sfn.Var("$.status").string_equals("ok"),
+                sfn.not_(sfn.Var("$.count").numeric_less_than(0)),
+            ).next_then(succeed)
+        ],
+        default=fail,
+    )
+    return workflow
+
+
+def main():
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as dir_path:
+        dir_path = Path(dir_path)
+        n_state = 0
+        n_bytes = 0
+        for ith in range(N_DEFINITION):
+            workflow = make_workflow(rnd, depth=rnd.randint(0, 2))
+            with (dir_path / f"{ith}.json").open("wb") as f:
+                n_bytes += workflow.write_json(f)
+            n_state += len(workflow._states)
+        paths = sorted(dir_path.iterdir())
+
+        best = None
+        for _ in range(N_ROUND):
+            start = time.perf_counter()
+            for path in paths:
+                parse_file(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+    print(
+        f"parse {N_DEFINITION} definitions ({n_bytes / 1024 / 1024:.1f} MB, "
+        f"{n_state} top level states), best of {N_ROUND} rounds:"
+    )
+    print(f"  {best:.4f} sec, {N_DEFINITION / best:,.0f} definitions / sec")
+
+    # one large definition, only access the first 5 states
+    workflow = sfn.Workflow()
+    for _ in range(20):
+        if workflow._started:
+            workflow.next_then(sfn.Pass())
+        else:
+            workflow.start_from(sfn.Pass())
+        workflow.parallel([make_workflow(rnd, depth=2) for _ in range(2)])
+    workflow.end()
+    text = workflow.to_json()
+    definition = json.loads(text)
+    state_ids = list(definition["States"])[:5]
+
+    for lazy in [False, True]:
+        best = None
+        for _ in range(N_ROUND):
+            start = time.perf_counter()
+            wf = parse_definition(definition, lazy=lazy)
+            for state_id in state_ids:
+                _ = wf._states[state_id]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(
+            f"parse a {len(text) / 1024 / 1024:.1f} MB definition, "
+            f"access {len(state_ids)} states, lazy = {lazy}: {best:.4f} sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark ``Workflow.serialize`` throughput on a generated 5,000 states
+workflow, comparing the compiled serializer with the original
+``attr.asdict`` based implementation.
+
+Usage::
+
+    python benchmark/bench_serialize.py
+"""
+
+import time
+import contextlib
+
+import attr
+
+import aws_stepfunction as sfn
+from aws_stepfunction.model import StepFunctionObject
+
+N_STATE = 5000
+N_ROUND = 5
+
+
+def make_workflow(n_state: int = N_STATE) -> sfn.Workflow:
+    workflow = sfn.Workflow(comment="benchmark")
+    for ith in range(1, 1 + n_state):
+        task = sfn.Task(
+            id=f"Task-{ith}",
+            resource="arn:aws:states:::lambda:invoke",
+            parameters={
+                "FunctionName": f"arn:aws:lambda:us-east-1:111122223333:function:f{ith}",
+                "Payload.$": "$",
+            },
+            output_path="$.Payload",
+            retry=[
+                (
+                    sfn.Retry.new()
+                    .with_interval_seconds(2)
+                    .with_back_off_rate(2)
+                    .with_max_attempts(3)
+                    .if_lambda_service_error()
+                    .if_lambda_aws_error()
+                )
+            ],
+            catch=[
+                sfn.Catch.new().if_all_error().next_then(sfn.Fail(id="Fail"))
+            ],
+        )
+        if ith == 1:
+            workflow.start_from(task)
+        else:
+            workflow.next_then(task)
+    workflow.end()
+    workflow._add_state(sfn.Fail(id="Fail"))
+    return workflow
+
+
+# --- the implementation before the serializer compilation layer
+def _legacy_to_dict(
+    self,
+    exclude_none: bool = True,
+    exclude_empty_string: bool = True,
+    exclude_empty_collection: bool = True,
+    exclude_private_attr: bool = True
+) -> dict:
+    data = dict()
+    for k, v in attr.asdict(self).items():
+        if k.startswith("_"):
+            if exclude_private_attr:
+                continue
+        if v is None:
+            if exclude_none:
+                continue
+        elif isinstance(v, str):
+            if len(v) == 0:
+                if exclude_empty_string:
+                    continue
+        elif isinstance(v, (list, dict)):
+            if len(v) == 0:
+                if exclude_empty_collection:
+                    continue
+        data[k] = v
+    return data
+
+
+@classmethod
+def _legacy_to_alias(cls, data: dict) -> dict:
+    mapper = {
+        field.name: field.metadata.get("alias", field.name)
+        for field in attr.fields(cls)
+    }
+    return {mapper.get(k, k): v for k, v in data.items()}
+
+
+def _legacy_serialize_fields(self) -> dict:
+    return self._to_alias(self.to_dict())
+
+
+@contextlib.contextmanager
+def legacy_serializer():
+    patches = dict(
+        to_dict=_legacy_to_dict,
+        _to_alias=_legacy_to_alias,
+        _serialize_fields=_legacy_serialize_fields,
+    )
+    origin = {
+        name: StepFunctionObject.__dict__[name]
+        for name in patches
+    }
+    for name, func in patches.items():
+        setattr(StepFunctionObject, name, func)
+    try:
+        yield
+    finally:
+        for name, func in origin.items():
+            setattr(StepFunctionObject, name, func)
+
+
+def measure(workflow: sfn.Workflow) -> float:
+    """
+    :return: best elapsed seconds of ``N_ROUND`` runs.
+    """
+    best = None
+    for _ in range(N_ROUND):
+        start = time.perf_counter()
+        workflow.serialize()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    workflow = make_workflow()
+    n_state = len(workflow._states)
+
+    with legacy_serializer():
+        before = measure(workflow)
+    after = measure(workflow)
+
+    print(f"serialize a {n_state} states workflow, best of {N_ROUND} rounds:")
+    print(f"  before: {before:.4f} sec, {n_state / before:,.0f} states / sec")
+    print(f"  after:  {after:.4f} sec, {n_state / after:,.0f} states / sec")
+    print(f"  speedup: {before / after:.2f}x")
+
+    # repeated serialize with the cache enabled, change one task each time
+    workflow.enable_cache()
+    workflow.serialize()
+    task = workflow._states["Task-1"]
+    best = None
+    for ith in range(N_ROUND):
+        task.comment = f"change {ith}"
+        start = time.perf_counter()
+        workflow.serialize()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  cached, one task changed: {best:.4f} sec")
+
+
+if __name__ == "__main__":
+    main()
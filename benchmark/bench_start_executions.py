@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark starting 2,000 executions against a local stubbed client with
+5 ms latency per call, ``StateMachine.execute`` one at a time vs
+``start_executions``.
+
+The client side rate limit is disabled, otherwise both are capped by the
+``StartExecution`` quota.
+
+Usage::
+
+    python benchmark/bench_start_executions.py
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+import aws_stepfunction as sfn
+from aws_stepfunction.logger import logger
+from aws_stepfunction.better_boto import RateLimiter, set_rate_limiter
+
+N_EXECUTION = 2000
+LATENCY = 0.005
+
+
+class StubSfnClient:
+    def start_execution(self, stateMachineArn, name=None, **kwargs):
+        time.sleep(LATENCY)
+        if name is None:
+            name = str(uuid.uuid4())
+        arn = stateMachineArn.replace(":stateMachine:", ":execution:")
+        return {"executionArn": f"{arn}:{name}", "startDate": datetime.now()}
+
+
+class StubBsm:
+    aws_region = "us-east-1"
+    aws_account_id = "111122223333"
+
+    def __init__(self):
+        self.client = StubSfnClient()
+
+    def get_client(self, service_name):
+        return self.client
+
+
+def make_state_machine() -> sfn.StateMachine:
+    workflow = sfn.Workflow()
+    workflow.start_from(sfn.Pass(id="p1")).end()
+    return sfn.StateMachine(
+        name="bench", workflow=workflow, role_arn="arn:aws:iam::111122223333:role/r",
+    )
+
+
+def timeit(title: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{title}: {elapsed:.4f} sec, {N_EXECUTION / elapsed:.0f} executions / sec")
+    return result
+
+
+def main():
+    set_rate_limiter(RateLimiter(rates={"StartExecution": None}))
+    bsm = StubBsm()
+    sm = make_state_machine()
+    payloads = [{"id": ith} for ith in range(N_EXECUTION)]
+
+    def execute_one_by_one():
+        with logger.temp_disable():
+            return [sm.execute(bsm, payload=payload) for payload in payloads]
+
+    timeit("StateMachine.execute", execute_one_by_one)
+    for max_workers in [8, 32]:
+        results = timeit(
+            f"start_executions(max_workers={max_workers})",
+            lambda: list(sfn.start_executions(
+                sm, bsm, payloads, max_workers=max_workers,
+            )),
+        )
+        assert len({result.execution_arn for result in results}) == N_EXECUTION
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from aws_stepfunction.better_boto.aio import AsyncSfnClient
+from aws_stepfunction.better_boto.rate_limit import (
+    RateLimiter,
+    get_rate_limiter,
+    set_rate_limiter,
+)
+
+SM_ARN = "arn:aws:states:us-east-1:111122223333:stateMachine:sm"
+
+
+class FakeSfnClient:
+    """
+    Every execution is ``RUNNING`` for the first ``n_running`` describe calls.
+    """
+
+    def __init__(self, n_running: int = 2):
+        self.n_running = n_running
+        self.executions = dict()
+        self.n_calls = 0
+        self.n_concurrent = 0
+        self.max_concurrent = 0
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.n_calls += 1
+            self.n_concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.n_concurrent)
+        time.sleep(0.001)
+        with self.lock:
+            self.n_concurrent -= 1
+
+    def start_execution(self, stateMachineArn, name, input="{}"):
+        self._enter()
+        arn = f"arn:aws:states:us-east-1:111122223333:execution:sm:{name}"
+        self.executions[arn] = dict(input=input, n_describe=0)
+        return {"executionArn": arn, "startDate": datetime.now()}
+
+    def describe_execution(self, executionArn):
+        self._enter()
+        execution = self.executions[executionArn]
+        execution["n_describe"] += 1
+        if execution["n_describe"] > self.n_running:
+            status = "SUCCEEDED"
+        else:
+            status = "RUNNING"
+        return {"executionArn": executionArn, "status": status, "input": execution["input"]}
+
+    def get_execution_history(self, executionArn, maxResults, nextToken=None, **kwargs):
+        self._enter()
+        start = int(nextToken or 0)
+        events = [{"id": ith} for ith in range(start, min(start + maxResults, 5))]
+        response = {"events": events}
+        if start + maxResults < 5:
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+
+@pytest.fixture
+def no_rate_limit():
+    old_rate_limiter = get_rate_limiter()
+    set_rate_limiter(RateLimiter(rates={
+        "StartExecution": None,
+        "DescribeExecution": None,
+        "GetExecutionHistory": None,
+    }))
+    yield
+    set_rate_limiter(old_rate_limiter)
+
+
+def test_async_sfn_client(no_rate_limit):
+    sfn_client = FakeSfnClient(n_running=2)
+
+    async def run_one(client: AsyncSfnClient, ith: int) -> dict:
+        res = await client.start_execution(SM_ARN, payload={"id": ith}, name=f"e-{ith}")
+        return await client.wait_execution(res["executionArn"], delays=0.01, timeout=10)
+
+    async def main():
+        async with AsyncSfnClient(sfn_client, max_workers=4) as client:
+            results = await asyncio.gather(*[run_one(client, ith) for ith in range(500)])
+            events = await client.get_execution_history(
+                results[0]["executionArn"], page_size=2,
+            )
+        return results, events
+
+    results, events = asyncio.run(main())
+    assert [res["status"] for res in results] == ["SUCCEEDED"] * 500
+    assert results[7]["input"] == '{"id": 7}'
+    # 1 start + 3 describe per execution, plus 3 history pages
+    assert sfn_client.n_calls == 500 * 4 + 3
+    # never more concurrent calls than threads
+    assert sfn_client.max_concurrent <= 4
+    assert events == [{"id": ith} for ith in range(5)]
+
+
+def test_wait_execution_timeout(no_rate_limit):
+    sfn_client = FakeSfnClient(n_running=1000)
+    sfn_client.executions["arn"] = dict(input="{}", n_describe=0)
+
+    async def main():
+        async with AsyncSfnClient(sfn_client, max_workers=1) as client:
+            await client.wait_execution("arn", delays=0.01, timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
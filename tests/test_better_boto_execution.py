@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import threading
+
+import pytest
+
+from aws_stepfunction.better_boto.waiter import Waiter
+from aws_stepfunction.better_boto.execution import (
+    wait_executions_to_finish,
+    wait_execution_to_finish,
+)
+from aws_stepfunction.better_boto.rate_limit import (
+    RateLimiter,
+    get_rate_limiter,
+    set_rate_limiter,
+)
+
+
+class FakeSfnClient:
+    """
+    Each execution finishes after its duration in seconds.
+    """
+
+    def __init__(self, durations: dict):
+        start = time.time()
+        self.finish_time = {
+            arn: start + duration for arn, duration in durations.items()
+        }
+        self.n_calls = 0
+        self.lock = threading.Lock()
+
+    def describe_execution(self, executionArn):
+        with self.lock:
+            self.n_calls += 1
+        if time.time() >= self.finish_time[executionArn]:
+            status = "SUCCEEDED"
+        else:
+            status = "RUNNING"
+        return {"executionArn": executionArn, "status": status}
+
+
+class FakeBsm:
+    def __init__(self, durations: dict):
+        self.stepfunctions_client = FakeSfnClient(durations)
+
+
+@pytest.fixture
+def no_rate_limit():
+    old_rate_limiter = get_rate_limiter()
+    set_rate_limiter(RateLimiter(rates={"DescribeExecution": None}))
+    yield
+    set_rate_limiter(old_rate_limiter)
+
+
+def test_waiter_with_iterable_delays():
+    delays = [0.01, 0.02]
+    attempts = [attempt for attempt, _ in Waiter(delays=delays, timeout=1, verbose=False)]
+    assert attempts == [0, 1, 2]
+
+
+def test_wait_execution_to_finish(no_rate_limit):
+    bsm = FakeBsm({"arn": 0.15})
+    response = wait_execution_to_finish(
+        bsm, "arn", delays=0.01, max_delay=1, jitter=False, timeout=5,
+    )
+    assert response["status"] == "SUCCEEDED"
+    # polls at about 0, 0.01, 0.03, 0.07, 0.15, 0.31
+    assert bsm.stepfunctions_client.n_calls <= 6
+
+    assert wait_executions_to_finish(bsm, []) == {}
+
+    bsm = FakeBsm({"arn": 10})
+    with pytest.raises(TimeoutError):
+        wait_execution_to_finish(bsm, "arn", delays=0.01, timeout=0.1)
+
+
+def test_wait_executions_to_finish(no_rate_limit):
+    random.seed(1)
+    durations = {f"arn-{ith}": random.random() * 0.5 for ith in range(50)}
+    bsm = FakeBsm(durations)
+    start = time.time()
+    results = wait_executions_to_finish(
+        bsm, list(durations), delays=0.01, max_delay=0.1, timeout=5,
+    )
+    elapsed = time.time() - start
+    assert set(results) == set(durations)
+    assert {res["status"] for res in results.values()} == {"SUCCEEDED"}
+    assert elapsed < 1.0
+    # polling every 0.01 second takes more than 1,000 calls
+    n_fixed = sum(int(duration / 0.01) + 1 for duration in durations.values())
+    assert n_fixed > 1000
+    assert bsm.stepfunctions_client.n_calls < n_fixed / 3
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
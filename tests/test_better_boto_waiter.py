@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import io
+import itertools
+
+import pytest
+
+from aws_stepfunction.better_boto.waiter import (
+    FixedDelay,
+    ExponentialDelay,
+    DecorrelatedJitterDelay,
+    CappedDelay,
+    Waiter,
+)
+from aws_stepfunction.better_boto.state_machine import (
+    wait_delete_state_machine_to_finish,
+)
+from aws_stepfunction.better_boto.rate_limit import (
+    RateLimiter,
+    get_rate_limiter,
+    set_rate_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def take(strategy, n: int) -> list:
+    return list(itertools.islice(strategy, n))
+
+
+def test_delay_strategy():
+    assert take(FixedDelay(3), 3) == [3, 3, 3]
+
+    strategy = ExponentialDelay(base=1, rate=2, max_delay=10)
+    assert take(strategy, 6) == [1, 2, 4, 8, 10, 10]
+    # every iteration starts from the beginning
+    assert take(strategy, 2) == [1, 2]
+
+    strategy = ExponentialDelay(base=2, jitter=True, random=lambda: 0.5)
+    assert take(strategy, 3) == [1.5, 3, 6]
+
+    # the upper bound of each random value is three times the previous one
+    strategy = DecorrelatedJitterDelay(base=1, max_delay=20, uniform=lambda a, b: b)
+    assert take(strategy, 5) == [3, 9, 20, 20, 20]
+    strategy = DecorrelatedJitterDelay(base=1, max_delay=20)
+    assert all(1 <= delay <= 20 for delay in take(strategy, 100))
+
+    strategy = CappedDelay(ExponentialDelay(base=1, rate=3), max_delay=5)
+    assert take(strategy, 4) == [1, 3, 5, 5]
+    assert take(CappedDelay([1, 9, 2], max_delay=5), 5) == [1, 5, 2]
+
+
+def test_waiter():
+    clock = FakeClock()
+    stream = io.StringIO()
+    waiter = Waiter(
+        delays=ExponentialDelay(base=1, max_delay=8),
+        timeout=30,
+        clock=clock.time,
+        sleep=clock.sleep,
+        stream=stream,
+    )
+    with pytest.raises(TimeoutError):
+        for _ in waiter:
+            pass
+    # 1 + 2 + 4 + 8 + 8 + 8 = 31, the last sleep is cut to the remaining time
+    assert clock.sleeps == [1, 2, 4, 8, 8, 7]
+    assert "on 6 th attempt" in stream.getvalue()
+
+    clock = FakeClock()
+    waiter = Waiter(delays=5, timeout=12, verbose=False, clock=clock.time, sleep=clock.sleep)
+    assert [attempt for attempt, _ in itertools.islice(waiter, 3)] == [0, 1, 2]
+    assert clock.sleeps == [5, 5]
+
+
+class StateMachineDoesNotExist(Exception):
+    pass
+
+
+class FakeSfnClient:
+    """
+    The state machine is ``DELETING`` for the first ``n_deleting`` calls.
+    """
+
+    def __init__(self, n_deleting: int):
+        self.n_deleting = n_deleting
+        self.n_calls = 0
+
+    def describe_state_machine(self, stateMachineArn):
+        self.n_calls += 1
+        if self.n_calls > self.n_deleting:
+            raise StateMachineDoesNotExist("StateMachineDoesNotExist")
+        return {
+            "stateMachineArn": stateMachineArn,
+            "name": "sm",
+            "definition": "{}",
+            "type": "STANDARD",
+            "creationDate": None,
+            "status": "DELETING",
+            "roleArn": "arn:aws:iam::111122223333:role/r",
+        }
+
+
+class FakeBsm:
+    aws_region = "us-east-1"
+    aws_account_id = "111122223333"
+
+    def __init__(self, n_deleting: int):
+        self.stepfunctions_client = FakeSfnClient(n_deleting)
+
+
+@pytest.fixture
+def no_rate_limit():
+    old_rate_limiter = get_rate_limiter()
+    set_rate_limiter(RateLimiter(rates={"DescribeStateMachine": None}))
+    yield
+    set_rate_limiter(old_rate_limiter)
+
+
+def test_wait_delete_state_machine_to_finish(no_rate_limit):
+    clock = FakeClock()
+    bsm = FakeBsm(n_deleting=5)
+    assert wait_delete_state_machine_to_finish(
+        bsm, "sm", verbose=False, clock=clock.time, sleep=clock.sleep,
+    ) is False
+    assert bsm.stepfunctions_client.n_calls == 6
+    # the default delays
+    assert clock.sleeps == [1, 2, 4, 5, 5]
+
+    clock = FakeClock()
+    bsm = FakeBsm(n_deleting=100)
+    with pytest.raises(TimeoutError):
+        wait_delete_state_machine_to_finish(
+            bsm, "sm", delays=DecorrelatedJitterDelay(base=1, max_delay=10),
+            timeout=60, verbose=False, clock=clock.time, sleep=clock.sleep,
+        )
+    assert sum(clock.sleeps) == 60
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -31,6 +31,60 @@ class TestBotoMan:
             self.run_test()
 
 
+class FakeCfClient:
+    def __init__(self, statuses: list):
+        self.statuses = statuses
+        self.n_calls = 0
+
+    def describe_stacks(self, StackName):
+        status = self.statuses[min(self.n_calls, len(self.statuses) - 1)]
+        self.n_calls += 1
+        return {"Stacks": [{"StackName": StackName, "StackStatus": status}]}
+
+
+class FakeBsm:
+    def __init__(self, cf_client: FakeCfClient):
+        self.cf_client = cf_client
+
+    def get_client(self, service_name):
+        return self.cf_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_wait_cloudformation_stack_success():
+    cf_client = FakeCfClient(["UPDATE_IN_PROGRESS"] * 4 + ["UPDATE_COMPLETE"])
+    boto_man = BotoMan(bsm=FakeBsm(cf_client))
+    clock = FakeClock()
+    boto_man.wait_cloudformation_stack_success(
+        name="my-stack", period=5, retry=10,
+        clock=clock.time, sleep=clock.sleep, verbose=False,
+    )
+    assert cf_client.n_calls == 5
+    assert clock.sleeps == [1, 2, 4, 5]
+
+    cf_client = FakeCfClient(["CREATE_IN_PROGRESS"])
+    boto_man = BotoMan(bsm=FakeBsm(cf_client))
+    clock = FakeClock()
+    with pytest.raises(TimeoutError):
+        boto_man.wait_cloudformation_stack_success(
+            name="my-stack", period=5, retry=2,
+            clock=clock.time, sleep=clock.sleep, verbose=False,
+        )
+    assert clock.now == 10
+
+
 if __name__ == "__main__":
     run_cov_test(
         script=__file__,
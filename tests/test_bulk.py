@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+import json
+import uuid
+import threading
+import itertools
+from datetime import datetime
+
+import pytest
+from botocore.exceptions import ClientError
+
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Pass
+from aws_stepfunction.state_machine import StateMachine
+from aws_stepfunction.bulk import (
+    is_throttling_error,
+    is_execution_already_exists_error,
+    AdaptiveBackoff,
+    deploy_state_machines,
+    ExecutionRequest,
+    get_execution_name,
+    start_executions,
+)
+
+AWS_REGION = "us-east-1"
+AWS_ACCOUNT_ID = "111122223333"
+ROLE_ARN = f"arn:aws:iam::{AWS_ACCOUNT_ID}:role/sfn-role"
+
+
+class StateMachineDoesNotExist(Exception):
+    pass
+
+
+class ExecutionAlreadyExists(Exception):
+    pass
+
+
+def throttling_error(operation_name: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        operation_name,
+    )
+
+
+class FakeSfnClient:
+    """
+    An in memory Step Functions client, every ``throttle_every`` th call
+    fails with ``ThrottlingException``.
+    """
+
+    def __init__(self, throttle_every: int = 0):
+        self.throttle_every = throttle_every
+        self.state_machines = dict()
+        self.executions = dict()
+        self.calls = list()
+        self.n_throttled = 0
+        self.lock = threading.Lock()
+
+    def _call(self, operation_name: str, arn: str):
+        with self.lock:
+            self.calls.append((operation_name, arn))
+            if self.throttle_every and len(self.calls) % self.throttle_every == 0:
+                self.n_throttled += 1
+                raise throttling_error(operation_name)
+            if arn.endswith(":broken"):
+                raise ValueError("broken")
+
+    def describe_state_machine(self, stateMachineArn):
+        self._call("DescribeStateMachine", stateMachineArn)
+        try:
+            return self.state_machines[stateMachineArn]
+        except KeyError:
+            raise StateMachineDoesNotExist(stateMachineArn)
+
+    def create_state_machine(self, name, definition, roleArn, type, **kwargs):
+        arn = f"arn:aws:states:{AWS_REGION}:{AWS_ACCOUNT_ID}:stateMachine:{name}"
+        self._call("CreateStateMachine", arn)
+        self.state_machines[arn] = dict(
+            stateMachineArn=arn, name=name, definition=definition,
+            roleArn=roleArn, type=type, creationDate=datetime.now(),
+        )
+        return {"stateMachineArn": arn, "creationDate": datetime.now()}
+
+    def update_state_machine(self, stateMachineArn, definition, roleArn, **kwargs):
+        self._call("UpdateStateMachine", stateMachineArn)
+        self.state_machines[stateMachineArn].update(
+            definition=definition, roleArn=roleArn,
+        )
+        return {"updateDate": datetime.now()}
+
+    def start_execution(self, stateMachineArn, name=None, input="{}", traceHeader=None):
+        self._call("StartExecution", stateMachineArn)
+        with self.lock:
+            if name is None:
+                name = str(uuid.uuid4())
+            if name in self.executions:
+                execution = self.executions[name]
+                if execution["closed"]:
+                    raise ClientError(
+                        {"Error": {"Code": "ExecutionAlreadyExists", "Message": name}},
+                        "StartExecution",
+                    )
+                if execution["input"] != input:
+                    raise ExecutionAlreadyExists(name)
+            else:
+                self.executions[name] = dict(
+                    input=input, traceHeader=traceHeader, closed=False,
+                )
+        arn = stateMachineArn.replace(":stateMachine:", ":execution:") + f":{name}"
+        return {"executionArn": arn, "startDate": datetime.now()}
+
+    def close_executions(self):
+        for execution in self.executions.values():
+            execution["closed"] = True
+
+
+class FakeBsm:
+    def __init__(self, client: FakeSfnClient):
+        self.aws_region = AWS_REGION
+        self.aws_account_id = AWS_ACCOUNT_ID
+        self.client = client
+
+    def get_client(self, service_name):
+        return self.client
+
+
+def make_state_machine(name: str, comment: str = "") -> StateMachine:
+    workflow = Workflow(comment=comment or None)
+    workflow.start_from(Pass(id="p1")).end()
+    return StateMachine(name=name, workflow=workflow, role_arn=ROLE_ARN)
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(throttling_error("DescribeStateMachine")) is True
+    assert is_throttling_error(StateMachineDoesNotExist()) is False
+
+
+def test_is_execution_already_exists_error():
+    assert is_execution_already_exists_error(ExecutionAlreadyExists()) is True
+    assert is_execution_already_exists_error(throttling_error("StartExecution")) is False
+
+
+def test_adaptive_backoff():
+    sleeps = list()
+    backoff = AdaptiveBackoff(
+        base_delay=1, max_delay=4, max_attempts=4,
+        sleep=sleeps.append, jitter=lambda: 1.0,
+    )
+    errors = [throttling_error("Op")] * 3
+
+    def func():
+        if errors:
+            raise errors.pop()
+        return "ok"
+
+    assert backoff.call(func) == ("ok", 3)
+    # 1, 2, 4 seconds, capped at max_delay
+    assert sleeps == [1, 2, 4]
+    assert backoff.delay == 4 * 0.8
+
+    # the delay shrinks after the successful calls
+    for _ in range(10):
+        backoff.call(lambda: None)
+    assert backoff.delay == 0
+
+    # give up after max_attempts
+    def always_throttled():
+        raise throttling_error("Op")
+
+    with pytest.raises(ClientError):
+        backoff.call(always_throttled)
+
+    # other errors are not retried
+    with pytest.raises(ValueError):
+        backoff.call(int, "not a number")
+
+
+def test_deploy_state_machines():
+    client = FakeSfnClient(throttle_every=3)
+    bsm = FakeBsm(client)
+    sleeps = list()
+    backoff = AdaptiveBackoff(base_delay=0.01, sleep=sleeps.append)
+    names = [f"sm-{ith}" for ith in range(20)]
+
+    # first deployment, all created
+    result = deploy_state_machines(
+        [make_state_machine(name) for name in names], bsm,
+        max_workers=4, backoff=backoff,
+    )
+    assert [row.name for row in result.results] == names
+    assert {row.action for row in result.results} == {"create"}
+    assert result.n_throttled == client.n_throttled > 0
+    assert len(sleeps) > 0
+
+    # deploy again, only the changed ones are updated
+    client.calls.clear()
+    state_machines = [
+        make_state_machine(name, comment="v2" if ith % 5 == 0 else "")
+        for ith, name in enumerate(names)
+    ] + [make_state_machine("broken")]
+    result = deploy_state_machines(
+        state_machines, bsm, max_workers=4, backoff=backoff,
+    )
+    actions = [row.action for row in result.results]
+    assert actions == [
+        "update" if ith % 5 == 0 else "skip" for ith in range(20)
+    ] + [None]
+    assert len(result.succeeded) == 20
+    assert [row.name for row in result.failed] == ["broken"]
+    assert isinstance(result.failed[0].error, ValueError)
+    operations = [operation for operation, _ in client.calls]
+    assert operations.count("UpdateStateMachine") >= 4
+    assert "CreateStateMachine" not in operations
+    assert json.loads(
+        client.state_machines[
+            f"arn:aws:states:{AWS_REGION}:{AWS_ACCOUNT_ID}:stateMachine:sm-5"
+        ]["definition"]
+    )["Comment"] == "v2"
+
+    text = result.to_text()
+    assert text.splitlines()[0].split() == [
+        "name", "action", "throttled", "elapsed", "error",
+    ]
+    assert "broken  failed" in text
+
+
+def test_get_execution_name():
+    name = get_execution_name("job", 3, {"a": 1, "b": 2})
+    assert name.startswith("job-3-")
+    # the key order doesn't matter
+    assert name == get_execution_name("job", 3, {"b": 2, "a": 1})
+    assert name != get_execution_name("job", 3, {"a": 1})
+    assert name != get_execution_name("job", 4, {"a": 1, "b": 2})
+    assert get_execution_name("job", 0) != get_execution_name("job", 1)
+    # the batch id is truncated
+    name = get_execution_name("x" * 100, 12345, None)
+    assert len(name) == 80
+    assert name.endswith(get_execution_name("", 12345, None))
+
+
+def test_start_executions():
+    client = FakeSfnClient(throttle_every=7)
+    bsm = FakeBsm(client)
+    backoff = AdaptiveBackoff(base_delay=0.01, sleep=lambda seconds: None)
+    sm = make_state_machine("sm")
+
+    payloads = [{"id": ith} for ith in range(50)]
+    results = list(start_executions(
+        sm, bsm, payloads, max_workers=4, batch_id="job-1", backoff=backoff,
+    ))
+    assert sorted(result.index for result in results) == list(range(50))
+    assert all(result.is_succeeded for result in results)
+    assert sum(result.n_throttled for result in results) == client.n_throttled > 0
+    for result in results:
+        payload = payloads[result.index]
+        assert result.name == get_execution_name("job-1", result.index, payload)
+        assert result.execution_arn.endswith(f":execution:sm:{result.name}")
+        assert client.executions[result.name]["input"] == json.dumps(payload)
+
+    # retry the same batch, no new execution is started
+    results = list(start_executions(
+        sm, bsm, payloads[:10], batch_id="job-1", backoff=backoff,
+    ))
+    assert len(client.executions) == 50
+    assert all(result.is_succeeded for result in results)
+
+    # the same payloads in a new batch are new executions
+    results = list(start_executions(
+        sm, bsm, payloads[:10], batch_id="job-2", backoff=backoff,
+    ))
+    assert len(client.executions) == 60
+    assert all(result.is_succeeded for result in results)
+
+    # explicit name and trace header, default (uuid) name, failed call
+    requests = [
+        ExecutionRequest(payload={"a": 1}, name="my-exec", trace_header="Root=1"),
+        ExecutionRequest(payload={"a": 2}, name="my-exec"),
+        {"b": 1},
+        None,
+    ]
+    results = sorted(
+        start_executions(sm, bsm, requests, backoff=backoff),
+        key=lambda result: result.index,
+    )
+    assert results[0].name == "my-exec"
+    assert client.executions["my-exec"]["traceHeader"] == "Root=1"
+    assert isinstance(results[1].error, ExecutionAlreadyExists)
+    assert results[1].execution_arn is None
+    assert results[2].name is None and results[2].is_succeeded
+    assert results[3].is_succeeded
+    assert len(client.executions) == 63
+
+
+def test_start_executions_retry_closed_executions():
+    client = FakeSfnClient()
+    bsm = FakeBsm(client)
+    sm = make_state_machine("sm")
+    payloads = [{"id": ith} for ith in range(5)]
+    first = {
+        result.index: result
+        for result in start_executions(sm, bsm, payloads[:3], batch_id="job-1")
+    }
+    assert not any(result.already_exists for result in first.values())
+
+    # the first 3 executions are closed, they are not started again
+    client.close_executions()
+    results = sorted(
+        start_executions(sm, bsm, payloads, batch_id="job-1"),
+        key=lambda result: result.index,
+    )
+    assert all(result.is_succeeded for result in results)
+    assert [result.already_exists for result in results] == [True] * 3 + [False] * 2
+    for result in results[:3]:
+        assert result.response is None
+        assert result.execution_arn == first[result.index].execution_arn
+    assert len(client.executions) == 5
+
+    # an explicit name of a closed execution is still an error
+    results = list(start_executions(
+        sm, bsm, [ExecutionRequest(payload=payloads[0], name=results[0].name)],
+    ))
+    assert results[0].already_exists is False
+    assert results[0].error.response["Error"]["Code"] == "ExecutionAlreadyExists"
+    assert results[0].execution_arn is None
+
+
+def test_start_executions_duplicated_payloads():
+    client = FakeSfnClient()
+    bsm = FakeBsm(client)
+    sm = make_state_machine("sm")
+    payloads = [{"a": 1}, {"a": 1}, None, None, None]
+
+    # by default, every payload is a new execution
+    results = list(start_executions(sm, bsm, payloads))
+    assert all(result.is_succeeded for result in results)
+    assert len(client.executions) == 5
+
+    # with batch id, the duplicated payloads are still different executions
+    for _ in range(2):
+        results = list(start_executions(sm, bsm, payloads, batch_id="b"))
+        assert all(result.is_succeeded for result in results)
+        assert len({result.execution_arn for result in results}) == 5
+        assert len(client.executions) == 10
+
+
+def test_start_executions_is_lazy():
+    client = FakeSfnClient()
+    bsm = FakeBsm(client)
+    sm = make_state_machine("sm")
+    payloads = ({"id": ith} for ith in itertools.count())
+    results = start_executions(sm, bsm, payloads, max_workers=2)
+    assert len(list(itertools.islice(results, 10))) == 10
+    results.close()
+    # at most 2 * max_workers calls in flight
+    assert 10 <= len(client.executions) <= 14
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.state import Choice
+from aws_stepfunction.choice_rule import Var, And, Or, and_, or_, not_
+from aws_stepfunction.choice_optimizer import optimize_choice, rule_key
+from aws_stepfunction.local import compile_choice
+
+
+def make_choice(*rules, default="default") -> Choice:
+    for ith, rule in enumerate(rules):
+        rule.next = f"next{ith}"
+    return Choice(id="route", choices=list(rules), default=default)
+
+
+def test_simplify():
+    a = Var("$.a").numeric_greater_than(1)
+    b = Var("$.b").string_equals("x")
+    c = Var("$.c").is_present()
+    state = make_choice(
+        and_(and_(a, b), and_(c, Var("$.a").numeric_greater_than(1))),
+        or_(not_(not_(b))),
+        or_(or_(a, b), c, b),
+    )
+    original = state.serialize()
+    result = state.optimize()
+    choices = result.choice.choices
+    assert rule_key(choices[0]) == rule_key(and_(a, b, c))
+    assert choices[0].next == "next0"
+    assert rule_key(choices[1]) == rule_key(b)
+    assert choices[1].next == "next1"
+    assert rule_key(choices[2]) == rule_key(or_(a, b, c))
+    assert result.n_expression_before == 9
+    assert result.n_expression_after == 7
+    # the original state is not changed
+    assert state.serialize() == original
+    result.choice.serialize()
+
+    result = state.optimize(reorder=True)
+    assert rule_key(result.choice.choices[0]) == rule_key(and_(c, a, b))
+
+
+def test_unreachable():
+    state = make_choice(
+        Var("$.n").numeric_greater_than(100),
+        Var("$.n").numeric_greater_than(200),  # shadowed by rule 0
+        and_(Var("$.n").numeric_greater_than_equals(101), Var("$.s").is_string()),
+        Var("$.n").numeric_greater_than(50),
+        or_(Var("$.s").string_equals("a"), Var("$.n").numeric_equals(60)),
+        Var("$.s").string_equals("a"),  # shadowed by rule 4
+        Var("$.n").is_present(),
+        and_(Var("$.n").numeric_less_than(0), Var("$.x").is_null()),
+        Var("$.x").is_null(),
+    )
+    result = optimize_choice(state)
+    assert result.unreachable == [1, 2, 5, 7]
+    assert len(result.choice.choices) == 9
+
+    result = optimize_choice(state, remove_unreachable=True)
+    assert [rule.next for rule in result.choice.choices] == [
+        "next0", "next3", "next4", "next6", "next8",
+    ]
+
+
+def random_rule(rnd: random.Random, depth: int = 0):
+    kind = rnd.randint(0, 5) if depth < 3 else 0
+    if kind <= 2:
+        var = Var(rnd.choice(["$.a", "$.b"]))
+        return rnd.choice([
+            lambda: var.is_present(),
+            lambda: var.is_numeric(),
+            lambda: var.numeric_greater_than(rnd.choice([0, 1, 2])),
+            lambda: var.numeric_less_than_equals(rnd.choice([0, 1, 2])),
+            lambda: var.numeric_equals(rnd.choice([0, 1, 2])),
+            lambda: var.string_equals("x"),
+        ])()
+    sub_rules = [random_rule(rnd, depth + 1) for _ in range(rnd.randint(1, 3))]
+    if kind == 3:
+        return And(rules=sub_rules)
+    if kind == 4:
+        return Or(rules=sub_rules)
+    return not_(sub_rules[0])
+
+
+def route(func, data):
+    try:
+        return func(data)
+    except exc.StatesError as e:
+        return e.error
+
+
+@pytest.mark.parametrize(
+    "reorder,remove_unreachable",
+    [(False, False), (True, False), (False, True)],
+)
+def test_same_routing(reorder, remove_unreachable):
+    rnd = random.Random(42)
+    values = [0, 1, 2, "x", None]
+    for _ in range(300):
+        state = make_choice(*[random_rule(rnd) for _ in range(rnd.randint(1, 4))])
+        before = compile_choice(state)
+        after = compile_choice(
+            optimize_choice(
+                state,
+                reorder=reorder,
+                remove_unreachable=remove_unreachable,
+            ).choice
+        )
+        for _ in range(10):
+            data = {
+                key: rnd.choice(values)
+                for key in ["a", "b"]
+                if rnd.random() < 0.8
+            }
+            expected, actual = route(before, data), route(after, data)
+            if (reorder or remove_unreachable) and (
+                expected == "States.Runtime" or actual == "States.Runtime"
+            ):
+                # it may change which inputs fail with a missing variable
+                continue
+            assert actual == expected, (state.serialize(), data)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
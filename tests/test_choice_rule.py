@@ -101,6 +101,9 @@ class TestDataTestExpression:
         with pytest.raises(exc.ValidationError):
             _ = CR.DataTestExpression(variable="")
 
+        with pytest.raises(exc.ValidationError):
+            _ = CR.DataTestExpression(variable="$..[")
+
         # invalid operator
         with pytest.raises(exc.ValidationError):
             _ = CR.DataTestExpression(variable="$", operator="")
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Pass, Fail, Retry, Catch
+from aws_stepfunction.state_machine import StateMachine
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.definition_size import analyze_definition_size
+
+
+def make_workflow() -> 'Workflow':
+    def make_task() -> 'Task':
+        return Task(
+            resource="arn:aws:lambda:us-east-1:111122223333:function:f",
+            retry=[
+                Retry.new().if_lambda_service_error().with_max_attempts(3),
+            ],
+        )
+
+    wf = Workflow(comment="size")
+    fail = Fail(id="failed")
+    task1 = make_task()
+    task1.parameters = {"Payload": "x" * 1000}
+    task1.catch = [Catch.new().if_all_error().next_then(fail)]
+    wf.start_from(task1)
+    wf.next_then(make_task())
+    wf.parallel([
+        Workflow().start_from(make_task()).end(),
+        Workflow().start_from(Pass()).end(),
+    ])
+    wf.map(Workflow().start_from(make_task()).next_then(Pass()).end())
+    wf.end()
+    wf._add_state(fail)
+    return wf
+
+
+class TestDefinitionSize:
+    def test_total_bytes(self):
+        wf = make_workflow()
+        for separators in [None, (",", ":")]:
+            report = analyze_definition_size(wf, separators=separators)
+            assert report.total_bytes == wf.get_definition_size(separators)
+            assert report.is_over_limit is False
+
+    def test_per_state_and_sub_workflow(self):
+        wf = make_workflow()
+        report = analyze_definition_size(wf)
+
+        # all states in nested branch / iterator are measured
+        assert len(report.states) == 9
+        states = {state.path: state for state in report.states}
+        task1 = states[wf._start_at]
+        assert task1.total_bytes == task1.own_bytes
+
+        # the bytes of a Parallel state = own bytes + bytes of branches
+        assert len(report.sub_workflows) == 3
+        parallel = [
+            state for state in report.states if state.type == C.Parallel
+        ][0]
+        branches = [
+            sub for sub in report.sub_workflows
+            if sub.path.startswith(parallel.path + ".Branches")
+        ]
+        assert len(branches) == 2
+        assert parallel.total_bytes == parallel.own_bytes + sum([
+            sub.total_bytes for sub in branches
+        ])
+
+        # the largest field is the long Parameters
+        field = report.top_fields(1)[0]
+        assert field.field == C.Parameters
+        assert field.path == wf._start_at
+        assert report.top_states(1)[0] is task1
+
+        # the identical Retry blocks are detected
+        assert len(report.repeated_blocks) == 1
+        block = report.repeated_blocks[0]
+        assert block.field == C.Retry
+        assert block.count == 4
+
+        text = report.to_text()
+        assert "Parameters" in text
+        assert "4 x Retry" in text
+
+    def test_raise_for_limit(self):
+        wf = make_workflow()
+        report = analyze_definition_size(wf, limit=1000)
+        assert report.is_over_limit is True
+        with pytest.raises(exc.DefinitionSizeLimitExceededError) as e:
+            report.raise_for_limit()
+        assert "Parameters" in str(e.value)
+
+        sm = StateMachine(name="test", workflow=wf, role_arn="arn")
+        sm.check_definition_size()
+        with pytest.raises(exc.DefinitionSizeLimitExceededError):
+            sm.check_definition_size(limit=1000)
+
+    def test_deploy_fail_fast(self):
+        class Bsm:
+            def __getattr__(self, item):  # pragma: no cover
+                raise AssertionError("no AWS call should be made")
+
+        wf = Workflow()
+        wf.start_from(Pass(parameters={"Data": "x" * C.DEFINITION_SIZE_LIMIT}))
+        wf.end()
+        sm = StateMachine(name="test", workflow=wf, role_arn="arn")
+        with pytest.raises(exc.DefinitionSizeLimitExceededError):
+            sm.deploy(Bsm())
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
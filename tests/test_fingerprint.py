@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Pass, Fail, Retry, Catch
+from aws_stepfunction.choice_rule import Var, and_, or_
+from aws_stepfunction.fingerprint import (
+    iter_sub_workflows,
+    find_duplicate_workflows,
+    dedupe_workflows,
+)
+
+
+def make_branch(suffix: str = "") -> Workflow:
+    # the workflow id is random, it is not part of the definition
+    return (
+        Workflow()
+        .start_from(Task(id="t1", resource="arn", retry=[Retry.new().if_all_error()]))
+        .next_then(Pass(id="p1" + suffix))
+        .end()
+    )
+
+
+def make_workflow(suffix: str = "") -> Workflow:
+    wf = Workflow(id="wf")
+    wf.start_from(Task(id="start", resource="arn"))
+    wf.parallel([make_branch(), make_branch(suffix)], id="para")
+    wf.map(make_branch(), id="map").end()
+    return wf
+
+
+def test_fingerprint():
+    wf1, wf2 = make_workflow(), make_workflow()
+    assert wf1.fingerprint() == wf2.fingerprint()
+    assert len(wf1.fingerprint()) == 64
+
+    # any change of the content changes the fingerprint
+    fingerprints = {wf1.fingerprint()}
+    for change in [
+        lambda wf: setattr(wf, "comment", "hello"),
+        lambda wf: setattr(wf._states["start"], "comment", "hello"),
+        lambda wf: setattr(
+            wf._states["para"].branches[0]._states["t1"].retry[0],
+            "max_attempts", 5,
+        ),
+        lambda wf: wf._states["map"].iterator._states["t1"].retry[0].if_timeout_error(),
+        lambda wf: wf._add_state(Fail(id="fail")),
+    ]:
+        change(wf1)
+        assert wf1.fingerprint() not in fingerprints
+        fingerprints.add(wf1.fingerprint())
+
+    # the class of the choice rule is part of the fingerprint
+    rules = [Var("$.a").is_present(), Var("$.b").is_present()]
+    assert and_(*rules).fingerprint() != or_(*rules).fingerprint()
+
+
+def test_fingerprint_in_place_change():
+    wf = make_workflow()
+    start = wf._states["start"]
+    t1 = wf._states["para"].branches[0]._states["t1"]
+    fingerprints = {wf.fingerprint()}
+    for change in [
+        lambda: start.retry.append(Retry.new().if_all_error()),
+        lambda: start.parameters.update({"x": 1}),
+        lambda: start.parameters.update({"x": 2}),
+        lambda: start.parameters.update({"nested": {"y": 1}}),
+        lambda: start.parameters["nested"].update({"y": 2}),
+        lambda: t1.retry.pop(),
+        lambda: t1.catch.append(Catch(error_equals=["States.ALL"], next="p1")),
+    ]:
+        change()
+        fingerprint = wf.fingerprint()
+        assert fingerprint not in fingerprints
+        fingerprints.add(fingerprint)
+        # same as a fresh workflow with the same content
+        start.invalidate_cache()
+        t1.invalidate_cache()
+        assert wf.fingerprint() == fingerprint
+
+
+def test_fingerprint_merkle(monkeypatch):
+    wf = make_workflow()
+    wf.fingerprint()
+    hashed = list()
+    _fingerprint_fields = Workflow._fingerprint_fields
+    monkeypatch.setattr(
+        Workflow,
+        "_fingerprint_fields",
+        lambda self: hashed.append(self) or _fingerprint_fields(self),
+    )
+
+    assert wf.fingerprint() == make_workflow().fingerprint()
+    hashed.clear()
+    wf.fingerprint()
+    assert hashed == []
+
+    # only the changed branch and its ancestors are hashed again
+    branch = wf._states["para"].branches[1]
+    branch._states["p1"].comment = "changed"
+    wf.fingerprint()
+    assert hashed == [branch, wf]
+
+
+def test_find_duplicate_workflows():
+    workflows = [make_workflow(), make_workflow(suffix="-x")]
+    locations = [location for location, _ in iter_sub_workflows(workflows[0])]
+    assert locations == [
+        "$",
+        "$.para.Branches[0]",
+        "$.para.Branches[1]",
+        "$.map.Iterator",
+    ]
+
+    duplicates = find_duplicate_workflows(workflows)
+    assert len(duplicates) == 1
+    (members,) = duplicates.values()
+    assert [location for location, _ in members] == [
+        "[0]$.para.Branches[0]",
+        "[0]$.para.Branches[1]",
+        "[0]$.map.Iterator",
+        "[1]$.para.Branches[0]",
+        "[1]$.map.Iterator",
+    ]
+
+
+def test_dedupe_workflows():
+    workflows = [make_workflow(), make_workflow(suffix="-x")]
+    before = [wf.serialize() for wf in workflows]
+    fingerprints = [wf.fingerprint() for wf in workflows]
+
+    report = dedupe_workflows(workflows)
+    assert report.n_workflows == 8
+    assert report.n_unique == 4
+    assert report.n_replaced == 4
+
+    # the definitions don't change
+    assert [wf.serialize() for wf in workflows] == before
+    assert [wf.fingerprint() for wf in workflows] == fingerprints
+
+    # the identical branches are the same object now
+    wf1, wf2 = workflows
+    shared = wf1._states["para"].branches[0]
+    assert wf1._states["map"].iterator is shared
+    assert wf2._states["para"].branches[0] is shared
+    assert wf2._states["para"].branches[1] is not shared
+
+    # dedupe again is a no-op
+    assert dedupe_workflows(workflows).n_replaced == 0
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Pass, Choice, Succeed, Fail, Catch
+from aws_stepfunction.choice_rule import Var
+from aws_stepfunction.graph import validate_graph, GraphErrorEnum as E
+
+
+def make_valid_workflow() -> Workflow:
+    wf = Workflow(id="valid")
+    fallback = Fail(id="fallback")
+    wf.start_from(
+        Task(
+            id="task",
+            resource="arn",
+            catch=[Catch.new().if_all_error().next_then(fallback)],
+        )
+    )
+    wf.parallel(
+        [
+            Workflow().start_from(Pass(id="p1")).end(),
+            Workflow().start_from(Pass(id="p2")).end(),
+        ],
+        id="parallel",
+    )
+    wf.map(Workflow().start_from(Pass(id="m1")).end(), id="map")
+    yes, no = Succeed(id="yes"), Succeed(id="no")
+    wf.choice([Var("$.n").numeric_equals(1).next_then(yes)], default=no, id="choice")
+    wf._add_state(fallback)
+    return wf
+
+
+def codes(report) -> list:
+    return sorted((error.state_id or "", error.code) for error in report.errors)
+
+
+def test_valid():
+    wf = make_valid_workflow()
+    report = wf.validate_graph()
+    assert report.is_valid, report.to_text()
+    assert report.n_states == 10
+    assert report.n_edges == 6
+    report.raise_for_errors()
+
+
+def test_errors():
+    wf = make_valid_workflow()
+    states = wf._states
+    # dangling transitions
+    states["task"].next = "missing"
+    states["choice"].default = "missing"
+    # cross scope transition, p1 is in a parallel branch
+    states["choice"].choices[0].next = "p1"
+    # unreachable and neither next nor end
+    wf._add_state(Pass(id="orphan"))
+    # duplicate id with the map iterator
+    states["map"].iterator._states["m1"].end = None
+    states["map"].iterator._add_state(Succeed(id="yes"))
+
+    report = validate_graph(wf)
+    assert codes(report) == sorted([
+        ("task", E.dangling_transition),
+        ("choice", E.dangling_transition),
+        ("choice", E.cross_scope_transition),
+        ("choice", E.unreachable_state),
+        ("orphan", E.no_next_nor_end),
+        ("orphan", E.unreachable_state),
+        ("parallel", E.unreachable_state),
+        ("map", E.unreachable_state),
+        ("yes", E.unreachable_state),
+        ("no", E.unreachable_state),
+        ("m1", E.no_next_nor_end),
+        ("yes", E.duplicate_state_id),
+        ("yes", E.unreachable_state),
+    ])
+    with pytest.raises(exc.WorkflowGraphError) as e:
+        report.raise_for_errors()
+    assert "$.map.Iterator" in str(e.value)
+
+
+def test_scope_errors():
+    wf = Workflow(id="wf")
+    wf._add_state(Pass(id="a", next="b"))
+    wf._add_state(Pass(id="b", next="a"))
+    wf._add_state(Choice(id="c"))
+    assert codes(validate_graph(wf)) == sorted([
+        ("", E.no_terminal_state),
+        ("", E.missing_start_at),
+        ("c", E.empty_choice),
+    ])
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
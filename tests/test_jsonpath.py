@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction import jsonpath
+
+
+def test_parse():
+    assert jsonpath.parse("$") == ()
+    assert jsonpath.parse("$.a.b") == ("a", "b")
+    assert jsonpath.parse("$.a[0].b") == ("a", 0, "b")
+    assert jsonpath.parse("$['a.b'][1]") == ("a.b", 1)
+    assert jsonpath.parse('$["a"]') == ("a",)
+
+    assert jsonpath.parse("$$.Execution.Id") == ("Execution", "Id")
+    assert jsonpath.parse("$.a[*].b.*") == (
+        "a", jsonpath.WILDCARD, "b", jsonpath.WILDCARD,
+    )
+
+    for path in ["", "a.b", "$.", "$..[", "$.a[", "$.a[x]", "$[0", "$$$"]:
+        with pytest.raises(exc.JsonPathError):
+            jsonpath.parse(path)
+
+
+def test_compile_path():
+    jsonpath.compile_path.cache_clear()
+    path = jsonpath.compile_path("$.a[0]")
+    assert jsonpath.compile_path("$.a[0]") is path
+    assert path.is_reference is True
+    assert path.is_context is False
+    assert jsonpath.compile_path("$$.Map.Item.Value").is_context is True
+    assert jsonpath.compile_path("$.a[*]").is_reference is False
+
+    assert jsonpath.is_valid("$$.Execution.Id") is True
+    assert jsonpath.is_valid("$$.Execution.Id", context=False) is False
+    assert jsonpath.is_valid("$.a.*", reference=True) is False
+    assert jsonpath.is_valid("$..[") is False
+    assert jsonpath.is_valid(None) is False
+
+
+def test_get_value():
+    data = {"a": {"b": [1, {"c": 2}]}, "x.y": 3}
+    assert jsonpath.get_value(data, "$") is data
+    assert jsonpath.get_value(data, "$.a.b[0]") == 1
+    assert jsonpath.get_value(data, "$.a.b[1].c") == 2
+    assert jsonpath.get_value(data, "$['x.y']") == 3
+
+    context = {"Execution": {"Id": "arn"}}
+    assert jsonpath.get_value(data, "$$.Execution.Id", context) == "arn"
+
+    for path in ["$.b", "$.a.b[2]", "$.a.b.c", "$.a[0]", "$['x.y'][0]"]:
+        assert jsonpath.has_value(data, path) is False
+        with pytest.raises(exc.JsonPathNotFoundError):
+            jsonpath.get_value(data, path)
+
+
+def test_get_wildcard():
+    data = {"a": [{"b": 1}, {"b": 2}, {"c": 3}]}
+    assert jsonpath.get_value(data, "$.a[*].b") == [1, 2]
+    assert jsonpath.get_value(data, "$.a[2].*") == [3]
+    assert jsonpath.get_value(data, "$.x[*]") == []
+
+
+def test_parse_extended():
+    assert jsonpath.parse("$..author") == (jsonpath.DEEP_SCAN, "author")
+    assert jsonpath.parse("$..*") == (jsonpath.DEEP_SCAN, jsonpath.WILDCARD)
+    assert jsonpath.parse("$..[0]") == (jsonpath.DEEP_SCAN, 0)
+    assert jsonpath.parse("$.a[-1]") == ("a", -1)
+    assert jsonpath.parse("$.a[0:2]") == ("a", jsonpath.Slice(0, 2, None))
+    assert jsonpath.parse("$.a[-2:]") == ("a", jsonpath.Slice(-2, None, None))
+    assert jsonpath.parse("$.a[::2]") == ("a", jsonpath.Slice(None, None, 2))
+    assert jsonpath.parse("$.a[0,1]") == ("a", jsonpath.Union((0, 1)))
+    assert jsonpath.parse("$['a', \"b\"]") == (jsonpath.Union(("a", "b")),)
+    assert jsonpath.parse("$.a[?(@.x>1)]") == ("a", jsonpath.Filter("@.x>1"))
+
+    for path in ["$..", "$...a", "$.a[::0]", "$.a[0,]", "$.a[?()]"]:
+        with pytest.raises(exc.JsonPathError):
+            jsonpath.parse(path)
+
+
+def test_is_valid_extended():
+    # valid paths, but not reference paths
+    for path in [
+        "$..author",
+        "$.a[0:2]",
+        "$.a[-1]",
+        "$.a[0,1]",
+        "$.a[?(@.x>1)]",
+        "$.a[?(@.price < 10 && @.category == 'fiction')]",
+    ]:
+        assert jsonpath.is_valid(path) is True
+        assert jsonpath.is_valid(path, reference=True) is False
+
+    assert jsonpath.compile_path("$.a[-1]").is_definite is True
+    assert jsonpath.compile_path("$.a[0:2]").is_definite is False
+
+
+def test_get_extended():
+    data = {
+        "a": [
+            {"x": 1, "author": "A"},
+            {"x": 2, "b": {"author": "B"}},
+            {"x": 3, "tag": "t"},
+        ],
+        "b": 5,
+    }
+    assert jsonpath.get_value(data, "$..author") == ["A", "B"]
+    assert jsonpath.get_value(data, "$..x") == [1, 2, 3]
+    assert jsonpath.get_value(data, "$.a[-1]") == {"x": 3, "tag": "t"}
+    assert jsonpath.has_value(data, "$.a[-4]") is False
+    assert jsonpath.get_value(data, "$.a[0:2].x") == [1, 2]
+    assert jsonpath.get_value(data, "$.a[-2:].x") == [2, 3]
+    assert jsonpath.get_value(data, "$.a[::2].x") == [1, 3]
+    assert jsonpath.get_value(data, "$.a[0,2].x") == [1, 3]
+    assert jsonpath.get_value(data, "$['b','c']") == [5]
+    assert jsonpath.get_value(data, "$.a[?(@.x > 1)].x") == [2, 3]
+    assert jsonpath.get_value(data, "$.a[?(@.tag == 't')].x") == [3]
+    assert jsonpath.get_value(data, "$.a[?(@.x != 2)].x") == [1, 3]
+    # a missing key doesn't match any comparison
+    assert jsonpath.get_value(data, '$.a[?(@.author != "B")].x') == [1]
+    assert jsonpath.get_value(data, "$.a[?(@.b.author)].x") == [2]
+
+    # valid, but the local engine can't evaluate it
+    with pytest.raises(exc.JsonPathError):
+        jsonpath.get_value(data, "$.a[?(@.x > 1 && @.x < 3)]")
+
+
+def test_state_validation_extended():
+    from aws_stepfunction.state import Task, Map
+    from aws_stepfunction.choice_rule import Var
+
+    task = Task(id="t", resource="arn", input_path="$..author", output_path="$.a[0:2]", end=True)
+    task._pre_serialize_validation()
+    Var("$.a[?(@.x > 1)]").is_present()
+    Var("$.a[-1]").numeric_equals(1)
+
+    # ResultPath and ItemsPath have to be reference paths
+    for path in ["$.a[-1]", "$..a"]:
+        with pytest.raises(exc.ValidationError, match="ResultPath"):
+            Task(id="t", resource="arn", result_path=path, end=True)._pre_serialize_validation()
+    Map(id="m", items_path="$.a[0]", end=True)._pre_serialize_validation()
+
+    # a deployed definition that uses these paths can be parsed
+    from aws_stepfunction.parser import parse_definition
+
+    definition = {
+        "StartAt": "t",
+        "States": {
+            "t": {
+                "Type": "Task",
+                "Resource": "arn",
+                "InputPath": "$..author",
+                "OutputPath": "$.a[?(@.x>1)]",
+                "End": True,
+            },
+        },
+    }
+    assert parse_definition(definition).serialize() == definition
+    with pytest.raises(exc.ValidationError, match="ItemsPath"):
+        Map(id="m", items_path="$.a[0:2]", end=True)._pre_serialize_validation()
+
+
+def test_set_value():
+    data = {"a": {"b": [1, 2]}, "c": 3}
+    assert jsonpath.set_value(data, "$", 1) == 1
+
+    new_data = jsonpath.set_value(data, "$.a.b[1]", 20)
+    assert new_data == {"a": {"b": [1, 20]}, "c": 3}
+    new_data = jsonpath.set_value(data, "$.x.y", 1)
+    assert new_data == {"a": {"b": [1, 2]}, "c": 3, "x": {"y": 1}}
+    # the original data is not changed
+    assert data == {"a": {"b": [1, 2]}, "c": 3}
+
+    for path in ["$.a.b[2]", "$.c.d"]:
+        with pytest.raises(exc.JsonPathNotFoundError):
+            jsonpath.set_value(data, path, 1)
+
+    for path in ["$.a[*]", "$$.a"]:
+        with pytest.raises(exc.JsonPathError):
+            jsonpath.set_value(data, path, 1)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import (
+    Task, Parallel, Pass, Wait, Succeed, Fail, Retry, Catch,
+)
+from aws_stepfunction.choice_rule import Var, and_, or_, not_
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.local import LocalRunner, evaluate_rule
+from aws_stepfunction.local.choice import wildcard_to_regex, parse_timestamp
+
+ADD = "arn:aws:lambda:us-east-1:111122223333:function:add"
+DOUBLE = "arn:aws:lambda:us-east-1:111122223333:function:double"
+FLAKY = "arn:aws:lambda:us-east-1:111122223333:function:flaky"
+
+
+class FlakyError(Exception):
+    pass
+
+
+def make_runner() -> LocalRunner:
+    runner = LocalRunner()
+
+    @runner.register(ADD)
+    def add(event):
+        return {"sum": event["a"] + event["b"], "noise": 0}
+
+    runner.register(DOUBLE, lambda event: event * 2)
+    return runner
+
+
+class TestChoice:
+    def test_evaluate_rule(self):
+        data = {
+            "n": 5,
+            "limit": 10,
+            "s": "log-2022.txt",
+            "flag": True,
+            "ts": "2022-06-01T00:00:00Z",
+            "none": None,
+        }
+        true_rules = [
+            Var("$.n").numeric_equals(5),
+            Var("$.n").numeric_less_than("$.limit"),
+            Var("$.n").numeric_greater_than_equals(5),
+            Var("$.s").string_matches("log-*.txt"),
+            Var("$.s").string_greater_than("a"),
+            Var("$.flag").boolean_equals(True),
+            Var("$.ts").timestamp_less_than("2022-12-01T00:00:00+00:00"),
+            Var("$.ts").is_timestamp(),
+            Var("$.none").is_null(),
+            Var("$.n").is_present(),
+            Var("$.missing").is_not_present(),
+            Var("$.n").is_numeric(),
+            Var("$.flag").is_not_numeric(),
+            and_(Var("$.n").is_numeric(), not_(Var("$.s").is_null())),
+            or_(Var("$.n").numeric_equals(1), Var("$.flag").is_boolean()),
+        ]
+        for rule in true_rules:
+            assert evaluate_rule(rule, data) is True, rule
+
+        false_rules = [
+            Var("$.n").numeric_equals(6),
+            Var("$.s").numeric_equals(5),
+            Var("$.s").string_matches("log-*.csv"),
+            Var("$.flag").boolean_equals(False),
+            Var("$.n").string_equals("5"),
+            not_(Var("$.n").is_present()),
+        ]
+        for rule in false_rules:
+            assert evaluate_rule(rule, data) is False, rule
+
+        with pytest.raises(exc.StatesError) as e:
+            evaluate_rule(Var("$.missing").numeric_equals(1), data)
+        assert e.value.error == C.RuntimeError
+
+    def test_parse_timestamp(self):
+        for value in [
+            "2022-01-01T00:00:00Z",
+            "2022-01-01T00:00:00.1Z",
+            "2022-01-01T00:00:00.12Z",
+            "2022-01-01T00:00:00.123456789Z",
+            "2022-01-01T05:30:00+05:30",
+            "2021-12-31T14:00:00-10:00",
+        ]:
+            timestamp = parse_timestamp(value)
+            assert timestamp.utcoffset() is not None
+            assert timestamp.replace(microsecond=0) == parse_timestamp(
+                "2022-01-01T00:00:00Z"
+            ), value
+        assert parse_timestamp("2022-01-01T00:00:00.1Z").microsecond == 100000
+        assert parse_timestamp("2022-01-01T00:00:00.123456789Z").microsecond == 123456
+
+        for value in [
+            # no time zone
+            "2022-01-05",
+            "2022-01-05T00:00:00",
+            "2022-01-05T00:00:00.123",
+            # lowercase t and z, space separator
+            "2022-01-05t00:00:00Z",
+            "2022-01-05T00:00:00z",
+            "2022-01-05 00:00:00Z",
+            # out of range
+            "2022-02-30T00:00:00Z",
+            "2022-01-05T24:00:00Z",
+            "2022-01-05T00:00:00+24:00",
+            "2022-01-05T00:00:00+05:60",
+            "2022-01-05T00:00:00.Z",
+            "2022-01-05T00:00:00Z ",
+            20220105,
+            None,
+        ]:
+            assert parse_timestamp(value) is None, value
+
+        # a naive timestamp is not a timestamp, it is never compared
+        data = {"naive": "2022-01-05T00:00:00", "ts": "2022-01-05T00:00:00.1Z"}
+        for rule in [
+            Var("$.naive").timestamp_less_than("2022-01-01T00:00:00Z"),
+            Var("$.naive").timestamp_greater_than("2022-01-01T00:00:00Z"),
+            Var("$.ts").timestamp_equals("$.naive"),
+            Var("$.naive").is_timestamp(),
+        ]:
+            assert evaluate_rule(rule, data) is False, rule
+        assert evaluate_rule(
+            Var("$.ts").timestamp_greater_than("2022-01-05T00:00:00Z"), data,
+        ) is True
+
+    def test_wildcard_to_regex(self):
+        assert wildcard_to_regex("*.txt").fullmatch("a.txt")
+        assert not wildcard_to_regex("*.txt").fullmatch("a.csv")
+        assert wildcard_to_regex(r"a\*b").fullmatch("a*b")
+        assert not wildcard_to_regex(r"a\*b").fullmatch("axxb")
+
+
+class TestLocalRunner:
+    def test_input_output_processing(self):
+        runner = make_runner()
+        wf = Workflow()
+        wf.start_from(
+            Task(
+                resource=ADD,
+                input_path="$.input",
+                parameters={"a.$": "$.x", "b": 10, "name.$": "$$.Execution.Name"},
+                result_selector={"total.$": "$.sum"},
+                result_path="$.result",
+                output_path="$.result",
+            )
+        )
+        wf.next_then(Pass(result={"n": 1}, result_path="$.pass"))
+        wf.next_then(Pass(parameters={"copy.$": "$.total"}))
+        wf.next_then(Task(resource=DOUBLE, input_path="$.copy"))
+        wf.end()
+        data = {"input": {"x": 1}}
+        assert runner.execute(wf, data, name="test") == 22
+        # the input is not modified
+        assert data == {"input": {"x": 1}}
+
+        wf = Workflow()
+        wf.start_from(Pass(result_path="null", result={"n": 1}))
+        wf.next_then(Wait(seconds=1))
+        wf.next_then(Succeed())
+        assert runner.execute(wf, {"a": 1}) == {"a": 1}
+
+    def test_wait_timestamp(self):
+        runner = make_runner()
+        sleeps = list()
+        runner.sleep = sleeps.append
+        wf = Workflow()
+        wf.start_from(Wait(timestamp_path="$.until"))
+        wf.next_then(Succeed())
+        assert runner.execute(wf, {"until": "2000-01-01T00:00:00.1Z"})
+        assert sleeps == []
+
+        # a timestamp without time zone is invalid
+        for until in ["2000-01-01T00:00:00", "2000-01-01"]:
+            with pytest.raises(exc.StatesError) as e:
+                runner.execute(wf, {"until": until})
+            assert e.value.error == C.RuntimeError
+
+    def test_choice(self):
+        runner = make_runner()
+        wf = Workflow()
+        big, small, other = Pass(id="big"), Pass(id="small"), Pass(id="other")
+        wf.start_from(Pass(id="start"))
+        wf.choice([
+            Var("$.n").numeric_greater_than(100).next_then(big),
+            Var("$.n").numeric_greater_than(10).next_then(small),
+        ], default=other, id="choice")
+        wf.continue_from(big).end()
+        wf.continue_from(small).end()
+        wf.continue_from(other).end()
+
+        for n, expected in [(101, "big"), (11, "small"), (1, "other")]:
+            wf._states[expected].result = expected
+            assert runner.execute(wf, {"n": n}) == expected
+
+        wf._states["choice"].default = None
+        with pytest.raises(exc.StatesError) as e:
+            runner.execute(wf, {"n": 1})
+        assert e.value.error == C.NoChoiceMatchedError
+
+    def test_retry_and_catch(self):
+        runner = make_runner()
+        sleeps = list()
+        runner.sleep = sleeps.append
+        n_call = {"n": 0}
+
+        @runner.register(FLAKY)
+        def flaky(event):
+            n_call["n"] += 1
+            if n_call["n"] <= event["n_failure"]:
+                raise FlakyError("boom")
+            return "ok"
+
+        fail = Pass(id="fallback")
+        wf = Workflow()
+        wf.start_from(
+            Task(
+                resource=FLAKY,
+                result_path="$.result",
+                retry=[
+                    Retry(error_equals=["FlakyError"], interval_seconds=1,
+                          max_attempts=2, backoff_rate=3),
+                ],
+                catch=[
+                    Catch.new().if_all_error().next_then(fail)
+                    .with_result_path("$.error")
+                ],
+            )
+        )
+        wf.end()
+        wf._add_state(fail)
+        fail.end = True
+
+        assert runner.execute(wf, {"n_failure": 2}) == {
+            "n_failure": 2, "result": "ok",
+        }
+        assert sleeps == [1, 3]
+
+        n_call["n"] = 0
+        assert runner.execute(wf, {"n_failure": 3}) == {
+            "n_failure": 3,
+            "error": {"Error": "FlakyError", "Cause": "boom"},
+        }
+
+        # States.Runtime can not be caught
+        wf._states[wf._start_at].resource = "unknown"
+        with pytest.raises(exc.StatesError) as e:
+            runner.execute(wf, {"n_failure": 0})
+        assert e.value.error == C.RuntimeError
+
+    def test_parallel_and_map(self):
+        runner = make_runner()
+        wf = Workflow()
+        wf.start_from(Pass(id="start"))
+        wf.parallel([
+            Workflow().start_from(Task(resource=DOUBLE, input_path="$.n")).end(),
+            Workflow().start_from(Pass(parameters={"items.$": "$.items"})).end(),
+        ])
+        wf.next_then(Pass(parameters={"n.$": "$[0]", "items.$": "$[1].items"}))
+        wf.map(
+            Workflow().start_from(Task(resource=ADD)).end(),
+            items_path="$.items",
+        )
+        wf._states[wf._previous_state.id].parameters = {
+            "a.$": "$$.Map.Item.Value",
+            "b.$": "$$.Map.Item.Index",
+        }
+        wf.end()
+        output = runner.execute(wf, {"n": 3, "items": [10, 20, 30]})
+        assert output == [
+            {"sum": 10, "noise": 0},
+            {"sum": 21, "noise": 0},
+            {"sum": 32, "noise": 0},
+        ]
+
+    def test_branch_failed(self):
+        runner = make_runner()
+        fallback = Pass(id="fallback")
+        wf = Workflow()
+        wf.start_from(
+            Parallel(
+                branches=[
+                    Workflow().start_from(Pass()).end(),
+                    Workflow().start_from(Fail(error="MyError", cause="oops")),
+                ],
+                catch=[
+                    Catch(error_equals=[C.BranchFailedError])
+                    .next_then(fallback)
+                ],
+                end=True,
+            )
+        )
+        wf._add_state(fallback)
+        fallback.end = True
+        assert runner.execute(wf, {}) == {
+            "Error": "MyError", "Cause": "oops",
+        }
+
+        wf._states[wf._start_at].catch = []
+        with pytest.raises(exc.StatesError) as e:
+            runner.execute(wf, {})
+        assert e.value.error == "MyError"
+        assert e.value.branch_failed is True
+
+    def test_max_transitions(self):
+        runner = make_runner()
+        runner.max_transitions = 100
+        wf = Workflow()
+        wf.start_from(Pass(id="loop", next="loop"))
+        with pytest.raises(exc.StatesError):
+            runner.execute(wf)
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Parallel, Map, Wait, Catch, Pass
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.local import AsyncRunner
+
+FETCH = "arn:aws:lambda:us-east-1:111122223333:function:fetch"
+DOUBLE = "arn:aws:lambda:us-east-1:111122223333:function:double"
+HANG = "arn:aws:lambda:us-east-1:111122223333:function:hang"
+FAIL = "arn:aws:lambda:us-east-1:111122223333:function:fail"
+
+
+def make_runner(events: list) -> AsyncRunner:
+    runner = AsyncRunner()
+
+    @runner.register(FETCH)
+    async def fetch(event):
+        events.append(("start", event))
+        await asyncio.sleep(0.01)
+        events.append(("end", event))
+        return {"fetched": event}
+
+    @runner.register(HANG)
+    async def hang(event):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append(("cancelled", event))
+            raise
+
+    @runner.register(FAIL)
+    async def fail(event):
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    runner.register(DOUBLE, lambda event: event * 2)
+    return runner
+
+
+def make_branch(resource: str, key: str) -> Workflow:
+    return Workflow().start_from(Task(resource=resource, input_path=key)).end()
+
+
+class TestAsyncRunner:
+    def test_run_parallel(self):
+        events = list()
+        runner = make_runner(events)
+        state = Parallel(
+            branches=[
+                make_branch(FETCH, "$.a"),
+                make_branch(FETCH, "$.b"),
+                make_branch(DOUBLE, "$.c"),
+            ],
+            end=True,
+        )
+        results = asyncio.run(
+            runner.run_parallel(state, {"a": "a", "b": "b", "c": 3})
+        )
+        assert results == [{"fetched": "a"}, {"fetched": "b"}, 6]
+        # the branches run concurrently
+        assert [event[0] for event in events] == ["start", "start", "end", "end"]
+
+    def test_branch_failed(self):
+        events = list()
+        runner = make_runner(events)
+        state = Parallel(
+            branches=[
+                make_branch(HANG, "$.a"),
+                make_branch(FAIL, "$.b"),
+            ],
+            end=True,
+        )
+        with pytest.raises(exc.StatesError) as e:
+            asyncio.run(runner.run_parallel(state, {"a": "a", "b": "b"}))
+        assert e.value.error == "ValueError"
+        assert e.value.branch_failed is True
+        # the other branch is cancelled
+        assert events == [("cancelled", "a")]
+
+        fallback = Pass(id="fallback")
+        state.catch = [
+            Catch(error_equals=[C.BranchFailedError]).next_then(fallback)
+            .with_result_path("$.error")
+        ]
+        output, next_ = asyncio.run(runner.run_state(state, {"a": 1, "b": 2}))
+        assert output == {
+            "a": 1, "b": 2, "error": {"Error": "ValueError", "Cause": "boom"},
+        }
+        assert next_ == "fallback"
+
+    def test_execute(self):
+        events = list()
+        runner = make_runner(events)
+        sleeps = list()
+
+        async def async_sleep(seconds):
+            sleeps.append(seconds)
+
+        runner.async_sleep = async_sleep
+        wf = Workflow()
+        wf.start_from(Wait(seconds=5))
+        wf.next_then(
+            Map(
+                iterator=Workflow().start_from(Task(resource=FETCH)).end(),
+                items_path="$.items",
+                max_concurrency=1,
+                result_path="$.results",
+            )
+        )
+        wf.end()
+        output = asyncio.run(runner.execute(wf, {"items": [1, 2]}))
+        assert output == {
+            "items": [1, 2],
+            "results": [{"fetched": 1}, {"fetched": 2}],
+        }
+        assert sleeps == [5]
+        # max concurrency 1, the iterations run one by one
+        assert events == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
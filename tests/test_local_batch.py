@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from aws_stepfunction.state import Choice
+from aws_stepfunction.choice_rule import Var, and_, or_, not_
+from aws_stepfunction.local import compile_choice, evaluate_batch, MISSING
+from aws_stepfunction.local.batch import _to_array
+
+
+def make_choice(default="other") -> Choice:
+    rules = [
+        and_(Var("$.n").numeric_greater_than(100), Var("$.s").string_equals("a")),
+        or_(Var("$.flag").boolean_equals(True), Var("$.s").string_matches("b*")),
+        not_(Var("$.n").numeric_less_than_equals("$.m")),
+        Var("$.n").is_present(),
+    ]
+    for ith, rule in enumerate(rules):
+        rule.next = f"next{ith}"
+    return Choice(id="route", choices=rules, default=default)
+
+
+def make_rows(n: int, same_type: bool) -> list:
+    rnd = random.Random(n)
+    values = {
+        "n": [0, 50, 101, 2.5, 200],
+        "m": [10, 150],
+        "s": ["a", "b", "bc", "c"],
+        "flag": [True, False],
+    }
+    if not same_type:
+        for key in values:
+            values[key] = values[key] + [None, "x", 1]
+    rows = list()
+    for _ in range(n):
+        row = dict()
+        for key, candidates in values.items():
+            if same_type or rnd.random() < 0.9:
+                row[key] = rnd.choice(candidates)
+        rows.append(row)
+    return rows
+
+
+def expected_next(state: Choice, rows: list) -> list:
+    route = compile_choice(state)
+    result = list()
+    for row in rows:
+        counter = route.replay([row], count_errors=True)
+        next_ = list(counter)[0]
+        result.append(next_ if next_.startswith("next") or next_ == "other" else None)
+    return result
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("same_type", [False, True])
+@pytest.mark.parametrize("default", [None, "other"])
+def test_evaluate_batch_same_as_compile_choice(use_numpy, same_type, default):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    state = make_choice(default)
+    rows = make_rows(500, same_type)
+    result = evaluate_batch(state, rows, use_numpy=use_numpy)
+    assert list(result) == expected_next(state, rows)
+
+
+def test_columnar():
+    np = pytest.importorskip("numpy")
+    state = make_choice()
+    rows = make_rows(200, same_type=True)
+    columns = {
+        "$.n": np.array([row["n"] for row in rows]),
+        "$.m": np.array([row["m"] for row in rows]),
+        "$.s": np.array([row["s"] for row in rows]),
+        "$.flag": np.array([row["flag"] for row in rows]),
+    }
+    assert list(evaluate_batch(state, columns)) == expected_next(state, rows)
+
+    # a column of python list with MISSING
+    columns = {
+        "$.n": [1, MISSING, 200],
+        "$.m": [0, 0, 0],
+        "$.s": ["a", "a", "a"],
+        "$.flag": [False, False, False],
+    }
+    for use_numpy in [False, True]:
+        assert list(
+            evaluate_batch(make_choice(None), columns, use_numpy=use_numpy)
+        ) == ["next2", None, "next0"]
+
+    with pytest.raises(ValueError):
+        evaluate_batch(state, {"$.n": [1], "$.s": ["a", "b"]})
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_evaluate_batch_timestamp(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    rule = Var("$.ts").timestamp_less_than("2022-01-01T00:00:00Z")
+    rule.next = "before"
+    state = Choice(id="route", choices=[rule], default="other")
+    rows = [
+        {"ts": "2021-12-31T23:59:59.9Z"},
+        {"ts": "2021-12-31T23:59:59.999999999+00:00"},
+        {"ts": "2022-01-01T00:00:00.000000001Z"},
+        # no time zone, not a timestamp
+        {"ts": "2021-01-01T00:00:00"},
+        {"ts": "2021-01-01"},
+    ]
+    assert list(evaluate_batch(state, rows, use_numpy=use_numpy)) == [
+        "before", "before", "other", "other", "other",
+    ]
+
+
+def test_to_array():
+    pytest.importorskip("numpy")
+    assert _to_array([1, 2.5]).dtype.kind == "f"
+    assert _to_array([True, False]).dtype.kind == "b"
+    assert _to_array(["a", "b"]).dtype.kind == "U"
+    assert isinstance(_to_array([1, "a"]), list)
+    assert isinstance(_to_array([1, True]), list)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
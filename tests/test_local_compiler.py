@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.state import Choice
+from aws_stepfunction.choice_rule import Var, and_, or_, not_
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.local import evaluate_rule, compile_rule, compile_choice
+
+VALUES = [
+    None, True, False, 0, 1, 5, 2.5, -1, "", "a", "abc", "log-1.txt",
+    "2022-01-01T00:00:00Z", "2022-06-01T00:00:00+00:00", "not-a-date",
+    "2022-03-01T00:00:00", "2022-03-01", "2022-03-01T00:00:00.1Z",
+    "2022-03-01T08:00:00.123456789+08:00",
+    [], {},
+]
+PATHS = ["$.a", "$.b", "$.c", "$.missing"]
+
+
+def random_data_test_expression(rnd: random.Random):
+    var = Var(rnd.choice(PATHS))
+    kind = rnd.randint(0, 5)
+    if kind == 0:
+        return rnd.choice([
+            var.is_null, var.is_not_null, var.is_present, var.is_not_present,
+            var.is_numeric, var.is_string, var.is_boolean, var.is_timestamp,
+        ])()
+    if kind == 1:
+        return var.numeric_greater_than(rnd.choice([0, 1, 2.5, "1"]))
+    if kind == 2:
+        return var.string_less_than_equals(rnd.choice(["a", "abd", 1]))
+    if kind == 3:
+        return var.timestamp_greater_than("2022-03-01T00:00:00Z")
+    if kind == 4:
+        return var.string_matches("log-*.txt")
+    return rnd.choice([
+        var.numeric_equals, var.string_equals, var.boolean_equals,
+        var.timestamp_equals, var.numeric_less_than,
+    ])(rnd.choice(["$.a", "$.b"]))
+
+
+def random_rule(rnd: random.Random, depth: int = 0):
+    kind = rnd.randint(0, 5) if depth < 3 else 0
+    if kind <= 2:
+        return random_data_test_expression(rnd)
+    if kind == 3:
+        return and_(*[random_rule(rnd, depth + 1) for _ in range(rnd.randint(1, 3))])
+    if kind == 4:
+        return or_(*[random_rule(rnd, depth + 1) for _ in range(rnd.randint(1, 3))])
+    return not_(random_rule(rnd, depth + 1))
+
+
+def run(func, data):
+    try:
+        return func(data)
+    except exc.StatesError as e:
+        return e.error
+
+
+def test_compile_rule_same_as_evaluate_rule():
+    rnd = random.Random(20221017)
+    for _ in range(2000):
+        rule = random_rule(rnd)
+        test = compile_rule(rule)
+        for _ in range(5):
+            data = {
+                key: rnd.choice(VALUES)
+                for key in ["a", "b", "c"]
+                if rnd.random() < 0.9
+            }
+            expected = run(lambda d: evaluate_rule(rule, d), data)
+            assert run(test, data) == expected, (rule, data)
+
+
+def test_compile_choice():
+    rule1 = Var("$.n").numeric_greater_than(100)
+    rule1.next = "big"
+    rule2 = and_(Var("$.n").is_numeric(), Var("$.n").numeric_greater_than(10))
+    rule2.next = "small"
+    state = Choice(id="route", choices=[rule1, rule2], default="other")
+
+    route = compile_choice(state)
+    assert route({"n": 101}) == "big"
+    assert route({"n": 11}) == "small"
+    assert route({"n": "x"}) == "other"
+
+    inputs = [{"n": n} for n in range(200)]
+    assert route.replay(inputs) == {"big": 99, "small": 90, "other": 11}
+
+    state.default = None
+    route = compile_choice(state)
+    with pytest.raises(exc.StatesError):
+        route({"n": 1})
+    assert route.replay([{"n": 1}, {"n": 11}], count_errors=True) == {
+        C.NoChoiceMatchedError: 1, "small": 1,
+    }
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Map
+from aws_stepfunction.local import ConcurrentRunner
+
+SQUARE = "arn:aws:lambda:us-east-1:111122223333:function:square"
+SLOW = "arn:aws:lambda:us-east-1:111122223333:function:slow"
+
+
+def square(event):
+    if event == 13:
+        raise ValueError("unlucky")
+    return event * event
+
+
+def make_map(**kwargs) -> Map:
+    return Map(
+        iterator=Workflow().start_from(Task(resource=SQUARE)).end(),
+        items_path="$.items",
+        end=True,
+        **kwargs
+    )
+
+
+class TestConcurrentRunner:
+    def test_thread_pool(self):
+        lock = threading.Lock()
+        counter = {"active": 0, "max_active": 0}
+
+        def slow(event):
+            with lock:
+                counter["active"] += 1
+                counter["max_active"] = max(
+                    counter["max_active"], counter["active"],
+                )
+            time.sleep(0.001 * (event % 3))
+            with lock:
+                counter["active"] -= 1
+            return event * 10
+
+        runner = ConcurrentRunner(executor="thread", max_workers=8)
+        runner.register(SLOW, slow)
+        state = Map(
+            iterator=Workflow().start_from(Task(resource=SLOW)).end(),
+            items_path="$.items",
+            max_concurrency=3,
+            end=True,
+        )
+        items = list(range(30))
+        output, next_ = runner.run_state(state, {"items": items})
+        assert output == [i * 10 for i in items]
+        assert next_ is None
+        assert 1 <= counter["max_active"] <= 3
+
+    def test_failure(self):
+        runner = ConcurrentRunner(executor="thread", chunk_size=1)
+        runner.register(SQUARE, square)
+        with pytest.raises(exc.StatesError) as e:
+            runner.run_state(make_map(), {"items": list(range(100))})
+        assert e.value.error == "ValueError"
+        assert e.value.cause == "unlucky"
+        assert e.value.branch_failed is True
+
+    def test_process_pool(self):
+        runner = ConcurrentRunner(executor="process", max_workers=2)
+        runner.register(SQUARE, square)
+        items = list(range(12))
+        output, _ = runner.run_state(make_map(), {"items": items})
+        assert output == [i * i for i in items]
+
+        with pytest.raises(exc.StatesError) as e:
+            runner.run_state(make_map(), {"items": list(range(20))})
+        assert e.value.error == "ValueError"
+        assert e.value.branch_failed is True
+
+    def test_execute(self):
+        runner = ConcurrentRunner()
+        runner.register(SQUARE, square)
+        wf = Workflow()
+        wf.start_from(make_map(result_path="$.squares"))
+        assert runner.execute(wf, {"items": [1, 2, 3]}) == {
+            "items": [1, 2, 3], "squares": [1, 4, 9],
+        }
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
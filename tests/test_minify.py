@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import json
+import pytest
+
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Pass, Fail, Retry, Catch
+from aws_stepfunction.state_machine import StateMachine
+from aws_stepfunction.choice_rule import Var
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.minify import (
+    make_short_id,
+    minify_definition,
+    restore_definition,
+)
+
+
+def make_workflow() -> 'Workflow':
+    wf = Workflow()
+    fail = Fail(id="failed")
+    task = Task(
+        resource="arn",
+        input_path="$",
+        result_path="$.result",
+        retry=[
+            Retry.new().if_all_error()
+            .with_interval_seconds(1)
+            .with_max_attempts(5)
+            .with_back_off_rate(2),
+        ],
+        catch=[Catch.new().if_all_error().next_then(fail)],
+    )
+    wf.start_from(task)
+    wf.parallel([
+        Workflow().start_from(Pass()).end(),
+        Workflow().start_from(Pass(output_path="$")).end(),
+    ])
+    wf.map(Workflow().start_from(Pass()).end())
+    yes, no = Pass(id="yes"), Pass(id="no")
+    wf.choice([Var("$.flag").boolean_equals(True).next_then(yes)], default=no)
+    wf.continue_from(yes).end()
+    wf.continue_from(no).end()
+    wf._add_state(fail)
+    return wf
+
+
+def iter_state_ids(definition: dict):
+    for state_id, state in definition[C.States].items():
+        yield state_id
+        for branch in state.get(C.Branches, []):
+            yield from iter_state_ids(branch)
+        if C.Iterator in state:
+            yield from iter_state_ids(state[C.Iterator])
+
+
+def test_make_short_id():
+    ids = [make_short_id(i) for i in range(10000)]
+    assert ids[:3] == ["a", "b", "c"]
+    assert ids[62] == "aa"
+    assert len(set(ids)) == len(ids)
+
+
+class TestMinify:
+    def test_minify_definition(self):
+        wf = make_workflow()
+        definition = wf.serialize()
+        original = json.dumps(definition)
+
+        minified = wf.minify()
+        data = minified.definition
+
+        # the input definition is not changed
+        assert json.dumps(definition) == original
+
+        # all state ids, including the nested ones, are shortened
+        ids = list(iter_state_ids(data))
+        assert len(ids) == len(list(iter_state_ids(definition)))
+        assert set(ids) == set(minified.id_mapping)
+        assert all(len(state_id) == 1 for state_id in ids)
+
+        # the references are renamed
+        start = data[C.States][data[C.StartAt]]
+        assert C.InputPath not in start
+        assert start[C.ResultPath] == "$.result"
+        assert start[C.Retry][0] == {
+            C.ErrorEquals: [C.AllError],
+            C.MaxAttempts: 5,
+        }
+        assert minified.get_readable_id(start[C.Catch][0][C.Next]) == "failed"
+        choice = [
+            state for state in data[C.States].values()
+            if state[C.Type] == C.Choice
+        ][0]
+        assert minified.get_readable_id(choice[C.Default]) == "no"
+        assert minified.get_readable_id(choice[C.Choices][0][C.Next]) == "yes"
+
+        assert len(minified.to_json()) < len(wf.to_json())
+        assert ", " not in minified.to_json()
+
+    def test_round_trip(self):
+        wf = make_workflow()
+        definition = wf.serialize()
+
+        minified = minify_definition(definition, drop_default=False)
+        assert minified.restore() == definition
+        assert restore_definition(
+            minified.definition, minified.id_mapping,
+        ) == definition
+
+        minified = minify_definition(definition, shorten_id=False)
+        assert minified.id_mapping == {}
+        assert list(iter_state_ids(minified.definition)) == list(
+            iter_state_ids(definition)
+        )
+
+        # the restored ids with drop default are still the readable ids
+        restored = wf.minify().restore()
+        assert list(iter_state_ids(restored)) == list(
+            iter_state_ids(definition)
+        )
+
+    def test_state_machine(self):
+        wf = make_workflow()
+        sm = StateMachine(name="test", workflow=wf, role_arn="arn")
+        assert sm.get_definition() == wf.to_json()
+        assert sm.get_definition(minify=True) == wf.minify().to_json()
+        sm.check_definition_size(minify=True)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
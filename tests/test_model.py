@@ -5,7 +5,7 @@ import pytest
 
 import typing as T
 import attr
-from aws_stepfunction.model import StepFunctionObject
+from aws_stepfunction.model import StepFunctionObject, get_serializer
 
 
 @attr.s
@@ -75,6 +75,42 @@ class TestStepFunctionObject:
             ]
         )
 
+    def test_compiled_serializer(self):
+        # the serializer is compiled once per class and options
+        assert get_serializer(ToAliasTestObject) is get_serializer(ToAliasTestObject)
+        assert (
+            get_serializer(ToAliasTestObject)
+            is not get_serializer(ToAliasTestObject, use_alias=True)
+        )
+        assert (
+            get_serializer(ToAliasTestObject)
+            is not get_serializer(KeyOrderTestObject)
+        )
+
+        obj = ToDictTestObject(
+            a_int=1,
+            a_list=[ToAliasTestObject(a=1, b=2)],
+            a_dict={"key": ToAliasTestObject(a=3, b=4)},
+            cache={"key": "value"},
+        )
+        # nested attrs objects are converted the same way as attr.asdict
+        assert obj.to_dict() == {
+            "a_int": 1,
+            "a_list": [{"a": 1, "b": 2}],
+            "a_dict": {"key": {"a": 3, "b": 4}},
+        }
+        assert obj.to_dict(exclude_none=False, exclude_private_attr=False) == {
+            "a_int": 1,
+            "a_str": None,
+            "a_list": [{"a": 1, "b": 2}],
+            "a_dict": {"key": {"a": 3, "b": 4}},
+            "_cache": {"key": "value"},
+        }
+
+    def test_serialize_fields(self):
+        obj = ToAliasTestObject(a=1, b=2)
+        assert obj._serialize_fields() == obj._to_alias(obj.to_dict())
+
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import random
+import pytest
+
+from aws_stepfunction import exc
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import (
+    Task, Parallel, Map, Pass, Choice, Succeed, Fail, Retry, Catch,
+)
+from aws_stepfunction.choice_rule import (
+    ChoiceRule, DataTestExpression, And, Or, Not, Var, and_, or_, not_,
+)
+from aws_stepfunction.constant import Constant as C
+from aws_stepfunction.parser import (
+    LazyStates,
+    parse_choice_rule,
+    parse_definition,
+    parse_file,
+)
+
+
+def random_rule(rnd: random.Random, depth: int) -> ChoiceRule:
+    if depth > 0 and rnd.random() < 0.4:
+        rules = [random_rule(rnd, depth - 1) for _ in range(rnd.randint(1, 3))]
+        return rnd.choice([
+            lambda: and_(*rules),
+            lambda: or_(*rules),
+            lambda: not_(rules[0]),
+        ])()
+    var = Var(f"$.key{rnd.randint(1, 9)}")
+    return rnd.choice([
+        lambda: var.is_present(),
+        lambda: var.is_not_null(),
+        lambda: var.numeric_equals(rnd.randint(1, 100)),
+        lambda: var.numeric_less_than("$.limit"),
+        lambda: var.string_equals("hello"),
+        lambda: var.string_matches("log-*.txt"),
+        lambda: var.boolean_equals(True),
+        lambda: var.timestamp_greater_than("2022-01-01T00:00:00Z"),
+    ])()
+
+
+def random_task(rnd: random.Random, fail: Fail) -> Task:
+    task = Task(resource=f"arn:aws:lambda:us-east-1:111122223333:function:f")
+    if rnd.random() < 0.5:
+        task.parameters = {"Payload.$": "$", "n": rnd.randint(1, 100)}
+    if rnd.random() < 0.3:
+        task.result_selector = {"value.$": "$.Payload"}
+    task.result_path = rnd.choice([None, "$.result", "null"])
+    if rnd.random() < 0.3:
+        task.timeout_seconds = rnd.randint(1, 3600)
+    if rnd.random() < 0.5:
+        task.retry.append(
+            Retry.new()
+            .if_lambda_service_error()
+            .with_max_attempts(rnd.randint(1, 5))
+            .with_back_off_rate(rnd.choice([1, 1.5, 2]))
+        )
+    if rnd.random() < 0.3:
+        task.catch.append(
+            Catch.new()
+            .if_all_error()
+            .next_then(fail)
+            .with_result_path(rnd.choice(["$.error", "null"]))
+        )
+    return task
+
+
+def random_workflow(rnd: random.Random, depth: int) -> Workflow:
+    wf = Workflow(comment=rnd.choice([None, "random workflow"]))
+    fail = Fail(cause="error", error="Error")
+    wf.start_from(random_task(rnd, fail))
+    for _ in range(rnd.randint(0, 4)):
+        kind = rnd.randint(0, 4)
+        if kind == 0:
+            wf.next_then(random_task(rnd, fail))
+        elif kind == 1:
+            wf.next_then(Pass(result={"n": rnd.randint(1, 9)}))
+        elif kind == 2:
+            wf.wait(seconds=rnd.randint(1, 60))
+        elif kind == 3 and depth > 0:
+            wf.parallel([
+                random_workflow(rnd, depth - 1)
+                for _ in range(rnd.randint(1, 3))
+            ])
+        elif kind == 4 and depth > 0:
+            wf.map(
+                random_workflow(rnd, depth - 1),
+                items_path="$.items",
+                max_concurrency=rnd.randint(0, 10),
+            )
+    if rnd.random() < 0.5:
+        wf.end()
+    else:
+        yes, no = Succeed(), Pass()
+        wf.choice(
+            [random_rule(rnd, depth=2).next_then(yes)],
+            default=no,
+        )
+        wf.continue_from(no).end()
+    wf._add_state(fail)
+    return wf
+
+
+class TestParser:
+    def test_round_trip(self):
+        rnd = random.Random(1)
+        for _ in range(200):
+            wf = random_workflow(rnd, depth=2)
+            definition = wf.serialize()
+            text = wf.to_json()
+            for data in [definition, text, text.encode("utf-8")]:
+                new_wf = parse_definition(data)
+                assert new_wf.serialize() == definition
+                assert new_wf.to_json() == text
+
+    def test_object_types(self):
+        wf = Workflow(comment="types", timeout_seconds=60)
+        fail = Fail()
+        task = (
+            Task(resource="arn")
+            .update(retry=[Retry.new().if_all_error().with_max_attempts(1)])
+        )
+        task.catch.append(Catch.new().if_all_error().next_then(fail))
+        wf.start_from(task)
+        wf.parallel([Workflow().start_from(Pass()).end()])
+        wf.map(Workflow().start_from(Pass()).end())
+        succeed = Succeed(id="succeed")
+        wf.choice([
+            and_(
+                Var("$.a").is_present(),
+                or_(Var("$.b").numeric_equals(1), not_(Var("$.c").is_null())),
+            ).next_then(succeed)
+        ], default=succeed)
+        wf._add_state(fail)
+
+        new_wf = parse_definition(wf.to_json())
+        assert new_wf.comment == "types"
+        assert new_wf.timeout_seconds == 60
+        assert new_wf._start_at == task.id
+        assert [type(state) for state in new_wf._states.values()] == [
+            Task, Parallel, Map, Choice, Succeed, Fail,
+        ]
+        new_task = new_wf._states[task.id]
+        assert isinstance(new_task.retry[0], Retry)
+        assert new_task.retry[0].max_attempts == 1
+        assert isinstance(new_task.catch[0], Catch)
+        assert new_task.catch[0].next == fail.id
+        parallel, map_, choice = list(new_wf._states.values())[1:4]
+        assert isinstance(parallel.branches[0], Workflow)
+        assert isinstance(map_.iterator, Workflow)
+        rule = choice.choices[0]
+        assert isinstance(rule, And)
+        assert isinstance(rule.rules[0], DataTestExpression)
+        assert isinstance(rule.rules[1], Or)
+        assert isinstance(rule.rules[1].rules[1], Not)
+        assert rule.next == "succeed"
+        assert choice.default == "succeed"
+
+    def test_parse_file(self, tmp_path):
+        wf = random_workflow(random.Random(2), depth=1)
+        path = tmp_path / "definition.json"
+        path.write_text(wf.to_json())
+        assert parse_file(str(path)).serialize() == wf.serialize()
+        assert parse_file(path).serialize() == wf.serialize()
+        assert parse_file(io.StringIO(wf.to_json())).serialize() == wf.serialize()
+        assert parse_file(io.BytesIO(wf.to_json().encode("utf-8"))) \
+                   .serialize() == wf.serialize()
+
+    def test_lazy(self):
+        rnd = random.Random(3)
+        for _ in range(50):
+            wf = random_workflow(rnd, depth=2)
+            text = wf.to_json()
+            lazy_wf = parse_definition(text, lazy=True)
+            assert isinstance(lazy_wf._states, LazyStates)
+            assert lazy_wf._states.n_loaded == 0
+            assert list(lazy_wf._states) == list(wf._states)
+            assert wf._start_at in lazy_wf._states
+            assert lazy_wf._states.n_loaded == 0
+            assert lazy_wf.to_json() == text
+            assert lazy_wf._states.n_loaded == len(wf._states)
+
+        wf = Workflow()
+        wf.start_from(Task(id="t1", resource="arn"))
+        wf.parallel(
+            [Workflow().start_from(Pass(id="p1")).end()],
+            id="parallel",
+        )
+        wf.next_then(Task(id="t2", resource="arn"))
+        wf.end()
+        lazy_wf = parse_definition(wf.serialize(), lazy=True)
+
+        # only the accessed state is parsed
+        parallel = lazy_wf._states["parallel"]
+        assert isinstance(parallel, Parallel)
+        assert lazy_wf._states.is_loaded("parallel")
+        assert lazy_wf._states.n_loaded == 1
+        branch = parallel.branches[0]
+        assert branch._states.n_loaded == 0
+        assert isinstance(branch._states["p1"], Pass)
+        assert lazy_wf._states["parallel"] is parallel
+
+        # the lazy loaded workflow can be edited
+        lazy_wf._remove_state(lazy_wf._states["t2"])
+        parallel.next = None
+        parallel.end = True
+        lazy_wf._add_state(Succeed(id="done"))
+        assert list(lazy_wf._states) == ["t1", "parallel", "done"]
+        assert lazy_wf._states.is_loaded("t1") is False
+        assert lazy_wf.serialize()[C.States]["parallel"][C.End] is True
+
+        with pytest.raises(exc.DefinitionParseError):
+            parse_definition(
+                {C.StartAt: "a", C.States: {"a": {C.Type: "Unknown"}}},
+                lazy=True,
+            )._states["a"]
+
+    def test_unknown_fields(self):
+        # a distributed Map with ItemProcessor / ItemReader / ItemSelector,
+        # Task.Credentials, Retry.MaxDelaySeconds / JitterStrategy and
+        # QueryLanguage are not modeled, they are kept as they are
+        definition = {
+            "Comment": "modern",
+            "QueryLanguage": "JSONPath",
+            "StartAt": "m",
+            "States": {
+                "m": {
+                    "Type": "Map",
+                    "ItemReader": {
+                        "Resource": "arn:aws:states:::s3:getObject",
+                        "ReaderConfig": {"InputType": "JSON"},
+                        "Parameters": {"Bucket": "b", "Key": "k"},
+                    },
+                    "ItemSelector": {"value.$": "$$.Map.Item.Value"},
+                    "ItemProcessor": {
+                        "ProcessorConfig": {
+                            "Mode": "DISTRIBUTED",
+                            "ExecutionType": "EXPRESS",
+                        },
+                        "StartAt": "work",
+                        "States": {"work": {"Type": "Pass", "End": True}},
+                    },
+                    "MaxConcurrency": 100,
+                    "Label": "m",
+                    "ToleratedFailurePercentage": 5,
+                    "Next": "t",
+                },
+                "t": {
+                    "Type": "Task",
+                    "Resource": "arn:aws:states:::lambda:invoke",
+                    "Credentials": {"RoleArn": "arn:aws:iam::111122223333:role/r"},
+                    "Retry": [{
+                        "ErrorEquals": ["States.ALL"],
+                        "MaxAttempts": 3,
+                        "MaxDelaySeconds": 10,
+                        "JitterStrategy": "FULL",
+                    }],
+                    "Catch": [{
+                        "ErrorEquals": ["States.ALL"],
+                        "Next": "done",
+                        "Comment": "fallback",
+                    }],
+                    "End": True,
+                },
+                "done": {"Type": "Succeed"},
+            },
+        }
+        for lazy in [False, True]:
+            wf = parse_definition(json.dumps(definition), lazy=lazy)
+            assert wf.extra == {"QueryLanguage": "JSONPath"}
+            map_ = wf._states["m"]
+            assert isinstance(map_, Map)
+            assert map_.iterator is None
+            assert map_.max_concurrency == 100
+            assert set(map_.extra) == {
+                "ItemReader", "ItemSelector", "ItemProcessor",
+                "Label", "ToleratedFailurePercentage",
+            }
+            task = wf._states["t"]
+            assert task.extra == {"Credentials": definition["States"]["t"]["Credentials"]}
+            assert task.retry[0].max_attempts == 3
+            assert task.retry[0].extra == {"MaxDelaySeconds": 10, "JitterStrategy": "FULL"}
+            assert task.catch[0].extra == {"Comment": "fallback"}
+            assert wf.serialize() == definition
+            assert json.loads(wf.to_json()) == definition
+
+        # the modeled fields take precedence, editing the extra fields
+        # changes the output and the fingerprint
+        wf = parse_definition(definition).enable_cache()
+        map_ = wf._states["m"]
+        fingerprint = wf.fingerprint()
+        wf.serialize()
+        map_.extra["MaxConcurrency"] = 1
+        map_.extra["ItemSelector"]["index.$"] = "$$.Map.Item.Index"
+        data = wf.serialize()
+        assert data[C.States]["m"][C.MaxConcurrency] == 100
+        assert data[C.States]["m"]["ItemSelector"]["index.$"] == "$$.Map.Item.Index"
+        assert wf.fingerprint() != fingerprint
+
+    def test_error(self):
+        with pytest.raises(exc.DefinitionParseError):
+            parse_definition("{")
+        with pytest.raises(exc.DefinitionParseError):
+            parse_definition({C.StartAt: "a", C.States: [], })
+        with pytest.raises(exc.DefinitionParseError):
+            parse_definition({C.StartAt: "a", C.Comment: 1})
+        with pytest.raises(exc.DefinitionParseError) as e:
+            parse_definition({
+                C.StartAt: "a",
+                C.States: {"a": {C.Type: "Unknown"}}
+            })
+        assert str(e.value).startswith("a: ")
+        with pytest.raises(exc.DefinitionParseError) as e:
+            parse_definition({
+                C.StartAt: "p",
+                C.States: {"p": {
+                    C.Type: C.Parallel,
+                    C.Branches: [{
+                        C.StartAt: "a",
+                        C.States: {"a": {C.Type: "Unknown"}},
+                    }],
+                    C.End: True,
+                }}
+            })
+        assert "p.Branches[0].a" in str(e.value)
+        with pytest.raises(exc.DefinitionParseError):
+            parse_choice_rule({C.Variable: "$.a", "Unknown": 1})
+        with pytest.raises(exc.DefinitionParseError):
+            parse_choice_rule({C.Variable: "invalid", C.IsPresent: True})
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Pass
+from aws_stepfunction.state_machine import StateMachine
+from aws_stepfunction.better_boto import rate_limit
+from aws_stepfunction.better_boto.rate_limit import (
+    get_family,
+    TokenBucket,
+    RateLimiter,
+    get_rate_limiter,
+    set_rate_limiter,
+)
+from aws_stepfunction.better_boto.state_machine import describe_state_machine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    old_rate_limiter = get_rate_limiter()
+    set_rate_limiter(RateLimiter(
+        rates={"StartExecution": (2, 3), "DescribeStateMachine": None},
+        clock=clock.time,
+        sleep=clock.sleep,
+    ))
+    yield clock
+    set_rate_limiter(old_rate_limiter)
+
+
+def test_get_family():
+    assert get_family("start_execution") == "StartExecution"
+    assert get_family("start_sync_execution") == "StartExecution"
+    assert get_family("tag_resource") == "tag_resource"
+
+
+def test_token_bucket(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock.time, sleep=clock.sleep)
+
+    # the burst doesn't wait
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    # then one token per 0.5 second
+    assert [bucket.acquire() for _ in range(3)] == [0.5, 0.5, 0.5]
+    assert clock.now == 1.5
+
+    # refilled, but never above the capacity
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(4)] == [0, 0, 0, 0.5]
+
+    metrics = bucket.metrics
+    assert metrics.n_acquired == 10
+    assert metrics.n_waited == 4
+    assert metrics.total_wait == 2.0
+    assert metrics.max_wait == 0.5
+    assert metrics.avg_wait == 0.2
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+
+
+def test_token_bucket_reserve(clock):
+    # a fake sleep that doesn't advance the clock, like many concurrent
+    # callers arriving at the same time, each reserves the next slot
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock.time, sleep=lambda s: None)
+    assert [bucket.acquire() for _ in range(4)] == [0, 0.25, 0.5, 0.75]
+
+
+class StateMachineDoesNotExist(Exception):
+    pass
+
+
+class FakeSfnClient:
+    def __init__(self):
+        self.calls = list()
+
+    def start_execution(self, **kwargs):
+        self.calls.append(("start_execution", kwargs))
+        return {
+            "executionArn": "arn:aws:states:us-east-1:111122223333:execution:sm:exec-id",
+            "startDate": datetime(2022, 1, 1),
+        }
+
+    def describe_state_machine(self, **kwargs):
+        self.calls.append(("describe_state_machine", kwargs))
+        raise StateMachineDoesNotExist("StateMachineDoesNotExist")
+
+
+class FakeBsm:
+    aws_region = "us-east-1"
+    aws_account_id = "111122223333"
+
+    def __init__(self):
+        self.stepfunctions_client = FakeSfnClient()
+
+    def get_client(self, service_name):
+        return self.stepfunctions_client
+
+
+def test_rate_limited_calls(clock):
+    bsm = FakeBsm()
+    workflow = Workflow()
+    workflow.start_from(Pass(id="p1")).end()
+    sm = StateMachine(name="sm", workflow=workflow, role_arn="arn:aws:iam::111122223333:role/r")
+    for _ in range(5):
+        sm.execute(bsm, payload={"a": 1}, verbose=False)
+    assert len(bsm.stepfunctions_client.calls) == 5
+    assert clock.sleeps == [0.5, 0.5]
+
+    # the better boto helpers share the same limiter,
+    # DescribeStateMachine is not limited
+    assert describe_state_machine(bsm, "sm") is None
+    assert sm.exists(bsm) is False
+
+    metrics = get_rate_limiter().get_metrics()
+    assert list(metrics) == ["StartExecution"]
+    assert metrics["StartExecution"].n_acquired == 5
+    assert metrics["StartExecution"].total_wait == 1.0
+
+    get_rate_limiter().reset_metrics()
+    assert get_rate_limiter().get_metrics() == {}
+
+
+def test_default_rates():
+    rate_limiter = RateLimiter()
+    assert set(rate_limiter.buckets) == set(rate_limit.DEFAULT_RATES)
+    assert set(rate_limit.OPERATION_FAMILY.values()) == set(rate_limit.DEFAULT_RATES)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -2,8 +2,9 @@
 
 import os
 import pytest
+from aws_stepfunction import exc
 from aws_stepfunction.state import (
-    State, Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail
+    State, Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail, Catch
 )
 
 
@@ -18,6 +19,25 @@ class TestState:
         with pytest.raises(Exception):
             klass(id=1)
 
+    def test_json_path_validation(self):
+        Task(id="t", resource="r", input_path="$$.Execution.Input", end=True).serialize()
+        Task(id="t", resource="r", output_path="$.items[*].id", end=True).serialize()
+        for kwargs in [
+            dict(input_path="$..["),
+            dict(output_path="$.a["),
+            dict(result_path="$.items[*]"),
+            dict(result_path="$$.Execution"),
+        ]:
+            with pytest.raises(exc.StateValidationError):
+                Task(id="t", resource="r", end=True, **kwargs).serialize()
+
+        with pytest.raises(exc.StateValidationError):
+            Map(id="m", items_path="$.items[*]", end=True).serialize()
+
+        Catch(error_equals=["States.ALL"], next="n", result_path="null").serialize()
+        with pytest.raises(exc.ValidationError):
+            Catch(error_equals=["States.ALL"], next="n", result_path="$.").serialize()
+
 
 if __name__ == "__main__":
     import sys
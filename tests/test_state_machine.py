@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import json
+from datetime import datetime
+
+import pytest
+import boto3
+from botocore.stub import Stubber
+
+from aws_stepfunction.workflow import Workflow
+from aws_stepfunction.state import Task, Succeed, Retry
+from aws_stepfunction.state_machine import StateMachine, get_deploy_hash
+
+AWS_REGION = "us-east-1"
+AWS_ACCOUNT_ID = "111122223333"
+ROLE_ARN = f"arn:aws:iam::{AWS_ACCOUNT_ID}:role/sfn-role"
+ARN = f"arn:aws:states:{AWS_REGION}:{AWS_ACCOUNT_ID}:stateMachine:my-sm"
+
+
+class FakeBsm:
+    """
+    A stand-in of ``BotoSesManager`` that returns a stubbed SFN client.
+    """
+
+    def __init__(self):
+        self.aws_region = AWS_REGION
+        self.aws_account_id = AWS_ACCOUNT_ID
+        self.sfn_client = boto3.client(
+            "stepfunctions",
+            region_name=AWS_REGION,
+            aws_access_key_id="fake",
+            aws_secret_access_key="fake",
+        )
+        self.stubber = Stubber(self.sfn_client)
+
+    def get_client(self, service_name):
+        return self.sfn_client
+
+
+def make_state_machine() -> StateMachine:
+    workflow = Workflow(id="wf")
+    workflow.start_from(Task(id="t1", resource="arn:aws:lambda:us-east-1:111122223333:function:f"))
+    workflow.next_then(Succeed(id="done"))
+    return StateMachine(
+        name="my-sm",
+        workflow=workflow,
+        role_arn=ROLE_ARN,
+        tracing_configuration={"enabled": True},
+    )
+
+
+def describe_response(definition: dict, **kwargs) -> dict:
+    response = {
+        "stateMachineArn": ARN,
+        "name": "my-sm",
+        "status": "ACTIVE",
+        # whitespace and key order don't matter
+        "definition": json.dumps(definition, indent=4, sort_keys=True),
+        "roleArn": ROLE_ARN,
+        "type": "STANDARD",
+        "creationDate": datetime(2022, 1, 1),
+        "loggingConfiguration": {"level": "OFF", "includeExecutionData": False},
+        "tracingConfiguration": {"enabled": True},
+    }
+    response.update(kwargs)
+    return response
+
+
+@pytest.fixture
+def no_magic(monkeypatch):
+    monkeypatch.setattr(StateMachine, "_deploy_magic", lambda self, bsm: None)
+
+
+def test_get_deploy_hash():
+    assert get_deploy_hash({"a": 1, "b": [1, 2]}) == get_deploy_hash({"b": [1, 2], "a": 1})
+    assert get_deploy_hash({"a": 1}) != get_deploy_hash({"a": 2})
+
+
+def test_deploy_skip_unchanged(no_magic):
+    sm = make_state_machine()
+    definition = sm.workflow.serialize()
+    bsm = FakeBsm()
+    describe_params = {"stateMachineArn": ARN}
+
+    # nothing changed, only one describe call
+    bsm.stubber.add_response(
+        "describe_state_machine", describe_response(definition), describe_params,
+    )
+    with bsm.stubber:
+        res = sm.deploy(bsm, skip_unchanged=True)
+        bsm.stubber.assert_no_pending_responses()
+    assert res == {"stateMachineArn": ARN, "_deploy_action": "skip"}
+
+    # definition, role or tracing changed, update
+    for response in [
+        describe_response(dict(definition, Comment="old")),
+        describe_response(definition, roleArn=ROLE_ARN + "-old"),
+        describe_response(definition, tracingConfiguration={"enabled": False}),
+    ]:
+        bsm.stubber.add_response("describe_state_machine", response, describe_params)
+        bsm.stubber.add_response(
+            "update_state_machine",
+            {"updateDate": datetime(2022, 1, 2)},
+            {
+                "stateMachineArn": ARN,
+                "definition": sm.get_definition(),
+                "roleArn": ROLE_ARN,
+                "tracingConfiguration": {"enabled": True},
+            },
+        )
+        with bsm.stubber:
+            res = sm.deploy(bsm, skip_unchanged=True)
+            bsm.stubber.assert_no_pending_responses()
+        assert res["_deploy_action"] == "update"
+
+    # logging configuration is not defined locally, it is not compared
+    bsm.stubber.add_response(
+        "describe_state_machine",
+        describe_response(definition, loggingConfiguration={"level": "ALL"}),
+        describe_params,
+    )
+    with bsm.stubber:
+        assert sm.deploy(bsm, skip_unchanged=True)["_deploy_action"] == "skip"
+
+    # not exists, create
+    bsm.stubber.add_client_error(
+        "describe_state_machine", service_error_code="StateMachineDoesNotExist",
+    )
+    bsm.stubber.add_response(
+        "create_state_machine",
+        {"stateMachineArn": ARN, "creationDate": datetime(2022, 1, 1)},
+    )
+    with bsm.stubber:
+        res = sm.deploy(bsm, skip_unchanged=True)
+        bsm.stubber.assert_no_pending_responses()
+    assert res["_deploy_action"] == "create"
+
+    # by default, always update
+    bsm.stubber.add_response(
+        "describe_state_machine", describe_response(definition), describe_params,
+    )
+    bsm.stubber.add_response("update_state_machine", {"updateDate": datetime(2022, 1, 2)})
+    with bsm.stubber:
+        assert sm.deploy(bsm)["_deploy_action"] == "update"
+        bsm.stubber.assert_no_pending_responses()
+
+
+def test_deploy_after_in_place_change(no_magic):
+    sm = make_state_machine()
+    sm.workflow.enable_cache()
+    task = sm.workflow._states["t1"]
+    bsm = FakeBsm()
+    describe_params = {"stateMachineArn": ARN}
+
+    for minify in [False, True]:
+        old_definition = sm.get_definition(minify=minify)
+        old_hash = sm.get_local_deploy_hash(minify=minify)
+        task.parameters["a"] = len(task.parameters)
+        definition = sm.get_definition(minify=minify)
+        assert definition != old_definition
+        states = json.loads(definition)["States"].values()
+        assert task.parameters in [state.get("Parameters") for state in states]
+        assert sm.get_local_deploy_hash(minify=minify) != old_hash
+
+        bsm.stubber.add_response(
+            "describe_state_machine", describe_response({}), describe_params,
+        )
+        bsm.stubber.add_response(
+            "update_state_machine",
+            {"updateDate": datetime(2022, 1, 2)},
+            {
+                "stateMachineArn": ARN,
+                "definition": definition,
+                "roleArn": ROLE_ARN,
+                "tracingConfiguration": {"enabled": True},
+            },
+        )
+        with bsm.stubber:
+            assert sm.deploy(bsm, minify=minify)["_deploy_action"] == "update"
+            bsm.stubber.assert_no_pending_responses()
+
+    # a list field
+    old_definition = sm.get_definition()
+    task.retry.append(Retry.new().if_all_error())
+    assert sm.get_definition() != old_definition
+
+
+def test_deploy_skip_unchanged_after_in_place_change(no_magic):
+    sm = make_state_machine()
+    sm.workflow.enable_cache()
+    task = sm.workflow._states["t1"]
+    bsm = FakeBsm()
+    describe_params = {"stateMachineArn": ARN}
+
+    deployed = sm.workflow.serialize()
+    bsm.stubber.add_response(
+        "describe_state_machine", describe_response(deployed), describe_params,
+    )
+    with bsm.stubber:
+        assert sm.deploy(bsm, skip_unchanged=True)["_deploy_action"] == "skip"
+
+    # the cached definition is edited in place, it is not skipped
+    for edit in [
+        lambda: task.parameters.update({"a": 1}),
+        lambda: task.parameters.update({"a": 2}),
+        lambda: task.retry.append(Retry.new().if_all_error()),
+        lambda: task.retry[0].error_equals.append("States.Timeout"),
+    ]:
+        edit()
+        bsm.stubber.add_response(
+            "describe_state_machine", describe_response(deployed), describe_params,
+        )
+        bsm.stubber.add_response(
+            "update_state_machine",
+            {"updateDate": datetime(2022, 1, 2)},
+            {
+                "stateMachineArn": ARN,
+                "definition": sm.workflow.to_json(),
+                "roleArn": ROLE_ARN,
+                "tracingConfiguration": {"enabled": True},
+            },
+        )
+        with bsm.stubber:
+            res = sm.deploy(bsm, skip_unchanged=True)
+            bsm.stubber.assert_no_pending_responses()
+        assert res["_deploy_action"] == "update"
+        deployed = json.loads(sm.get_definition())
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
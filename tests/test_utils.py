@@ -13,6 +13,7 @@ def test_is_json_path():
     assert utils.is_json_path("$")
     assert utils.is_json_path("$.key")
     assert utils.is_json_path("abc") is False
+    assert utils.is_json_path("$..[") is False
 
 
 def test_tokenize():
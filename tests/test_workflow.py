@@ -1,19 +1,58 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import json
 import pytest
+import collections
 
+import attr
 from rich import print as rprint
 
 from aws_stepfunction import exc
+from aws_stepfunction.model import StepFunctionObject
 from aws_stepfunction.workflow import Workflow
 from aws_stepfunction.state import (
-    Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail,
+    Task, Parallel, Map, Pass, Wait, Choice, Succeed, Fail, Retry, Catch,
 )
 from aws_stepfunction.constant import Constant as C
 from aws_stepfunction.choice_rule import Var
 
 
+def make_nested_workflow(depth: int, width: int) -> 'Workflow':
+    """
+    Create a Parallel-in-Map-in-Parallel ... nested workflow.
+    """
+    wf = Workflow()
+    wf.start_from(Task(resource="arn"))
+    for _ in range(width - 1):
+        wf.next_then(Task(resource="arn"))
+    if depth > 0:
+        if depth % 2:
+            wf.parallel([
+                make_nested_workflow(depth - 1, width),
+                make_nested_workflow(depth - 1, width),
+            ])
+        else:
+            wf.map(make_nested_workflow(depth - 1, width))
+    wf.end()
+    return wf
+
+
+def count_nodes(wf: 'Workflow') -> int:
+    """
+    Count the number of workflow and state objects in a nested workflow.
+    """
+    n = 1
+    for state in wf._states.values():
+        n += 1
+        if isinstance(state, Parallel):
+            n += sum([count_nodes(branch) for branch in state.branches])
+        elif isinstance(state, Map):
+            n += count_nodes(state.iterator)
+    return n
+
+
 @pytest.fixture
 def wf() -> 'Workflow':
     return Workflow()
@@ -381,6 +420,276 @@ class TestWorkflow:
 
         _ = wf.serialize()
 
+    def test_serialize_each_node_exactly_once(self, monkeypatch):
+        def asdict(*args, **kwargs):  # pragma: no cover
+            raise AssertionError("attr.asdict should not be used in serialize")
+
+        monkeypatch.setattr(attr, "asdict", asdict)
+
+        counter = collections.Counter()
+        serialize = StepFunctionObject.serialize
+
+        def counted_serialize(self, *args, **kwargs):
+            if isinstance(self, (Workflow, Task, Parallel, Map)):
+                counter[id(self)] += 1
+            return serialize(self, *args, **kwargs)
+
+        monkeypatch.setattr(StepFunctionObject, "serialize", counted_serialize)
+
+        for depth in [1, 3, 5]:
+            counter.clear()
+            wf = make_nested_workflow(depth=depth, width=3)
+            wf.serialize()
+            # the total amount of work is linear to the total node count,
+            # no matter how deep the nesting is
+            assert sum(counter.values()) == count_nodes(wf)
+            assert set(counter.values()) == {1}
+
+    def test_serialize_cache(self, monkeypatch):
+        counter = collections.Counter()
+
+        def patch(klass):
+            _serialize = klass._serialize
+
+            def counted_serialize(self):
+                counter[self.id] += 1
+                return _serialize(self)
+
+            monkeypatch.setattr(klass, "_serialize", counted_serialize)
+
+        patch(Workflow)
+        patch(Task)
+        patch(Parallel)
+
+        retry = Retry.new().if_all_error()
+        catch = Catch.new().if_all_error().next_then(Fail(id="fail"))
+        t1 = Task(id="t1", resource="arn", retry=[retry], catch=[catch])
+        t2 = Task(id="t2", resource="arn")
+        t3 = Task(id="t3", resource="arn")
+        branch = Workflow(id="branch").start_from(t3).end()
+        wf = Workflow(id="wf").enable_cache()
+        wf.start_from(t1).parallel([branch], id="para").end()
+        wf._add_state(Fail(id="fail"))
+
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t1": 1, "para": 1, "branch": 1, "t3": 1}
+
+        # nothing changed, nothing is serialized again
+        counter.clear()
+        assert wf.serialize() is data
+        assert len(counter) == 0
+
+        # change a state in a branch, only the state and its ancestors
+        # are serialized again
+        t3.comment = "changed"
+        data = wf.serialize()
+        assert counter == {"wf": 1, "para": 1, "branch": 1, "t3": 1}
+        assert (
+            data[C.States]["para"][C.Branches][0][C.States]["t3"][C.Comment]
+            == "changed"
+        )
+
+        # Retry.with_* and Retry.if_* invalidate the owner state
+        counter.clear()
+        retry.with_max_attempts(5)
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t1": 1}
+        assert data[C.States]["t1"][C.Retry][0][C.MaxAttempts] == 5
+
+        counter.clear()
+        retry.if_timeout_error()
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t1": 1}
+        assert C.TimeoutError in data[C.States]["t1"][C.Retry][0][C.ErrorEquals]
+
+        # Catch.next_then invalidates the owner state
+        counter.clear()
+        catch.next_then(Fail(id="fail2"))
+        wf._add_state(Fail(id="fail2"))
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t1": 1}
+        assert data[C.States]["t1"][C.Catch][0][C.Next] == "fail2"
+        assert "fail2" in data[C.States]
+
+        # next_then invalidates the previous state and the workflow
+        wf = Workflow(id="wf").enable_cache()
+        wf.start_from(t2)
+        with pytest.raises(exc.StateValidationError):
+            wf.serialize()
+        wf.end()
+        wf.serialize()
+        counter.clear()
+        wf._started = True
+        wf._previous_state.end = None
+        wf.next_then(Task(id="t4", resource="arn")).end()
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t2": 1, "t4": 1}
+        assert data[C.States]["t2"][C.Next] == "t4"
+
+        # disable the cache
+        wf.disable_cache()
+        counter.clear()
+        wf.serialize()
+        wf.serialize()
+        assert counter == {"wf": 2, "t2": 2, "t4": 2}
+
+    def test_serialize_cache_in_place_change(self, monkeypatch):
+        counter = collections.Counter()
+
+        def patch(klass):
+            _serialize = klass._serialize
+
+            def counted_serialize(self):
+                counter[self.id] += 1
+                return _serialize(self)
+
+            monkeypatch.setattr(klass, "_serialize", counted_serialize)
+
+        patch(Workflow)
+        patch(Task)
+        patch(Parallel)
+
+        t1 = Task(id="t1", resource="arn", parameters={"a": {"b": 1}})
+        t2 = Task(id="t2", resource="arn")
+        branch = Workflow(id="branch").start_from(t2).end()
+        wf = Workflow(id="wf").enable_cache()
+        wf.start_from(t1).parallel([branch], id="para").end()
+        data = wf.serialize()
+
+        # mutating a dict field in place
+        counter.clear()
+        t1.parameters["a"]["b"] = 2
+        data = wf.serialize()
+        assert counter == {"wf": 1, "t1": 1}
+        assert data[C.States]["t1"][C.Parameters] == {"a": {"b": 2}}
+
+        # mutating a list field in place, in a branch
+        counter.clear()
+        t2.retry.append(Retry.new().if_all_error())
+        data = wf.serialize()
+        assert counter == {"wf": 1, "para": 1, "branch": 1, "t2": 1}
+        assert len(data[C.States]["para"][C.Branches][0][C.States]["t2"][C.Retry]) == 1
+
+        # mutating a nested object list in place
+        counter.clear()
+        t2.retry[0].max_attempts = 7
+        t2.retry.append(Retry.new().if_timeout_error())
+        data = wf.serialize()
+        assert counter == {"wf": 1, "para": 1, "branch": 1, "t2": 1}
+        retry = data[C.States]["para"][C.Branches][0][C.States]["t2"][C.Retry]
+        assert retry[0][C.MaxAttempts] == 7
+        assert len(retry) == 2
+        assert wf.to_json() == json.dumps(data)
+
+        # nothing changed, nothing is serialized again
+        counter.clear()
+        assert wf.serialize() is data
+        assert len(counter) == 0
+
+    def test_validate_incremental(self, monkeypatch):
+        counter = collections.Counter()
+
+        def patch(klass):
+            _validate = klass._pre_serialize_validation
+
+            def counted_validate(self):
+                counter[klass.__name__] += 1
+                return _validate(self)
+
+            monkeypatch.setattr(klass, "_pre_serialize_validation", counted_validate)
+
+        patch(Task)
+        patch(Retry)
+        patch(Catch)
+
+        retry = Retry.new().if_all_error()
+        catch = Catch.new().if_all_error().next_then(Fail(id="fail"))
+        t1 = Task(id="t1", resource="arn", retry=[retry], catch=[catch])
+        t2 = Task(id="t2", resource="arn")
+        branch = Workflow(id="branch").start_from(t2).end()
+        wf = Workflow(id="wf")
+        wf.start_from(t1).parallel([branch], id="para").end()
+        wf._add_state(Fail(id="fail"))
+
+        report = wf.validate()
+        assert report.n_checked == 8
+        assert report.n_skipped == 0
+        assert counter == {"Task": 2, "Retry": 1, "Catch": 1}
+
+        # nothing changed, nothing is validated again
+        counter.clear()
+        report = wf.validate()
+        assert report.n_checked == 0
+        assert report.n_skipped == 8
+        wf.serialize()
+        assert len(counter) == 0
+
+        # setting an attribute or mutating a list in place
+        counter.clear()
+        t2.comment = "changed"
+        retry.error_equals.append(C.TimeoutError)
+        report = wf.validate()
+        assert report.checked == [
+            "$.States.t1.Retry[0]",
+            "$.States.para.Branches[0].States.t2",
+        ]
+        assert counter == {"Task": 1, "Retry": 1}
+
+        # serialize re-checks the touched object as well
+        counter.clear()
+        catch.result_path = "$.."
+        with pytest.raises(exc.ValidationError):
+            wf.serialize()
+        # a failed object is validated again until it is fixed
+        with pytest.raises(exc.ValidationError):
+            wf.validate()
+        catch.result_path = "$.error"
+        wf.serialize()
+        assert counter == {"Catch": 3}
+
+        # adding a state re-checks the workflow
+        report = wf.validate()
+        assert report.n_checked == 0
+        wf._add_state(Succeed(id="done"))
+        assert wf.validate().checked == ["$", "$.States.done"]
+
+        # incremental=False validates everything
+        counter.clear()
+        assert wf.validate(incremental=False).n_checked == 9
+        assert counter == {"Task": 2, "Retry": 1, "Catch": 1}
+
+    def test_iter_json(self):
+        wf = make_nested_workflow(depth=3, width=2)
+        wf.comment = "nested"
+        first_task = wf._states[wf._start_at]
+        first_task.retry.append(Retry.new().if_all_error())
+        first_task.catch.append(
+            Catch.new().if_all_error().next_then(Fail(id="fail"))
+        )
+        wf._add_state(Fail(id="fail"))
+
+        assert wf.to_json() == json.dumps(wf.serialize())
+        compact = (",", ":")
+        assert wf.to_json(separators=compact) == json.dumps(
+            wf.serialize(), separators=compact,
+        )
+        # the states and the nested workflows are streamed one by one
+        assert len(list(wf.iter_json())) > len(wf._states)
+
+        buffer = io.StringIO()
+        size = wf.write_json(buffer)
+        assert buffer.getvalue() == wf.to_json()
+        assert size == wf.get_definition_size()
+
+        buffer = io.BytesIO()
+        wf.write_json(buffer)
+        assert buffer.getvalue() == wf.to_json().encode("utf-8")
+
+        # validation still happens
+        first_task.resource = None
+        with pytest.raises(exc.StateValidationError):
+            wf.to_json()
+
 
 if __name__ == "__main__":
     import sys